@@ -2,12 +2,8 @@
 import streamlit as st 
 import os
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "gemini-chat-414606-505058a474c0.json"
-import random
-import asyncio
-random.seed(42)
 from utils.main import (
     load_word_pools, 
-    create_audio_file,  
     cleanup_audio_file,
     DEFAULT_CATEGORIES,
     DEFAULT_VOCABULARY_FILE,
@@ -19,6 +15,7 @@ from utils.main import (
 from utils.json_manager import (
     delete_word_from_json,
     load_vocabulary_with_expressions,
+    load_vocabulary_by_category,
     load_vocabulary_from_file,
     load_learned_words,
     save_word_pools_to_file,
@@ -27,7 +24,10 @@ from utils.json_manager import (
     filter_words_by_category,
     delete_word_from_file,
 )
-from word_widget import create_word_widget, get_difficulty
+# Audio is rendered on the shared TTS pool instead of a new event loop per click
+from utils.tts_service import get_audio_file
+from word_widget import create_word_widget, get_difficulty, widget_key, number_repeats
+from utils.pagination import paginate
 
 # Function to create media directory
 def initialize_media_directory():
@@ -157,9 +157,7 @@ if select == "📖 Study Mode":
     st.subheader("📖 Enhanced Study Mode")
 
     if selected_category:
-        # Load vocabulary with expressions from JSON files
-        all_words = load_vocabulary_with_expressions(current_level)
-        filtered_words = filter_words_by_category(all_words, selected_category)
+        filtered_words = load_vocabulary_by_category(current_level, selected_category)
         # print(f"Filtered words:\n {filtered_words}")
         if filtered_words:
             col1, col2 = st.columns([1, 1])
@@ -168,7 +166,8 @@ if select == "📖 Study Mode":
             with col2:
                 search_word = st.text_input("🔍 Search Word", key="search_word_input")
                 if search_word:
-                    # display word with container
+                    # Searching spans the whole level, so only then is it loaded
+                    all_words = load_vocabulary_with_expressions(current_level)
                     filtered_words = [entry for entry in all_words if search_word.lower() in entry['word'].lower()]
                     if not filtered_words:
                         st.warning(f"No words found matching '{search_word}' in Current_Level {current_level}")
@@ -177,24 +176,24 @@ if select == "📖 Study Mode":
                     # Clear the text input field so it's empty after search
                     search_word = ""
                     
-            
-            for word_index, entry in enumerate(filtered_words):
+            # Only the current page of cards is rendered on each rerun
+            page_words, page_start = paginate(number_repeats(filtered_words), key=f"study_{current_level}_{selected_category}")
+            for word_index, (entry, repeat) in enumerate(page_words, start=page_start):
                 with st.container():
                     col1, col2 = st.columns([4, 1])
                     
                     with col1:
                         difficulty = get_difficulty(entry['word'])
                         # Render the word card with editable expressions
-                        create_word_widget(entry, editable_expressions=True, current_level=current_level)
+                        create_word_widget(entry, editable_expressions=True, current_level=current_level, lazy_media=True, repeat=repeat)
 
                     
                     with col2:
                         st.markdown("<br>", unsafe_allow_html=True)
                         
                         # Play buttons
-                        random_num = random.randint(0, 300)
-                        if st.button(f"🔊 Word", key=f"word_{entry['word']}_{random_num}"):
-                            audio_file = asyncio.run(create_audio_file(entry['word'], f"word_{entry['word']}", is_phrase=False, speed=selected_speed))
+                        if st.button(f"🔊 Word", key=widget_key("word", entry, current_level, repeat)):
+                            audio_file = get_audio_file(entry['word'], is_phrase=False, speed=selected_speed)
                             if audio_file and os.path.exists(audio_file):
                                 with open(audio_file, 'rb') as audio:
                                     # Detect audio format based on file extension
@@ -203,9 +202,8 @@ if select == "📖 Study Mode":
                                 cleanup_audio_file(audio_file)
                             else:
                                 st.error("Audio generation failed")
-                        random_num = random.randint(0, 300)
-                        if entry['phrase'] and st.button(f"🔊 Phrase", key=f"phrase_{entry['word']}_{random_num}"):
-                            audio_file = asyncio.run(create_audio_file(entry['phrase'], f"phrase_{entry['word']}", is_phrase=True, speed=selected_speed))
+                        if entry['phrase'] and st.button(f"🔊 Phrase", key=widget_key("phrase", entry, current_level, repeat)):
+                            audio_file = get_audio_file(entry['phrase'], is_phrase=True, speed=selected_speed)
                             if audio_file and os.path.exists(audio_file):
                                 with open(audio_file, 'rb') as audio:
                                     # Detect audio format based on file extension
@@ -221,7 +219,7 @@ if select == "📖 Study Mode":
                         # Different buttons based on current level
                         if current_level == "learned":
                             # Move back to vocabulary button for learned words
-                            if st.button(f"↩️ Move Back", key=f"moveback_{entry['word']}", help="Move back to main vocabulary"):
+                            if st.button(f"↩️ Move Back", key=widget_key("moveback", entry, current_level, repeat), help="Move back to main vocabulary"):
                                 # Add word back to main vocabulary file
                                 with open(word_file, "a", encoding='utf-8') as f:
                                     f.write(f"{entry['word']} | {entry['meaning']} | {entry['phrase']} | {entry['category']}\n")
@@ -237,8 +235,7 @@ if select == "📖 Study Mode":
                             # Learned button for regular levels
                             if current_level == 1 or current_level == 2 or current_level ==3:
                                 word_file = "level" + str(current_level) + ".json"
-                            random_num = random.randint(0, 300)
-                            if st.button(f"✅ Learned", key=f"learned_{entry['word']}_{random_num}", help="Move to learned words"):
+                            if st.button(f"✅ Learned", key=widget_key("learned", entry, current_level, repeat), help="Move to learned words"):
                                 success = save_to_learned(entry)
                                 if success:
                                     delete_word_from_file(entry['word'], word_file)
@@ -248,8 +245,7 @@ if select == "📖 Study Mode":
                         st.markdown("<br>", unsafe_allow_html=True)
                         if current_level == 1 or current_level == 2 or current_level ==3:
                                 word_file = "level" + str(current_level) + ".json"
-                        random_num = random.randint(0, 300)
-                        if st.button("Edit Word", key=f"edit_{entry['word']}_{random_num}", help="Edit this word"):
+                        if st.button("Edit Word", key=widget_key("edit", entry, current_level, repeat), help="Edit this word"):
                             # Store the word data in session state for editing
                             st.session_state.edit_mode = True
                             st.session_state.edit_word_data = {
@@ -270,8 +266,7 @@ if select == "📖 Study Mode":
                         st.markdown("<br>", unsafe_allow_html=True)
                         if current_level == 1 or current_level == 2 or current_level ==3:
                                 word_file = "level" + str(current_level) + ".json"
-                        random_num = random.randint(0, 300)
-                        if st.button("Delete Word", key=f"delete_{entry['word']}_{random_num}", help="Delete this word from vocabulary"):
+                        if st.button("Delete Word", key=widget_key("delete", entry, current_level, repeat), help="Delete this word from vocabulary"):
                             delete_word_from_json(entry['word'], word_file)
                             st.success(f"'{entry['word']}' has been deleted from the vocabulary.")
                             st.session_state["_search_rerun_toggle"] = not st.session_state.get("_search_rerun_toggle", False)
@@ -16,6 +16,17 @@ from main import (
     SPEED_OPTIONS,
     SPEED_LABELS
 )
+# Vocabulary loaders and learned-word helpers go through the configured storage backend
+from utils.json_manager import (
+    load_vocabulary_with_expressions,
+    load_vocabulary_by_category,
+    save_to_learned,
+    load_learned_words,
+    save_learned_words_to_file
+)
+from utils.quiz_index import get_quiz_index
+from utils.stats_cache import get_file_stats
+from utils.pagination import paginate
 
 # Phonetic transcriptions for vocabulary words
 PHONETICS = {
@@ -92,71 +103,6 @@ def get_difficulty(word):
     """Get difficulty level for a word"""
     return DIFFICULTY_LEVELS.get(word.lower(), "⭐⭐")
 
-def save_to_learned(word_entry, learned_file="learned.json"):
-    """Save a word entry to learned.json file"""
-    import json
-    
-    # Load existing learned words
-    learned_words = []
-    if os.path.exists(learned_file):
-        try:
-            with open(learned_file, 'r', encoding='utf-8') as f:
-                learned_words = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            learned_words = []
-    
-    # Add timestamp to the entry
-    import datetime
-    word_entry_with_timestamp = word_entry.copy()
-    word_entry_with_timestamp['learned_date'] = datetime.datetime.now().isoformat()
-    
-    # Check if word already exists in learned list
-    existing_word = next((w for w in learned_words if w['word'].lower() == word_entry['word'].lower()), None)
-    if not existing_word:
-        learned_words.append(word_entry_with_timestamp)
-        
-        # Save back to file
-        with open(learned_file, 'w', encoding='utf-8') as f:
-            json.dump(learned_words, f, ensure_ascii=False, indent=2)
-        return True
-    return False
-
-def load_learned_words(learned_file="learned.json"):
-    """Load learned words from learned.json and convert to vocabulary format"""
-    import json
-    
-    if not os.path.exists(learned_file):
-        return []
-    
-    try:
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
-        
-        # Convert to the same format as regular vocabulary
-        formatted_words = []
-        for word_entry in learned_words:
-            formatted_word = {
-                'word': word_entry.get('word', ''),
-                'meaning': word_entry.get('meaning', ''),
-                'phrase': word_entry.get('phrase', ''),
-                'category': word_entry.get('category', 'general'),
-                'learned_date': word_entry.get('learned_date', '')
-            }
-            formatted_words.append(formatted_word)
-        
-        return formatted_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-def save_learned_words_to_file(learned_words, learned_file="learned.json"):
-    """Save learned words back to JSON file"""
-    import json
-    
-    with open(learned_file, 'w', encoding='utf-8') as f:
-        json.dump(learned_words, f, ensure_ascii=False, indent=2)
-    
-    return True
-
 def delete_word_from_file(word_to_delete, word_file):
     """Delete a word from the vocabulary file"""
     # Read all lines
@@ -177,53 +123,6 @@ def delete_word_from_file(word_to_delete, word_file):
     
     return True
 
-def load_vocabulary_with_expressions(level):
-    """Load vocabulary from JSON files with expressions included"""
-    import json
-    
-    if level == "learned":
-        return load_learned_words()
-    
-    # Map level to filename
-    level_files = {
-        1: "level1.json",
-        2: "level2.json", 
-        3: "level3.json"
-    }
-    
-    filename = level_files.get(level)
-    if not filename or not os.path.exists(filename):
-        return []
-    
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Flatten all categories into a single list
-        all_words = []
-        for category, words in data.items():
-            for word_entry in words:
-                # Add category to each word entry
-                word_entry['category'] = category
-                all_words.append(word_entry)
-        
-        return all_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
-
-def generate_quiz_question(words, correct_word):
-    """Generate a multiple choice quiz question"""
-    options = [correct_word]
-    other_words = [w for w in words if w['word'] != correct_word['word']]
-    
-    # Add 3 random wrong options
-    wrong_options = random.sample(other_words, min(3, len(other_words)))
-    for word in wrong_options:
-        options.append(word)
-    
-    random.shuffle(options)
-    return options
-
 # Configure the app
 st.set_page_config(
     page_title="Vocabulary Builder - Advanced 1",
@@ -357,8 +256,7 @@ if select == "📖 Study Mode":
     
     if selected_category:
         # Load vocabulary with expressions from JSON files
-        all_words = load_vocabulary_with_expressions(current_level)
-        filtered_words = filter_words_by_category(all_words, selected_category)
+        filtered_words = load_vocabulary_by_category(current_level, selected_category)
         
         # Apply difficulty filter
         if difficulty_filter != "All Levels":
@@ -368,7 +266,9 @@ if select == "📖 Study Mode":
         if filtered_words:
             st.info(f"📚 Showing {len(filtered_words)} words from {selected_category}")
             
-            for entry in filtered_words:
+            # Only the current page of cards is rendered on each rerun
+            page_words, _ = paginate(filtered_words, key=f"study_{current_level}_{selected_category}_{difficulty_filter}")
+            for entry in page_words:
                 with st.container():
                     col1, col2 = st.columns([4, 1])
                     
@@ -482,8 +382,7 @@ elif select == "🎯 Quiz Mode":
         st.session_state.current_question = None
     
     # Load words for quiz using sidebar selections with expressions
-    all_words = load_vocabulary_with_expressions(current_level)
-    quiz_words = filter_words_by_category(all_words, selected_category)
+    quiz_words = load_vocabulary_by_category(current_level, selected_category)
     
     # Display current quiz settings
     st.info(f"📚 **Category:** {selected_category} | 🎯 **Quiz Type:** {quiz_type}")
@@ -497,7 +396,8 @@ elif select == "🎯 Quiz Mode":
         # Generate new question button
         if st.button("🎲 New Question") or st.session_state.current_question is None:
             correct_word = random.choice(quiz_words)
-            options = generate_quiz_question(quiz_words, correct_word)
+            # Cached per level/category; distractors are sampled without a full scan
+            options = get_quiz_index(current_level, selected_category, quiz_words).question(correct_word)
             st.session_state.current_question = {
                 'correct': correct_word,
                 'options': options,
@@ -608,14 +508,16 @@ elif select == "➕ Add Word":
 elif select == "📊 Progress":
     st.subheader("📊 Learning Progress & Statistics")
     
-    all_words = load_vocabulary_from_file(word_file)
+    # Counts of this app's word file (including words added on the Add Word tab),
+    # cached until the file changes instead of re-counting every word
+    level_stats = get_file_stats(word_file, load_vocabulary_from_file)
     
-    if all_words:
+    if level_stats.total:
         # Overall statistics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Words", len(all_words))
+            st.metric("Total Words", level_stats.total)
         with col2:
             if st.session_state.quiz_total > 0:
                 accuracy = (st.session_state.quiz_score / st.session_state.quiz_total) * 100
@@ -629,10 +531,7 @@ elif select == "📊 Progress":
         
         # Category breakdown
         st.markdown("### 📈 Words by Category")
-        category_stats = {}
-        for word in all_words:
-            cat = word.get('category', 'Unknown').title()
-            category_stats[cat] = category_stats.get(cat, 0) + 1
+        category_stats = {category.title(): count for category, count in level_stats.by_category.items()}
         
         # Display as columns
         cols = st.columns(len(category_stats))
@@ -640,19 +539,28 @@ elif select == "📊 Progress":
             with cols[i]:
                 st.metric(category, count)
         
-        # Difficulty distribution (if available)
+        # Difficulty distribution, using this app's difficulty table
         st.markdown("### ⭐ Difficulty Distribution")
-        difficulty_stats = {"⭐ Easy": 0, "⭐⭐ Medium": 0, "⭐⭐⭐ Hard": 0}
-        for word in all_words:
-            diff = get_difficulty(word['word'])
-            if diff in difficulty_stats:
-                difficulty_stats[diff] += 1
+        difficulty_counts = level_stats.difficulty_counts(DIFFICULTY_LEVELS, default="⭐⭐")
+        difficulty_stats = {
+            "⭐ Easy": difficulty_counts.get("⭐", 0),
+            "⭐⭐ Medium": difficulty_counts.get("⭐⭐", 0),
+            "⭐⭐⭐ Hard": difficulty_counts.get("⭐⭐⭐", 0)
+        }
         
         diff_cols = st.columns(3)
         for i, (level, count) in enumerate(difficulty_stats.items()):
             with diff_cols[i]:
                 st.metric(level, count)
         
+        # Content coverage
+        st.markdown("### 🎬 Content Coverage")
+        coverage_col1, coverage_col2 = st.columns(2)
+        with coverage_col1:
+            st.metric("Words with Media", f"{level_stats.with_media} ({level_stats.coverage(level_stats.with_media):.0f}%)")
+        with coverage_col2:
+            st.metric("Words with Expressions", f"{level_stats.with_expressions} ({level_stats.coverage(level_stats.with_expressions):.0f}%)")
+        
         # Reset progress button
         if st.button("🔄 Reset Quiz Progress"):
             st.session_state.quiz_score = 0
@@ -18,6 +18,12 @@ from main import (
     SPEED_OPTIONS,
     SPEED_LABELS
 )
+from utils.quiz_index import QuizIndex
+from utils.search_index import get_search_index
+from utils.scheduler import get_scheduler, DEFAULT_LEARNER
+from utils.progress_store import get_progress_store
+from utils.stats_cache import get_file_stats
+from utils.json_manager import load_vocabulary_by_category
 
 # Advanced word data with comprehensive information
 ADVANCED_WORD_DATA = {
@@ -62,16 +68,33 @@ ADVANCED_WORD_DATA = {
     }
 }
 
+# Word -> difficulty overrides for the analytics breakdown
+ADVANCED_DIFFICULTIES = {word: data["difficulty"] for word, data in ADVANCED_WORD_DATA.items()}
+
+# Seconds of study time collected in the session before it is written to the progress store
+STUDY_TIME_FLUSH_SECONDS = 60
+
+# Cards shown at once by the "Due for Review" filter
+DUE_PAGE_SIZE = 20
+
 # Spaced repetition system
-def calculate_next_review_date(word, performance):
-    """Calculate when a word should be reviewed next based on performance"""
-    base_intervals = {
-        "again": 1,      # 1 day
-        "hard": 2,       # 2 days  
-        "good": 4,       # 4 days
-        "easy": 7        # 7 days
-    }
-    return datetime.now() + timedelta(days=base_intervals.get(performance, 4))
+def calculate_next_review_date(word, performance, learner=DEFAULT_LEARNER):
+    """Record a review and return when the word should be reviewed next"""
+    # SM-2 ease/interval state is persisted per learner (utils/scheduler.py)
+    return get_scheduler().review(learner, word, performance)["due"]
+
+def record_review(word, performance):
+    """Store a study rating for the current learner and return the next review date"""
+    st.session_state.learning_progress[word] = performance
+    return calculate_next_review_date(word, performance, st.session_state.learner_name)
+
+def set_favorite(word, favorite):
+    """Add or remove a favorite for the current learner"""
+    if favorite:
+        st.session_state.favorite_words.add(word)
+    else:
+        st.session_state.favorite_words.discard(word)
+    get_progress_store().set_favorite(st.session_state.learner_name, word, favorite)
 
 def get_advanced_word_data(word):
     """Get advanced data for a word"""
@@ -183,17 +206,32 @@ st.sidebar.title("🎓 Expert Navigation")
 word_file = DEFAULT_VOCABULARY_FILE
 category_list = DEFAULT_CATEGORIES
 
-# Initialize session state for advanced features
+# Progress and review state are stored per learner so they survive restarts
+learner_name = st.sidebar.text_input("👤 Learner", value=st.session_state.get('learner_name', DEFAULT_LEARNER)).strip() or DEFAULT_LEARNER
+if st.session_state.get('learner_name') != learner_name:
+    # Study time so far belongs to the previous learner
+    if st.session_state.get('unsaved_study_seconds') and 'learner_name' in st.session_state:
+        get_progress_store().record_study(st.session_state.learner_name, st.session_state.unsaved_study_seconds)
+    st.session_state.learner_name = learner_name
+    for key in ('learning_progress', 'favorite_words', 'daily_streak', 'last_study_date', 'study_time',
+                'last_activity', 'unsaved_study_seconds'):
+        st.session_state.pop(key, None)
+
+# Session state mirrors the learner's stored progress (keyed by the words' display case)
+progress_store = get_progress_store()
 if 'learning_progress' not in st.session_state:
-    st.session_state.learning_progress = {}
-if 'favorite_words' not in st.session_state:
-    st.session_state.favorite_words = set()
+    saved_statuses = progress_store.statuses(learner_name)
+    saved_favorites = progress_store.favorites(learner_name)
+    session_words = load_vocabulary_from_file(word_file)
+    st.session_state.learning_progress = {
+        w['word']: saved_statuses[w['word'].lower()] for w in session_words if w['word'].lower() in saved_statuses
+    }
+    st.session_state.favorite_words = {w['word'] for w in session_words if w['word'].lower() in saved_favorites}
 if 'daily_streak' not in st.session_state:
-    st.session_state.daily_streak = 0
-if 'last_study_date' not in st.session_state:
-    st.session_state.last_study_date = None
-if 'study_time' not in st.session_state:
-    st.session_state.study_time = 0
+    learner_summary = progress_store.learner(learner_name)
+    st.session_state.daily_streak = learner_summary['daily_streak']
+    st.session_state.last_study_date = learner_summary['last_study_date']
+    st.session_state.study_time = learner_summary['study_seconds']
 
 # Load sample vocabulary button
 col1, col2, col3 = st.columns(3)
@@ -261,6 +299,7 @@ if select == "🎓 Smart Study":
         pos_filter = st.multiselect("Part of Speech", ["noun", "verb", "adjective", "adverb"], default=["noun", "verb", "adjective", "adverb"])
     with filter_cols[3]:
         show_favorites_only = st.checkbox("❤️ Favorites Only")
+        show_due_only = st.checkbox("📅 Due for Review")
     
     if selected_category:
         all_words = load_vocabulary_from_file(word_file)
@@ -269,6 +308,13 @@ if select == "🎓 Smart Study":
         # Apply advanced filters
         if show_favorites_only:
             filtered_words = [w for w in filtered_words if w['word'] in st.session_state.favorite_words]
+        if show_due_only:
+            # One page of the category's most overdue cards, popped from the learner's due-date heap
+            due_words = [word for word, _ in get_scheduler().next_due(
+                learner_name, n=DUE_PAGE_SIZE, words={w['word'].lower() for w in filtered_words}
+            )]
+            by_word = {w['word'].lower(): w for w in filtered_words}
+            filtered_words = [by_word[word] for word in due_words]
         
         if filtered_words:
             st.info(f"📚 Showing {len(filtered_words)} words")
@@ -304,11 +350,11 @@ if select == "🎓 Smart Study":
                             # Favorite button
                             if entry['word'] in st.session_state.favorite_words:
                                 if st.button("❤️", key=f"unfav_{entry['word']}", help="Remove from favorites"):
-                                    st.session_state.favorite_words.discard(entry['word'])
+                                    set_favorite(entry['word'], False)
                                     st.rerun()
                             else:
                                 if st.button("🤍", key=f"fav_{entry['word']}", help="Add to favorites"):
-                                    st.session_state.favorite_words.add(entry['word'])
+                                    set_favorite(entry['word'], True)
                                     st.rerun()
                         
                         # Expandable sections based on study focus
@@ -360,18 +406,18 @@ if select == "🎓 Smart Study":
                         progress_cols = st.columns(2)
                         with progress_cols[0]:
                             if st.button("😰", key=f"again_{entry['word']}", help="Study again"):
-                                st.session_state.learning_progress[entry['word']] = "again"
-                                st.success("Marked for review!")
+                                next_review = record_review(entry['word'], "again")
+                                st.success(f"Marked for review! Next: {next_review:%b %d}")
                             if st.button("😊", key=f"good_{entry['word']}", help="Good"):
-                                st.session_state.learning_progress[entry['word']] = "good"
-                                st.success("Well done!")
+                                next_review = record_review(entry['word'], "good")
+                                st.success(f"Well done! Next: {next_review:%b %d}")
                         with progress_cols[1]:
                             if st.button("😓", key=f"hard_{entry['word']}", help="Hard"):
-                                st.session_state.learning_progress[entry['word']] = "hard"
-                                st.info("Keep practicing!")
+                                next_review = record_review(entry['word'], "hard")
+                                st.info(f"Keep practicing! Next: {next_review:%b %d}")
                             if st.button("😎", key=f"easy_{entry['word']}", help="Easy"):
-                                st.session_state.learning_progress[entry['word']] = "easy"
-                                st.success("Mastered!")
+                                next_review = record_review(entry['word'], "easy")
+                                st.success(f"Mastered! Next: {next_review:%b %d}")
 
 elif select == "🧠 Memory Palace":
     st.subheader("🧠 Memory Palace - Visual Learning")
@@ -476,10 +522,14 @@ elif select == "🎯 Adaptive Quiz":
                 else:
                     selected_words = random.sample(quiz_words, min(quiz_length, len(quiz_words)))
                 
+                # All meaning options are generated up front in one batched call
+                quiz_plan = QuizIndex(quiz_words).build_quiz(words=selected_words)
+                
                 st.session_state.adaptive_quiz = {
                     'current_question': 0,
                     'score': 0,
                     'questions': selected_words,
+                    'options': [[option['meaning'] for option in item['options']] for item in quiz_plan],
                     'started': True,
                     'answers': []
                 }
@@ -507,11 +557,7 @@ elif select == "🎯 Adaptive Quiz":
                     
                     # Create options
                     correct_answer = current_word['meaning']
-                    other_words = [w for w in quiz_words if w['word'] != current_word['word']]
-                    wrong_options = [w['meaning'] for w in random.sample(other_words, min(3, len(other_words)))]
-                    
-                    options = [correct_answer] + wrong_options
-                    random.shuffle(options)
+                    options = quiz['options'][quiz['current_question']]
                     
                     selected = st.radio("Choose the correct meaning:", options, key=f"q_{quiz['current_question']}")
                     
@@ -646,12 +692,12 @@ elif select == "🔍 Word Explorer":
     search_term = st.text_input("🔎 Search for a word:", placeholder="Enter any word...")
     
     if search_term:
-        all_words = load_vocabulary_from_file(word_file)
-        
-        # Find exact matches and partial matches
-        exact_matches = [w for w in all_words if w['word'].lower() == search_term.lower()]
-        partial_matches = [w for w in all_words if search_term.lower() in w['word'].lower() and w not in exact_matches]
-        meaning_matches = [w for w in all_words if search_term.lower() in w['meaning'].lower() and w not in exact_matches + partial_matches]
+        # Ranked lookup across every level through the shared search index
+        # (exact, prefix, substring and typo-tolerant matches)
+        results = get_search_index().search(search_term, limit=20)
+        exact_matches = [entry for entry, _, match_type in results if match_type == "exact"]
+        partial_matches = [entry for entry, _, match_type in results if match_type in ("prefix", "word", "fuzzy")]
+        meaning_matches = [entry for entry, _, match_type in results if match_type in ("meaning", "phrase")]
         
         if exact_matches:
             st.markdown("### 🎯 Exact Match")
@@ -707,8 +753,9 @@ elif select == "🔍 Word Explorer":
                     st.info(f"💡 Try including the word '{word['word']}' in your sentence.")
             
             with tabs[3]:  # Related
-                # Find words with similar meanings or from same category
-                same_category = [w for w in all_words if w.get('category') == word.get('category') and w['word'] != word['word']]
+                # Other words from the match's level and category (category index, no file read)
+                same_category = [w for w in load_vocabulary_by_category(word['level'], word.get('category'))
+                                 if w['word'] != word['word']]
                 if same_category:
                     st.write(f"**Other {word.get('category', 'similar').title()} Words:**")
                     related_sample = random.sample(same_category, min(5, len(same_category)))
@@ -718,12 +765,12 @@ elif select == "🔍 Word Explorer":
         if partial_matches:
             st.markdown("### 🔍 Partial Matches")
             for word in partial_matches[:3]:
-                st.write(f"• **{word['word']}** - {word['meaning'][:80]}...")
+                st.write(f"• **{word['word']}** (Level {word['level']}) - {word['meaning'][:80]}...")
         
         if meaning_matches:
             st.markdown("### 💭 Meaning Matches")
             for word in meaning_matches[:3]:
-                st.write(f"• **{word['word']}** - {word['meaning'][:80]}...")
+                st.write(f"• **{word['word']}** (Level {word['level']}) - {word['meaning'][:80]}...")
         
         if not (exact_matches or partial_matches or meaning_matches):
             st.info("🤔 No matches found. Try a different search term or add new words to your vocabulary!")
@@ -731,38 +778,36 @@ elif select == "🔍 Word Explorer":
 elif select == "📊 Analytics Dashboard":
     st.subheader("📊 Advanced Learning Analytics")
     
-    all_words = load_vocabulary_from_file(word_file)
+    # Every count on this screen comes from word_file; aggregates are cached until it changes
+    vocab_stats = get_file_stats(word_file, load_vocabulary_from_file)
     
-    if all_words:
+    if vocab_stats.total:
         # Overall metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("📚 Total Vocabulary", len(all_words))
+            st.metric("📚 Total Vocabulary", vocab_stats.total)
+        # Counted with aggregate queries over the learner's (learner, word) rows
+        # (distinct words, so the progress buckets add up to the total above)
+        dashboard = progress_store.dashboard(st.session_state.learner_name, vocab_stats.words())
+        mastered = dashboard["mastered"]
+        needs_review = dashboard["needs_review"]
         with col2:
-            favorites_count = len(st.session_state.favorite_words)
-            st.metric("❤️ Favorite Words", favorites_count)
+            st.metric("❤️ Favorite Words", dashboard["favorites"])
         with col3:
-            mastered = len([w for w, status in st.session_state.learning_progress.items() if status == "easy"])
             st.metric("🌟 Mastered", mastered)
         with col4:
-            needs_review = len([w for w, status in st.session_state.learning_progress.items() if status in ["again", "hard"]])
             st.metric("🔄 Needs Review", needs_review)
         
         # Learning progress visualization
         st.markdown("### 📈 Learning Progress")
         
-        progress_data = {"Not Studied": 0, "Needs Review": 0, "Good": 0, "Mastered": 0}
-        for word in all_words:
-            status = st.session_state.learning_progress.get(word['word'], 'not_studied')
-            if status == 'again' or status == 'hard':
-                progress_data["Needs Review"] += 1
-            elif status == 'good':
-                progress_data["Good"] += 1
-            elif status == 'easy':
-                progress_data["Mastered"] += 1
-            else:
-                progress_data["Not Studied"] += 1
+        progress_data = {
+            "Not Studied": dashboard["not_studied"],
+            "Needs Review": needs_review,
+            "Good": dashboard["good"],
+            "Mastered": mastered
+        }
         
         # Display as metrics
         prog_cols = st.columns(4)
@@ -774,32 +819,23 @@ elif select == "📊 Analytics Dashboard":
         # Category breakdown
         st.markdown("### 📊 Vocabulary by Category & Difficulty")
         
-        category_stats = {}
-        difficulty_stats = {"⭐": 0, "⭐⭐": 0, "⭐⭐⭐": 0}
-        
-        for word in all_words:
-            # Category stats
-            cat = word.get('category', 'Unknown').title()
-            category_stats[cat] = category_stats.get(cat, 0) + 1
-            
-            # Difficulty stats
-            word_data = get_advanced_word_data(word['word'])
-            diff = word_data['difficulty']
-            if diff in difficulty_stats:
-                difficulty_stats[diff] += 1
+        # Only this app's difficulty table is walked
+        category_stats = {category.title(): count for category, count in vocab_stats.by_category.items()}
+        difficulty_counts = vocab_stats.difficulty_counts(ADVANCED_DIFFICULTIES, default="⭐⭐")
+        difficulty_stats = {diff: difficulty_counts.get(diff, 0) for diff in ("⭐", "⭐⭐", "⭐⭐⭐")}
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("**Categories:**")
             for cat, count in category_stats.items():
-                percentage = (count / len(all_words)) * 100
+                percentage = vocab_stats.coverage(count)
                 st.write(f"• {cat}: {count} words ({percentage:.1f}%)")
         
         with col2:
             st.markdown("**Difficulty Levels:**")
             for diff, count in difficulty_stats.items():
-                percentage = (count / len(all_words)) * 100
+                percentage = vocab_stats.coverage(count)
                 st.write(f"• {diff} : {count} words ({percentage:.1f}%)")
         
         # Learning recommendations
@@ -811,7 +847,7 @@ elif select == "📊 Analytics Dashboard":
         if len(st.session_state.favorite_words) == 0:
             st.info("💡 Try marking some words as favorites to create a personalized study list!")
         
-        if mastered > len(all_words) * 0.7:
+        if mastered > vocab_stats.total * 0.7:
             st.success("🌟 Excellent! You've mastered most of your vocabulary. Time to add more words!")
         
         # Export options
@@ -820,19 +856,21 @@ elif select == "📊 Analytics Dashboard":
         
         with export_cols[0]:
             if st.button("📄 Export Favorites"):
-                favorite_words = [w for w in all_words if w['word'] in st.session_state.favorite_words]
+                favorite_words = [w for w in load_vocabulary_from_file(word_file) if w['word'] in st.session_state.favorite_words]
                 if favorite_words:
                     export_text = "\n".join([f"{w['word']} | {w['meaning']} | {w['phrase']}" for w in favorite_words])
                     st.download_button("Download Favorites", export_text, "favorites.txt")
         
         with export_cols[1]:
             if st.button("📊 Export Progress"):
-                progress_text = json.dumps(st.session_state.learning_progress, indent=2)
+                progress_text = json.dumps(progress_store.export(st.session_state.learner_name), indent=2)
                 st.download_button("Download Progress", progress_text, "progress.json")
         
         with export_cols[2]:
             if st.button("🔄 Reset All Data"):
                 if st.button("⚠️ Confirm Reset", type="secondary"):
+                    get_scheduler().reset(st.session_state.learner_name)
+                    progress_store.reset(st.session_state.learner_name)
                     st.session_state.learning_progress = {}
                     st.session_state.favorite_words = set()
                     st.session_state.daily_streak = 0
@@ -909,13 +947,23 @@ elif select == "⚙️ Learning Settings":
         st.success("✅ Settings saved successfully!")
         st.json(settings)
 
-# Update study streak
-if st.session_state.last_study_date != datetime.now().date():
-    if st.session_state.last_study_date == datetime.now().date() - timedelta(days=1):
-        st.session_state.daily_streak += 1
-    else:
-        st.session_state.daily_streak = 1
-    st.session_state.last_study_date = datetime.now().date()
+# Update study streak and study time (time between reruns, capped so idle tabs don't count).
+# Study time is collected in the session and handed to the store on a new day or every
+# STUDY_TIME_FLUSH_SECONDS, not on every rerun
+now = datetime.now()
+last_activity = st.session_state.get('last_activity')
+study_seconds = min((now - last_activity).total_seconds(), 300) if last_activity else 0
+st.session_state.last_activity = now
+st.session_state.study_time += study_seconds
+st.session_state.unsaved_study_seconds = st.session_state.get('unsaved_study_seconds', 0) + study_seconds
+new_study_day = st.session_state.last_study_date != now.date()
+if new_study_day or st.session_state.unsaved_study_seconds >= STUDY_TIME_FLUSH_SECONDS:
+    progress_store.record_study(st.session_state.learner_name, st.session_state.unsaved_study_seconds, now.date())
+    st.session_state.unsaved_study_seconds = 0
+    if new_study_day:
+        learner_summary = progress_store.learner(st.session_state.learner_name)
+        st.session_state.daily_streak = learner_summary['daily_streak']
+        st.session_state.last_study_date = learner_summary['last_study_date']
 
 # Footer
 st.markdown("---")
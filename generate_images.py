@@ -1,17 +1,256 @@
 import json
 import os
+import random
+import asyncio
+import hashlib
 import requests
 import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
 from PIL import Image
 import io
 
-def generate_images_with_dalle(api_key=None, max_images=None):
+from utils.word_journal import atomic_write_json
+
+# Point at a compatible server (or a local stub) with --api-base / OPENAI_API_BASE
+DEFAULT_API_BASE = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
+
+DEFAULT_CONCURRENCY = 4
+# Sustained generation requests per second; bursts of up to DEFAULT_BURST are allowed
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 4
+
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Which prompt produced each generated image, so re-runs resume instead of regenerating
+GENERATED_STATE_FILE = os.path.join(".cache", "generated_images.json")
+# Output signatures of rendered placeholders (these are replaced by real images)
+PLACEHOLDER_STATE_FILE = os.path.join(".cache", "placeholder_state.json")
+
+
+class TokenBucket:
+    """
+    Async token bucket limiting how often requests start
+
+    Tokens refill at `rate` per second up to `capacity`; acquire() waits
+    until a token is available. Waiters are served in order.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for and take one token"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _create_session(pool_size):
+    """requests session whose connection pool matches the concurrency"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _retry_delay(attempt, response=None):
+    """Backoff before the next attempt, honouring a numeric Retry-After header"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(BACKOFF_MAX, float(retry_after))
+            except ValueError:
+                pass
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+async def _request_with_retry(session, method, url, bucket=None, max_retries=MAX_RETRIES, **kwargs):
+    """
+    Send a request on a worker thread, retrying 429/5xx and connection errors
+
+    Args:
+        session (requests.Session): Pooled session
+        method (str): HTTP method
+        url (str): Request URL
+        bucket (TokenBucket): Rate limiter consulted before every attempt (optional)
+        max_retries (int): Retries after the first attempt
+
+    Returns:
+        requests.Response: The last response (may still be an error status)
+    """
+    for attempt in range(max_retries + 1):
+        if bucket:
+            await bucket.acquire()
+        try:
+            response = await asyncio.to_thread(session.request, method, url, **kwargs)
+        except requests.RequestException:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+
+def _prompt_digest(prompt_data):
+    return hashlib.sha256(prompt_data['prompt'].encode('utf-8')).hexdigest()
+
+
+def _load_state(state_file):
+    """Read a {path: digest} state file, empty if missing or unreadable"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state_file, state):
+    directory = os.path.dirname(state_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    atomic_write_json(state_file, state)
+
+
+def _write_image(file_path, content):
+    """Write image bytes atomically so an interrupted run never leaves a partial file"""
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{file_path}.part"
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, file_path)
+
+
+async def _generate_one(session, bucket, semaphore, prompt_data, headers, api_base, position, total):
+    """Generate and download one image; returns (prompt_data, True on success)"""
+    return prompt_data, await _generate_image(session, bucket, semaphore, prompt_data, headers,
+                                              api_base, position, total)
+
+
+async def _generate_image(session, bucket, semaphore, prompt_data, headers, api_base, position, total):
+    async with semaphore:
+        print(f"Generating image {position}/{total}: {prompt_data['word']}")
+        data = {
+            "model": "dall-e-3",
+            "prompt": prompt_data['prompt'],
+            "n": 1,
+            "size": "1024x1024",
+            "quality": "standard",
+            "response_format": "url"
+        }
+        try:
+            response = await _request_with_retry(session, "POST", f"{api_base}/images/generations",
+                                                 bucket=bucket, headers=headers, json=data, timeout=60)
+            if response.status_code != 200:
+                print(f"✗ API error for {prompt_data['word']}: {response.status_code}")
+                print(f"Response: {response.text}")
+                return False
+
+            image_url = response.json()['data'][0]['url']
+            img_response = await _request_with_retry(session, "GET", image_url, timeout=30)
+            if img_response.status_code != 200:
+                print(f"✗ Failed to download image for {prompt_data['word']}")
+                return False
+
+            await asyncio.to_thread(_write_image, prompt_data['media_path'], img_response.content)
+            print(f"✓ Saved: {prompt_data['media_path']}")
+            return True
+        except Exception as e:
+            print(f"✗ Error generating image for {prompt_data['word']}: {str(e)}")
+            return False
+
+
+async def _generate_all(prompts, api_key, api_base, concurrency, rate, burst, force, state_file,
+                        placeholder_state_file=PLACEHOLDER_STATE_FILE):
+    generated = _load_state(state_file)
+    placeholders = _load_state(placeholder_state_file)
+
+    # Resume: an existing image counts as done unless it is a rendered placeholder;
+    # images made before the state file existed are recorded now (seeded)
+    pending = []
+    seeded = False
+    for prompt_data in prompts:
+        path = prompt_data['media_path']
+        if force or not os.path.exists(path):
+            pending.append(prompt_data)
+        elif path in generated:
+            continue
+        elif path in placeholders:
+            pending.append(prompt_data)
+        else:
+            generated[path] = _prompt_digest(prompt_data)
+            seeded = True
+    skipped = len(prompts) - len(pending)
+    if seeded:
+        _save_state(state_file, generated)
+
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json'
+    }
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+    session = _create_session(concurrency)
+
+    success_count = 0
+    try:
+        tasks = [_generate_one(session, bucket, semaphore, prompt_data, headers,
+                               api_base.rstrip('/'), i, len(pending))
+                 for i, prompt_data in enumerate(pending, 1)]
+        for next_done in asyncio.as_completed(tasks):
+            prompt_data, ok = await next_done
+            if ok:
+                # Saved per image so a killed run still resumes where it stopped
+                generated[prompt_data['media_path']] = _prompt_digest(prompt_data)
+                _save_state(state_file, generated)
+                success_count += 1
+    finally:
+        session.close()
+
+    return success_count, len(pending) - success_count, skipped
+
+
+def generate_images_with_dalle(api_key=None, max_images=None, api_base=DEFAULT_API_BASE,
+                               concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                               force=False, state_file=GENERATED_STATE_FILE):
     """
     Generate images using OpenAI's DALL-E API
     
+    Prompts run concurrently over a pooled HTTP session, limited by a
+    semaphore and a token bucket; 429/5xx responses are retried with
+    exponential backoff. Images that already exist are skipped (only
+    rendered placeholders are replaced), so an interrupted run can simply
+    be restarted; use force to regenerate.
+    
     Args:
         api_key (str): Your OpenAI API key
         max_images (int): Maximum number of images to generate (None for all)
+        api_base (str): Base URL of the images API
+        concurrency (int): Maximum requests in flight
+        rate (float): Generation requests started per second
+        burst (int): Requests that may start at once after an idle period
+        force (bool): Regenerate images that already exist
+        state_file (str): Where generated-image prompts are remembered
     """
     
     if not api_key:
@@ -27,138 +266,179 @@ def generate_images_with_dalle(api_key=None, max_images=None):
     if max_images:
         prompts = prompts[:max_images]
     
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
-    
-    success_count = 0
-    error_count = 0
-    
-    for i, prompt_data in enumerate(prompts, 1):
-        try:
-            print(f"Generating image {i}/{len(prompts)}: {prompt_data['word']}")
-            
-            # Prepare the request
-            data = {
-                "model": "dall-e-3",
-                "prompt": prompt_data['prompt'],
-                "n": 1,
-                "size": "1024x1024",
-                "quality": "standard",
-                "response_format": "url"
-            }
-            
-            # Make the API request
-            response = requests.post(
-                'https://api.openai.com/v1/images/generations',
-                headers=headers,
-                json=data,
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                image_url = result['data'][0]['url']
-                
-                # Download the image
-                img_response = requests.get(image_url, timeout=30)
-                if img_response.status_code == 200:
-                    # Ensure directory exists
-                    os.makedirs(os.path.dirname(prompt_data['media_path']), exist_ok=True)
-                    
-                    # Save the image
-                    with open(prompt_data['media_path'], 'wb') as f:
-                        f.write(img_response.content)
-                    
-                    success_count += 1
-                    print(f"✓ Saved: {prompt_data['media_path']}")
-                else:
-                    print(f"✗ Failed to download image for {prompt_data['word']}")
-                    error_count += 1
-            else:
-                print(f"✗ API error for {prompt_data['word']}: {response.status_code}")
-                print(f"Response: {response.text}")
-                error_count += 1
-            
-            # Rate limiting - wait between requests
-            time.sleep(1)
-            
-        except Exception as e:
-            print(f"✗ Error generating image for {prompt_data['word']}: {str(e)}")
-            error_count += 1
-            continue
+    success_count, error_count, skipped_count = asyncio.run(
+        _generate_all(prompts, api_key, api_base, concurrency, rate, burst, force, state_file)
+    )
     
     print(f"\nGeneration complete!")
     print(f"Success: {success_count}")
+    print(f"Skipped (already generated): {skipped_count}")
     print(f"Errors: {error_count}")
     print(f"Total: {len(prompts)}")
 
-def generate_placeholder_images():
+# Placeholder background per category
+CATEGORY_COLORS = {
+    'general': (70, 130, 180),     # Steel Blue
+    'science': (34, 139, 34),      # Forest Green
+    'business': (178, 34, 34),     # Fire Brick
+    'literature': (128, 0, 128),   # Purple
+    'travel': (255, 140, 0),       # Dark Orange
+    'history': (139, 69, 19),      # Saddle Brown
+    'geography': (0, 128, 128),    # Teal
+    'health': (220, 20, 60)        # Crimson
+}
+DEFAULT_COLOR = (128, 128, 128)
+
+# The first size is written to media_path; others get a _WxH suffix
+PLACEHOLDER_SIZES = [(800, 600)]
+PLACEHOLDER_FORMATS = ["jpeg"]
+FORMAT_EXTENSIONS = {"jpeg": ".jpg", "webp": ".webp"}
+FORMAT_OPTIONS = {"jpeg": {"quality": 85}, "webp": {"quality": 80, "method": 4}}
+
+# Bump when the drawing code changes so existing placeholders are re-rendered
+PLACEHOLDER_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _load_font(size):
+    """Load a font once per process (worker) and size"""
+    from PIL import ImageFont
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _placeholder_targets(prompt_data, sizes, formats):
+    """Return the (path, size, format) outputs for one prompt"""
+    stem, _ = os.path.splitext(prompt_data['media_path'])
+    targets = []
+    for index, (width, height) in enumerate(sizes):
+        suffix = "" if index == 0 else f"_{width}x{height}"
+        for fmt in formats:
+            targets.append((f"{stem}{suffix}{FORMAT_EXTENSIONS[fmt]}", (width, height), fmt))
+    return targets
+
+
+def _placeholder_signature(prompt_data, size, fmt):
+    """Digest of everything that affects a placeholder's pixels"""
+    key = json.dumps([prompt_data['word'], prompt_data['category'], list(size), fmt, PLACEHOLDER_VERSION])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _render_placeholder(job):
+    """
+    Worker: draw one word's placeholder at each requested size and save every format
+
+    Args:
+        job (tuple): (word, category, targets) with targets as (path, size, format)
+
+    Returns:
+        tuple: (word, written paths, error message or None)
+    """
+    from PIL import Image, ImageDraw
+    word, category, targets = job
+    written = []
+    try:
+        color = CATEGORY_COLORS.get(category, DEFAULT_COLOR)
+        rendered = {}
+        for path, (width, height), fmt in targets:
+            img = rendered.get((width, height))
+            if img is None:
+                # Fonts and layout scale with the 800px-wide original
+                scale = width / 800
+                font = _load_font(max(8, round(40 * scale)))
+                small_font = _load_font(max(8, round(20 * scale)))
+                
+                img = Image.new('RGB', (width, height), color)
+                draw = ImageDraw.Draw(img)
+                
+                # Draw category
+                margin = round(50 * scale)
+                draw.text((margin, margin), category.upper(), fill='white', font=small_font)
+                
+                # Draw word (centered)
+                bbox = draw.textbbox((0, 0), word, font=font)
+                text_width = bbox[2] - bbox[0]
+                text_height = bbox[3] - bbox[1]
+                draw.text(((width - text_width) // 2, (height - text_height) // 2), word, fill='white', font=font)
+                rendered[(width, height)] = img
+            
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # Save under a temp name so readers never see a half-written image
+            temp_path = f"{path}.part"
+            img.save(temp_path, fmt.upper(), **FORMAT_OPTIONS[fmt])
+            os.replace(temp_path, path)
+            written.append(path)
+        return word, written, None
+    except Exception as e:
+        return word, written, str(e)
+
+
+def generate_placeholder_images(sizes=None, formats=None, workers=None, force=False,
+                                state_file=PLACEHOLDER_STATE_FILE):
     """
     Generate placeholder images for testing (colored rectangles with text)
+    
+    Words are rendered in parallel on a process pool, each worker loading its
+    fonts once. Outputs whose word, category, size and format are unchanged
+    since the last run are skipped, as are images generated by the API.
+    
+    Args:
+        sizes (list): (width, height) pairs; the first is saved at media_path
+        formats (list): Any of "jpeg" and "webp"
+        workers (int): Worker processes (defaults to the CPU count)
+        force (bool): Re-render even up-to-date placeholders
+        state_file (str): Where placeholder signatures are remembered
     """
     print("Generating placeholder images...")
+    sizes = sizes or PLACEHOLDER_SIZES
+    formats = formats or PLACEHOLDER_FORMATS
     
     with open('image_generation_prompts.json', 'r', encoding='utf-8') as f:
         prompts = json.load(f)
     
-    # Create placeholder images
-    from PIL import Image, ImageDraw, ImageFont
+    state = _load_state(state_file)
+    generated = _load_state(GENERATED_STATE_FILE)
     
+    jobs = []
+    signatures = {}
+    skipped = 0
     for prompt_data in prompts:
-        try:
-            # Create a colored background
-            colors = {
-                'general': (70, 130, 180),     # Steel Blue
-                'science': (34, 139, 34),      # Forest Green
-                'business': (178, 34, 34),     # Fire Brick
-                'literature': (128, 0, 128),   # Purple
-                'travel': (255, 140, 0),       # Dark Orange
-                'history': (139, 69, 19),      # Saddle Brown
-                'geography': (0, 128, 128),    # Teal
-                'health': (220, 20, 60)        # Crimson
-            }
-            
-            color = colors.get(prompt_data['category'], (128, 128, 128))
-            
-            # Create image
-            img = Image.new('RGB', (800, 600), color)
-            draw = ImageDraw.Draw(img)
-            
-            # Try to use a default font
-            try:
-                font = ImageFont.truetype("arial.ttf", 40)
-                small_font = ImageFont.truetype("arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
-                small_font = ImageFont.load_default()
-            
-            # Add text
-            word = prompt_data['word']
-            category = prompt_data['category'].upper()
-            
-            # Draw category
-            draw.text((50, 50), category, fill='white', font=small_font)
-            
-            # Draw word (centered)
-            bbox = draw.textbbox((0, 0), word, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            x = (800 - text_width) // 2
-            y = (600 - text_height) // 2
-            draw.text((x, y), word, fill='white', font=font)
-            
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(prompt_data['media_path']), exist_ok=True)
-            
-            # Save image
-            img.save(prompt_data['media_path'], 'JPEG', quality=85)
-            
-        except Exception as e:
-            print(f"Error creating placeholder for {prompt_data['word']}: {str(e)}")
+        pending = []
+        for path, size, fmt in _placeholder_targets(prompt_data, sizes, formats):
+            signature = _placeholder_signature(prompt_data, size, fmt)
+            # Never overwrite a real generated image with a placeholder
+            if path in generated and os.path.exists(path):
+                skipped += 1
+            elif not force and state.get(path) == signature and os.path.exists(path):
+                skipped += 1
+            else:
+                pending.append((path, size, fmt))
+                signatures[path] = signature
+        if pending:
+            jobs.append((prompt_data['word'], prompt_data['category'], pending))
+    
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        # Not worth starting a pool
+        results = [_render_placeholder(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_render_placeholder, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    
+    rendered = 0
+    for word, written, error in results:
+        for path in written:
+            state[path] = signatures[path]
+        rendered += len(written)
+        if error:
+            print(f"Error creating placeholder for {word}: {error}")
+    
+    if rendered:
+        _save_state(state_file, state)
     
-    print(f"Generated {len(prompts)} placeholder images")
+    print(f"Generated {rendered} placeholder images ({skipped} up to date)")
 
 def update_original_word_pools():
     """
@@ -182,7 +462,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate vocabulary learning images')
     parser.add_argument('--api-key', help='OpenAI API key for DALL-E')
     parser.add_argument('--max-images', type=int, help='Maximum number of images to generate')
+    parser.add_argument('--api-base', default=DEFAULT_API_BASE, help='Base URL of the images API')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Maximum requests in flight')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='Generation requests per second')
+    parser.add_argument('--force', action='store_true', help='Regenerate images that already exist')
     parser.add_argument('--placeholder', action='store_true', help='Generate placeholder images instead')
+    parser.add_argument('--sizes', nargs='+', default=None, help='Placeholder sizes as WxH (first is the main image)')
+    parser.add_argument('--webp', action='store_true', help='Also write WebP placeholders')
+    parser.add_argument('--workers', type=int, help='Placeholder worker processes')
     parser.add_argument('--update-json', action='store_true', help='Update original word_pools.json')
     
     args = parser.parse_args()
@@ -190,9 +477,12 @@ if __name__ == "__main__":
     if args.update_json:
         update_original_word_pools()
     elif args.placeholder:
-        generate_placeholder_images()
+        sizes = [tuple(int(v) for v in size.lower().split('x')) for size in args.sizes] if args.sizes else None
+        generate_placeholder_images(sizes=sizes, formats=['jpeg', 'webp'] if args.webp else None,
+                                    workers=args.workers, force=args.force)
     else:
-        generate_images_with_dalle(args.api_key, args.max_images)
+        generate_images_with_dalle(args.api_key, args.max_images, api_base=args.api_base,
+                                   concurrency=args.concurrency, rate=args.rate, force=args.force)
     
     print("\nUsage examples:")
     print("1. Generate placeholder images: python generate_images.py --placeholder")
@@ -2,6 +2,8 @@ import json
 import os
 import re
 
+from utils.media_store import get_media_store, word_id, migrate_to_store
+
 def sanitize_filename(text):
     """Convert text to a safe filename"""
     # Remove or replace unsafe characters
@@ -29,14 +31,18 @@ def update_word_pools_with_media():
             os.makedirs(category_dir)
     
     # Update each word entry with media field
+    store = get_media_store()
     for category, words in word_pools.items():
         for word_entry in words:
             word = word_entry['word']
             phrase = word_entry['phrase']
             
-            # Generate filename based on word and phrase
-            filename = f"{sanitize_filename(word)}_{sanitize_filename(phrase[:50])}.jpg"
-            media_path = f"media/{category}/{filename}"
+            # Words already in the media store keep their blob, whatever their phrase says now
+            media_path = store.blob_for(word_id(word, category))
+            if not media_path:
+                # Generate filename based on word and phrase (target for image generation)
+                filename = f"{sanitize_filename(word)}_{sanitize_filename(phrase[:50])}.jpg"
+                media_path = f"media/{category}/{filename}"
             
             # Add media field
             word_entry['media'] = media_path
@@ -90,7 +96,23 @@ def generate_image_generation_prompts():
     
     return prompts
 
+def consolidate_media():
+    """Move existing media into the content-addressed store and drop unreferenced blobs"""
+    result = migrate_to_store()
+    print(f"Stored {result['files']} media files as {result['blobs']} blobs "
+          f"({result['entries']} entries now point at the store)")
+    
+    collected = get_media_store().gc()
+    print(f"Removed {len(collected['removed'])} unreferenced blobs ({collected['bytes'] / 1024:.1f} KB freed)")
+    return result
+
 if __name__ == "__main__":
+    import sys
+    if "--consolidate" in sys.argv:
+        print("Moving media into the content-addressed store...")
+        consolidate_media()
+        sys.exit(0)
+    
     print("Updating word pools with media structure...")
     word_pools = update_word_pools_with_media()
     
@@ -101,4 +123,5 @@ if __name__ == "__main__":
     print("\nNext steps:")
     print("1. Use the prompts in 'image_generation_prompts.json' with an AI image generator")
     print("2. Save generated images to the corresponding media paths")
-    print("3. Replace 'word_pools.json' with 'word_pools_with_media.json'")
\ No newline at end of file
+    print("3. Replace 'word_pools.json' with 'word_pools_with_media.json'")
+    print("4. Run 'python generate_media_structure.py --consolidate' to deduplicate media files")
\ No newline at end of file
@@ -1,6 +1,9 @@
 import sqlite3
 import json
 
+from utils.sqlite_backend import get_sqlite_backend
+from utils.vocabulary_store import LEVEL_FILES
+
 DB_NAME = 'words.db'
 
 def connect():
@@ -68,6 +71,14 @@ def delete_word(category):
         conn.execute(f'DELETE FROM {category} WHERE id = ?', (word_id,))
     print(f"🗑️ Deleted word ID {word_id} from category '{category}'.")
 
+def import_levels():
+    """Import level1-3.json into the normalized vocabulary database"""
+    backend = get_sqlite_backend()
+    counts = backend.import_json_levels(LEVEL_FILES)
+    for level, count in counts.items():
+        print(f"📥 Imported {count} words into level {level} ({backend.db_file}).")
+    print("Set VOCAB_STORAGE_BACKEND=sqlite to serve the apps from the database.")
+
 def main():
     print("📚 Word Manager CLI")
     while True:
@@ -77,11 +88,15 @@ def main():
         print("3. Update word")
         print("4. Delete word")
         print("5. Exit")
+        print("6. Import level JSON files into the vocabulary database")
 
-        choice = input("Enter choice (1-5): ")
+        choice = input("Enter choice (1-6): ")
         if choice == '5':
             print("👋 Goodbye!")
             break
+        if choice == '6':
+            import_levels()
+            continue
 
         category = input("Enter category (e.g., general, science, business): ")
 
@@ -2,14 +2,15 @@
 JSON to Excel Converter for Vocabulary Builder
 Converts vocabulary JSON files to Excel format and vice versa
 """
-import json
-import pandas as pd
 import os
-from datetime import datetime
+import time
+
+from utils.conversion import convert_file, default_output
+from utils.batch_conversion import batch_convert, print_batch_report
 
 class VocabularyConverter:
     def __init__(self):
-        self.supported_formats = ['.json', '.xlsx', '.xls']
+        self.supported_formats = ['.json', '.xlsx']
     
     def json_to_excel(self, json_file, excel_file=None):
         """
@@ -25,55 +26,14 @@ class VocabularyConverter:
         try:
             # Generate Excel filename if not provided
             if excel_file is None:
-                base_name = os.path.splitext(json_file)[0]
-                excel_file = f"{base_name}.xlsx"
-            
-            # Load JSON data
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Convert to flat structure for Excel
-            rows = []
-            for category, words in data.items():
-                for word_entry in words:
-                    # Handle expressions list - join with semicolon
-                    expressions = word_entry.get('expressions', [])
-                    expressions_str = '; '.join(expressions) if expressions else ''
-                    
-                    row = {
-                        'Category': category,
-                        'Word': word_entry.get('word', ''),
-                        'Meaning': word_entry.get('meaning', ''),
-                        'Phrase': word_entry.get('phrase', ''),
-                        'Expressions': expressions_str,
-                        'Media': word_entry.get('video', word_entry.get('media', ''))  # Handle both 'video' and 'media' fields
-                    }
-                    rows.append(row)
+                excel_file = default_output(json_file, '.xlsx')
             
-            # Create DataFrame
-            df = pd.DataFrame(rows)
-            
-            # Save to Excel with formatting
-            with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Vocabulary', index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets['Vocabulary']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column = [cell for cell in column]
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                    worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
+            # Rows stream from the JSON reader into a write-only workbook
+            result = convert_file(json_file, excel_file)
             
             print(f"✅ Successfully converted {json_file} to {excel_file}")
-            print(f"📊 Total words converted: {len(rows)}")
-            print(f"📂 Categories: {list(data.keys())}")
+            print(f"📊 Total words converted: {result['words']}")
+            print(f"📂 Categories: {result['categories']}")
             
             return excel_file
             
@@ -95,45 +55,14 @@ class VocabularyConverter:
         try:
             # Generate JSON filename if not provided
             if json_file is None:
-                base_name = os.path.splitext(excel_file)[0]
-                json_file = f"{base_name}.json"
-            
-            # Read Excel file
-            df = pd.read_excel(excel_file, sheet_name='Vocabulary')
-            
-            # Convert to nested JSON structure
-            data = {}
+                json_file = default_output(excel_file, '.json')
             
-            for _, row in df.iterrows():
-                category = row.get('Category', 'general').lower()
-                
-                # Parse expressions back to list
-                expressions_str = row.get('Expressions', '')
-                expressions = []
-                if expressions_str and pd.notna(expressions_str):
-                    expressions = [expr.strip() for expr in str(expressions_str).split(';') if expr.strip()]
-                
-                word_entry = {
-                    'word': str(row.get('Word', '')),
-                    'meaning': str(row.get('Meaning', '')),
-                    'phrase': str(row.get('Phrase', '')),
-                    'expressions': expressions,
-                    'video': str(row.get('Media', '')) if pd.notna(row.get('Media')) else ''
-                }
-                
-                # Initialize category if it doesn't exist
-                if category not in data:
-                    data[category] = []
-                
-                data[category].append(word_entry)
-            
-            # Save to JSON
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Read-only worksheet rows are written to the JSON file incrementally
+            result = convert_file(excel_file, json_file)
             
             print(f"✅ Successfully converted {excel_file} to {json_file}")
-            print(f"📊 Total words converted: {len(df)}")
-            print(f"📂 Categories: {list(data.keys())}")
+            print(f"📊 Total words converted: {result['words']}")
+            print(f"📂 Categories: {result['categories']}")
             
             return json_file
             
@@ -156,38 +85,47 @@ class VocabularyConverter:
         
         if input_ext == '.json':
             return self.json_to_excel(input_file, output_file)
-        elif input_ext in ['.xlsx', '.xls']:
+        elif input_ext == '.xlsx':
             return self.excel_to_json(input_file, output_file)
         else:
             print(f"❌ Unsupported file format: {input_ext}")
             print(f"📝 Supported formats: {self.supported_formats}")
             return None
     
-    def batch_convert(self, directory, input_format, output_format):
+    def batch_convert(self, directory, input_format, output_format, workers=None, force=False):
         """
         Convert all files of a specific format in a directory
         
+        Files are converted in parallel; outputs whose input is unchanged
+        since the last run are skipped.
+        
         Args:
             directory (str): Directory containing files
-            input_format (str): Input format (.json, .xlsx, .xls)
-            output_format (str): Output format (.json, .xlsx, .xls)
+            input_format (str): Input format (.json, .xlsx)
+            output_format (str): Output format (.json, .xlsx)
+            workers (int): Worker processes (defaults to the CPU count)
+            force (bool): Re-convert even unchanged files
+            
+        Returns:
+            list: Paths of converted or up-to-date files
         """
-        converted_files = []
+        jobs = []
         
-        for filename in os.listdir(directory):
+        for filename in sorted(os.listdir(directory)):
             if filename.lower().endswith(input_format):
                 input_path = os.path.join(directory, filename)
                 base_name = os.path.splitext(filename)[0]
                 output_filename = f"{base_name}{output_format}"
                 output_path = os.path.join(directory, output_filename)
-                
-                print(f"\n🔄 Converting {filename}...")
-                result = self.convert_file(input_path, output_path)
-                if result:
-                    converted_files.append(result)
+                jobs.append((input_path, output_path))
+        
+        started = time.perf_counter()
+        results = batch_convert(jobs, workers=workers, force=force)
+        print_batch_report(results, time.perf_counter() - started)
         
         print(f"\n✅ Batch conversion complete!")
-        print(f"📁 Converted {len(converted_files)} files")
+        converted_files = [result['output'] for result in results if result['status'] != 'failed']
+        print(f"📁 {len(converted_files)} files up to date")
         return converted_files
 
 def main():
@@ -235,8 +173,8 @@ def main():
         
         elif choice == '4':
             directory = input("Enter directory path: ").strip()
-            input_format = input("Enter input format (.json, .xlsx, .xls): ").strip()
-            output_format = input("Enter output format (.json, .xlsx, .xls): ").strip()
+            input_format = input("Enter input format (.json, .xlsx): ").strip()
+            output_format = input("Enter output format (.json, .xlsx): ").strip()
             converter.batch_convert(directory, input_format, output_format)
         
         elif choice == '5':
@@ -3,8 +3,6 @@ Main utility functions for vocabulary builder applications
 Contains reusable functions that can be used across different apps
 """
 
-import pyttsx3
-from gtts import gTTS
 import io
 import tempfile
 import os
@@ -13,6 +11,14 @@ import json
 import random
 random.seed(42)
 
+from utils.vocabulary_store import get_vocabulary_store, STORAGE_BACKEND
+from utils.sqlite_backend import get_sqlite_backend
+from utils.audio_cache import get_audio_cache
+from utils.tts_service import get_audio_file
+from utils.stats_cache import get_level_stats
+# Shared with the import path; re-exported for the apps
+from utils.validation import validate_word_entry
+
 def load_word_pools(level=1):
     """
     Load word pools from a level-specific JSON file
@@ -23,10 +29,16 @@ def load_word_pools(level=1):
     Returns:
         dict: Dictionary containing word pools for each category
     """
+    if STORAGE_BACKEND == "sqlite":
+        return get_sqlite_backend().load_word_pools(level)
+    
     json_file = f"level{level}.json"
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Served from the shared in-memory store; re-parsed only when the file changes
+        word_pools = get_vocabulary_store().word_pools(level)
+        if word_pools is None:
+            raise FileNotFoundError(json_file)
+        return word_pools
     except FileNotFoundError:
         print(f"Error: {json_file} not found")
         # Fallback to word_pools.json if level file doesn't exist
@@ -60,89 +72,16 @@ def create_audio_file(text, filename, is_phrase=False, speed="normal"):
     
     Args:
         text (str): Text to convert to speech
-        filename (str): Name for the temporary audio file
+        filename (str): Kept for compatibility; clips are named by their cache key
         is_phrase (bool): Whether the text is a phrase (affects speech rate)
         speed (str): Speed setting - "normal", "0.9", or "0.8"
         
     Returns:
         str or None: Path to the created audio file, or None if failed
     """
-    # Detect language first
-    detected_language = detect_language(text)
-    
-    # Only use pyttsx3 for English text, use gTTS for other languages
-    if detected_language == 'en':
-        # Try pyttsx3 first (for local development with English)
-        try:
-            engine = pyttsx3.init()
-            
-            # Get available voices
-            voices = engine.getProperty('voices')
-            
-            # Try to find an American English voice
-            american_voice = None
-            for voice in voices:
-                # Look for American English voices (common identifiers)
-                if voice.id and any(identifier in voice.id.lower() for identifier in ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']):
-                    american_voice = voice.id
-                    break
-                # Fallback: look for any English voice
-                elif voice.id and 'en' in voice.id.lower():
-                    american_voice = voice.id
-            
-            # Set the American English voice if found
-            if american_voice:
-                engine.setProperty('voice', american_voice)
-            
-            # Base speech rates
-            base_word_rate = 160
-            base_phrase_rate = 140
-            
-            # Apply speed multiplier
-            speed_multipliers = {
-                "normal": 1.0,
-                "0.9": 0.9,
-                "0.8": 0.8
-            }
-            
-            multiplier = speed_multipliers.get(speed, 1.0)
-            
-            # Adjust settings for phrases vs single words with speed options
-            if is_phrase:
-                final_rate = int(base_phrase_rate * multiplier)
-            else:
-                final_rate = int(base_word_rate * multiplier)
-            
-            engine.setProperty('rate', final_rate)
-            engine.setProperty('volume', 0.9)
-            
-            # Create temporary file path
-            temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
-            engine.save_to_file(text, temp_file)
-            engine.runAndWait()
-            return temp_file
-            
-        except Exception as e:
-            print(f"pyttsx3 failed ({e}), trying gTTS for cloud compatibility...")
-    
-    # Use gTTS for non-English languages or if pyttsx3 failed
-    try:
-        # Adjust speed for gTTS (it only has slow/normal)
-        use_slow_speech = speed in ["0.9", "0.8"] or is_phrase
-        
-        # Create TTS object
-        tts = gTTS(text=text, lang=detected_language, slow=use_slow_speech)
-        print(f"Detected language: {detected_language} for text: '{text}'")
-        # Create temporary file path (MP3 format for gTTS)
-        temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.mp3")
-        tts.save(temp_file)
-        
-        print(f"Created audio file using gTTS: {temp_file}")
-        return temp_file
-        
-    except Exception as e2:
-        print(f"gTTS failed: {e2}")
-        return None
+    # Rendered on the shared TTS service's bounded pool (utils/tts_service.py);
+    # identical in-flight requests from concurrent sessions share one job
+    return get_audio_file(text, is_phrase=is_phrase, speed=speed)
 
 
 def load_vocabulary_from_file(file_path):
@@ -214,54 +153,28 @@ def filter_words_by_category(word_list, category):
     return [word for word in word_list if word.get('category', '').lower() == category.lower()]
 
 
-def get_category_statistics(word_list):
+def get_category_statistics(word_list=None, level=None):
     """
     Get statistics about words in each category
     
     Args:
         word_list (list): List of word dictionaries
+        level (int or str): Vocabulary level to read from the statistics cache
+            instead of counting word_list (optional)
         
     Returns:
         dict: Dictionary with category names as keys and word counts as values
     """
+    if level is not None:
+        return dict(get_level_stats(level).by_category)
+
     category_stats = {}
-    for word in word_list:
+    for word in word_list or []:
         category = word.get('category', 'Unknown').lower()
         category_stats[category] = category_stats.get(category, 0) + 1
     return category_stats
 
 
-def validate_word_entry(word, meaning, phrase="", category="general"):
-    """
-    Validate word entry data
-    
-    Args:
-        word (str): The vocabulary word
-        meaning (str): The word's meaning
-        phrase (str): Example phrase (optional)
-        category (str): Word category
-        
-    Returns:
-        tuple: (is_valid, error_message)
-    """
-    if not word or not word.strip():
-        return False, "Word cannot be empty"
-    
-    if not meaning or not meaning.strip():
-        return False, "Meaning cannot be empty"
-    
-    if len(word.strip()) > 100:
-        return False, "Word is too long (max 100 characters)"
-    
-    if len(meaning.strip()) > 500:
-        return False, "Meaning is too long (max 500 characters)"
-    
-    if phrase and len(phrase.strip()) > 500:
-        return False, "Phrase is too long (max 500 characters)"
-    
-    return True, ""
-
-
 def cleanup_audio_file(file_path):
     """
     Clean up temporary audio file
@@ -270,7 +183,8 @@ def cleanup_audio_file(file_path):
         file_path (str): Path to the audio file to delete
     """
     try:
-        if file_path and os.path.exists(file_path):
+        # Cached clips are kept for the next play; eviction removes them
+        if file_path and os.path.exists(file_path) and not get_audio_cache().contains(file_path):
             os.remove(file_path)
     except Exception as e:
         print(f"Warning: Could not delete temporary file {file_path}: {e}")
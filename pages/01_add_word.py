@@ -4,6 +4,9 @@ from utils.main import DIFFICULTY_LEVELS
 import json
 import os
 
+from utils.json_manager import add_words_to_json, update_word_fields
+from utils.media_store import get_media_store, word_id
+
 def add_word_to_json(word_entry):
     """
     Add a new word entry to the vocabulary storage.
@@ -35,18 +38,8 @@ def add_word_to_json(word_entry):
         st.error("Invalid difficulty level.")
         return
 
-    with open(json_file, 'r+', encoding='utf-8') as f:
-        data = json.load(f)
-        category = word_entry.get("category", "general")
-        if category not in data:
-            data[category] = []
-
-        data[category].append(new_word_entry)
-        
-        # Write the updated data back to the JSON file
-        f.seek(0)
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.truncate()
+    # Journaled or inserted depending on the configured storage backend
+    add_words_to_json(new_word_entry, json_file, category)
 
 def update_word_in_json(word_entry, original_file):
     """
@@ -64,32 +57,20 @@ def update_word_in_json(word_entry, original_file):
     media = word_entry.get("media", "")
     
     try:
-        with open(original_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Find and update the word in the appropriate category
-        word_found = False
-        for cat in data:
-            if isinstance(data[cat], list):
-                for i, entry in enumerate(data[cat]):
-                    if entry.get('word', '').lower() == word.lower():
-                        # Update the entry
-                        data[cat][i] = {
-                            "word": word,
-                            "meaning": meaning,
-                            "expressions": expressions,
-                            "phrase": phrase,
-                            "media": media,
-                        }
-                        word_found = True
-                        break
-            if word_found:
-                break
+        # Returns False when the word does not exist
+        word_found = update_word_fields(
+            original_file,
+            word,
+            {
+                "word": word,
+                "meaning": meaning,
+                "expressions": expressions,
+                "phrase": phrase,
+                "media": media,
+            }
+        )
         
         if word_found:
-            # Write the updated data back to the JSON file
-            with open(original_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
             return True
         else:
             st.error(f"Word '{word}' not found in {original_file}")
@@ -137,11 +118,9 @@ difficulty_level = st.sidebar.radio(
 # Upload File for media (optional)
 media_file = st.sidebar.file_uploader("Upload Media File (optional):", type=["mp4", "jpg", "wav"])
 if media_file:
-    media_path = os.path.join("media", media_file.name)
-    with open(media_path, "wb") as f:
-        f.write(media_file.getbuffer())
-    st.sidebar.success(f"Uploaded file saved to {media_path}")
-    media = f"media/{media_file.name}"
+    # Stored by content hash: re-uploads and reruns of the same file write nothing
+    media = get_media_store().put_bytes(media_file.getbuffer(), os.path.splitext(media_file.name)[1])
+    st.sidebar.success(f"Uploaded file saved to {media}")
 else:
     media = default_media
 
@@ -168,6 +147,9 @@ if st.button(button_label, key=button_key):
         "category": category,
         "difficulty": difficulty_level
     }
+    # Record which blob belongs to this word so the store can collect unused ones
+    if get_media_store().is_blob(media):
+        get_media_store().assign(word_id(word, category), media)
     
     if edit_mode:
         # Update existing word
@@ -3,6 +3,11 @@ import random
 import os
 import json
 
+from utils.json_manager import load_vocabulary_by_category
+from utils.quiz_index import get_quiz_index
+from utils.media_derivatives import derivative_path
+from utils.media_manifest import lookup_media
+
 DEFAULT_CATEGORIES = ["general", "science", "business", "literature", "travel", "history", "geography", "health"]
 DEFAULT_VOCABULARY_FILE = "vocabulary.txt"
 DIFFICULTY_LEVELS = {
@@ -53,32 +58,8 @@ DIFFICULTY_LEVELS = {
 
 def load_vocabulary_with_expressions(level):
     """Load vocabulary from JSON files with expressions included"""    
-    # Map level to filename
-    level_files = {
-        1: "data/level1.json",
-        2: "data/level2.json", 
-        3: "data/level3.json"
-    }
-    filename = level_files.get(int(level))
-    #filename = "data/level" + str(level) + ".json"
-    if not filename or not os.path.exists(filename):
-        return []
-    
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Flatten all categories into a single list
-        all_words = []
-        for category, words in data.items():
-            for word_entry in words:
-                # Add category to each word entry
-                word_entry['category'] = category
-                all_words.append(word_entry)
-        
-        return all_words
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    # Served by the configured storage backend shared with the main apps
+    return load_vocabulary_by_category(level, None)
     
 def filter_words_by_category(word_list, category):
     """
@@ -93,19 +74,6 @@ def filter_words_by_category(word_list, category):
     """
     return [word for word in word_list if word.get('category', '').lower() == category.lower()]
 
-def generate_quiz_question(words, correct_word):
-    """Generate a multiple choice quiz question"""
-    options = [correct_word]
-    other_words = [w for w in words if w['word'] != correct_word['word']]
-    
-    # Add 3 random wrong options
-    wrong_options = random.sample(other_words, min(3, len(other_words)))
-    for word in wrong_options:
-        options.append(word)
-    
-    random.shuffle(options)
-    return options
-
 def get_difficulty(word):
     """Get difficulty level for a word"""
     return DIFFICULTY_LEVELS.get(word.lower(), "⭐⭐")
@@ -130,10 +98,10 @@ if st.button("🔄 Load Words for Quiz"):
     st.session_state.quiz_score = 0
     st.session_state.quiz_total = 0
     st.session_state.current_question = None
-    all_words = load_vocabulary_with_expressions(current_level)
-    print(current_level, all_words)
-    quiz_words = filter_words_by_category(all_words, selected_category)
-    print(quiz_words)
+    if selected_category == "All":
+        quiz_words = load_vocabulary_with_expressions(current_level)
+    else:
+        quiz_words = load_vocabulary_by_category(current_level, selected_category)
     st.session_state.quiz_words = quiz_words
 else:
     quiz_words = st.session_state.get('quiz_words', [])
@@ -141,6 +109,7 @@ else:
 if quiz_words:
     # Quiz type selection
     quiz_type = st.sidebar.radio("Quiz Type", ["Meaning → Word", "Word → Meaning"])
+    hard_distractors = st.sidebar.checkbox("Hard mode (wrong answers from the same category)")
     
     # Display current quiz settings
     st.info(f"📚 **Category:** {selected_category} | 🎯 **Quiz Type:** {quiz_type}")
@@ -154,7 +123,9 @@ if quiz_words:
         # Generate new question button
         if st.button("🎲 New Question") or st.session_state.current_question is None:
             correct_word = random.choice(quiz_words)
-            options = generate_quiz_question(quiz_words, correct_word)
+            # Cached per level/category; distractors are sampled without a full scan
+            quiz_index = get_quiz_index(current_level, None if selected_category == "All" else selected_category, quiz_words)
+            options = quiz_index.question(correct_word, hard=hard_distractors)
             st.session_state.current_question = {
                 'correct': correct_word,
                 'options': options,
@@ -235,23 +206,24 @@ if quiz_words:
                         
                         # Display media if exists (image or video)
                         media_path = correct_word.get('media')
-                        if media_path and os.path.exists(media_path):
-                            file_extension = os.path.splitext(media_path)[1].lower()
+                        media_info = lookup_media(media_path) if media_path else None
+                        if media_info:
+                            media_path = media_info['path']
                             
-                            if file_extension in ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm']:
+                            if media_info['type'] == 'video':
                                 st.markdown("**🎥 Video Reference:**")
                                 try:
                                     st.video(media_path)
                                 except Exception as e:
                                     st.error(f"Error loading video: {str(e)}")
-                            elif file_extension in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg']:
+                            elif media_info['type'] == 'image':
                                 st.markdown("**📷 Visual Reference:**")
                                 try:
-                                    st.image(media_path, caption=f"Visual for: {correct_word['phrase']}", use_column_width=True)
+                                    st.image(derivative_path(media_path, "display", media_info.get('sha256')), caption=f"Visual for: {correct_word['phrase']}", use_column_width=True)
                                 except Exception as e:
                                     st.error(f"Error loading image: {str(e)}")
                             else:
-                                st.warning(f"Unsupported media format: {file_extension}")
+                                st.warning(f"Unsupported media format: {os.path.splitext(media_path)[1].lower()}")
                         
                         # Bottom border
                         st.markdown("---")
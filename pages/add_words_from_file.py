@@ -1,133 +1,70 @@
-import streamlit as st
-import os
-import json
-import random
-import csv
-from pathlib import Path
-
-from utils.main import DEFAULT_CATEGORIES
-from utils.main import DIFFICULTY_LEVELS
-from utils.json_manager import load_json, save_json, add_words_to_json
-
-st.title("➕ Add New Word from file")
-
-st.sidebar.markdown("📝 **Select File to Add Words from:**")
-uploaded_file = st.sidebar.file_uploader("Upload a file", type=["xlsx", "csv", "json"])
-if uploaded_file:
-    file_name = uploaded_file.name
-    st.sidebar.write(f"Uploaded file: {file_name}")
-    file_type = file_name.split('.')[-1].lower()
-    
-    # Save uploaded file temporarily
-    temp_file_path = f"temp_{file_name}"
-    with open(temp_file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-        # Print uploaded file content for debugging: show text for json/csv/txt,
-        # otherwise show a binary preview and size.
-        try:
-            if file_type in ("json", "csv", "txt"):
-                content = uploaded_file.getvalue().decode("utf-8", errors="replace")
-                print(content)
-            else:
-                buf = uploaded_file.getbuffer()
-                print(f"Uploaded binary file: {len(buf)} bytes. Preview (first 200 bytes): {buf.tobytes()[:200]!r}")
-        except Exception as e:
-            print("Error printing uploaded file content:", e)
-    
-    # Load data based on file type
-    if file_type == 'json':
-        with open(temp_file_path, 'r', encoding='utf-8') as f:
-            data_json = json.load(f)
-            print(data_json.keys())
-    else:
-        from vocab_converter import VocabularyConverter
-        converter = VocabularyConverter()
-        
-        if file_type == 'xlsx':
-            json_file_path = converter.excel_to_json(temp_file_path)
-            
-        elif file_type == 'csv':
-            json_file_path = converter.csv_to_json(temp_file_path)
-            # Debugging: log returned path and file existence
-            try:
-                print("converter.csv_to_json returned:", json_file_path)
-                if json_file_path:
-                    abs_json_path = os.path.abspath(json_file_path)
-                    print("abs path:", abs_json_path)
-                    print("exists:", os.path.exists(abs_json_path))
-                    if os.path.exists(abs_json_path):
-                        with open(abs_json_path, 'r', encoding='utf-8') as jf:
-                            preview = jf.read(1000)
-                            print("converted JSON preview:", preview)
-                else:
-                    print("csv_to_json returned None")
-            except Exception as _e:
-                print("Error while inspecting converted JSON:", _e)
-
-            # Fallback: if converter didn't produce a JSON file, try parsing CSV here
-            if not json_file_path or not os.path.exists(json_file_path):
-                try:
-                    fallback_json = f"{os.path.splitext(temp_file_path)[0]}_from_csv.json"
-                    data_fallback = {}
-                    with open(temp_file_path, 'r', encoding='utf-8') as cf:
-                        rdr = csv.DictReader(cf)
-                        for row in rdr:
-                            category = row.get('Category', 'general') or 'general'
-                            category = category.lower()
-                            expressions_str = row.get('Expressions', '') or ''
-                            expressions = [expr.strip() for expr in expressions_str.split(';') if expr.strip()]
-                            word_entry = {
-                                'word': row.get('Word', '') or '',
-                                'meaning': row.get('Meaning', '') or '',
-                                'phrase': row.get('Phrase', '') or '',
-                                'expressions': expressions,
-                                'video': row.get('Media', '') or ''
-                            }
-                            data_fallback.setdefault(category, []).append(word_entry)
-
-                    with open(fallback_json, 'w', encoding='utf-8') as jf:
-                        json.dump(data_fallback, jf, ensure_ascii=False, indent=2)
-
-                    json_file_path = fallback_json
-                    print("Fallback CSV→JSON wrote:", json_file_path)
-                except Exception as e:
-                    print("Fallback CSV→JSON failed:", e)
-            
-        else:
-            st.error("Unsupported file type.")
-            words_data = []
-            json_file_path = None
-        
-        if json_file_path and os.path.exists(json_file_path):
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data_json = json.load(f)
-            # Clean up converted temporary file
-            print(json_file_path)
-            os.remove(json_file_path)
-        else:
-            st.error("Failed to convert file")
-            data_json = None
-    
-    # Clean up temporary upload file
-    os.remove(temp_file_path)
-
-    # If we have loaded JSON data, import words preserving categories
-    if data_json:
-        try:
-            if isinstance(data_json, dict):
-                total = sum(len(v) for v in data_json.values())
-                for category, words in data_json.items():
-                    for word_entry in words:
-                        add_words_to_json(word_entry, json_file="level1.json", category=category)
-                st.success(f"Successfully added {total} words across {len(data_json)} categories to the vocabulary storage.")
-            elif isinstance(data_json, list):
-                for word_entry in data_json:
-                    add_words_to_json(word_entry, json_file="level1.json", category="general")
-                st.success(f"Successfully added {len(data_json)} words to the vocabulary storage.")
-            else:
-                st.warning("Uploaded JSON has unexpected format.")
-        except Exception as e:
-            print("Error adding words to storage:", e)
-            st.error("Failed to add words to vocabulary storage.")
-    else:
-        st.warning("No words found in the uploaded file.")
\ No newline at end of file
+import streamlit as st
+
+from utils.main import DEFAULT_CATEGORIES
+from utils.main import DIFFICULTY_LEVELS
+from utils.json_manager import import_entries
+from utils.vocabulary_store import get_vocabulary_store
+from utils.conversion import BufferReader, read_records, records_to_entries
+
+
+def show_report(report, level):
+    """Summarize an import and list the first rejected rows"""
+    if report['added'] or report['duplicates'] or report['rejected']:
+        st.success(f"Added {report['added']} words to level{level}.json.")
+        if report['duplicates']:
+            st.info(f"Skipped {report['duplicates']} words that already exist.")
+        if report['rejected']:
+            st.warning(f"Rejected {report['rejected']} invalid rows.")
+            # Per-row report; row numbers count data rows from 1
+            row_errors = sorted(report['validation']['errors'].items())
+            for row, messages in row_errors[:20]:
+                st.write(f"• Row {row + 1}: {'; '.join(messages)}")
+            if len(row_errors) > 20:
+                st.write(f"… and {len(row_errors) - 20} more rows")
+    else:
+        st.warning("No words found in the uploaded file.")
+
+
+st.title("➕ Add New Word from file")
+
+st.sidebar.markdown("📝 **Select File to Add Words from:**")
+uploaded_file = st.sidebar.file_uploader("Upload a file", type=["xlsx", "csv", "json", "jsonl", "txt"])
+target_level = st.sidebar.radio("Add words to level:", DIFFICULTY_LEVELS, key="import_level_radio", horizontal=True)
+allow_new_categories = st.sidebar.checkbox("Allow new categories", value=True, key="import_allow_new_categories")
+
+if uploaded_file:
+    file_name = uploaded_file.name
+    st.sidebar.write(f"Uploaded file: {file_name}")
+    file_type = file_name.split('.')[-1].lower()
+    
+    # Reruns keep the upload; each file is imported once, when the button is pressed
+    imported = st.session_state.setdefault("imported_uploads", {})
+    upload_key = (getattr(uploaded_file, "file_id", file_name), uploaded_file.size)
+    
+    if upload_key in imported:
+        st.sidebar.info(f"{file_name} was already imported into level{imported[upload_key]['level']}.json")
+    elif st.sidebar.button("📥 Import", key="import_upload_button"):
+        # Rows are parsed in place from the upload buffer (no temp files) and
+        # validated as they stream; the bar follows the bytes consumed
+        upload = BufferReader(uploaded_file.getbuffer())
+        progress_bar = st.progress(0.0, text="Reading upload...")
+        
+        def show_progress(rows):
+            progress_bar.progress(upload.progress(), text=f"Checked {rows} rows...")
+        
+        try:
+            records = read_records(upload, file_type)
+            # Without new categories, rows must use a default category or one the level already has
+            allowed_categories = None
+            if not allow_new_categories:
+                allowed_categories = [c.lower() for c in DEFAULT_CATEGORIES] + get_vocabulary_store().categories(target_level)
+            report = import_entries(records_to_entries(records), level=target_level, progress=show_progress,
+                                    allowed_categories=allowed_categories)
+            progress_bar.progress(1.0, text="Import complete")
+            imported[upload_key] = {"level": target_level, "report": report}
+        except Exception as e:
+            progress_bar.empty()
+            st.error(f"Failed to import {file_name}: {e}")
+    
+    if upload_key in imported:
+        show_report(imported[upload_key]["report"], imported[upload_key]["level"])
@@ -0,0 +1,159 @@
+"""
+Pre-render pronunciation audio for whole vocabulary levels
+Generates word and phrase clips for every entry at each speed setting so
+study mode never waits on first-time synthesis. Clips go into the shared
+audio cache; a manifest lists them for the apps and pins them against eviction.
+Workers render with eviction off, since clips are only pinned once the
+manifest is saved; the size cap is applied once at the end.
+
+Usage:
+    python prerender_audio.py                  # all levels
+    python prerender_audio.py --levels 1 2 --workers 2
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from main import create_audio_file, SPEED_OPTIONS
+from utils.audio_cache import (
+    configure_audio_cache,
+    manifest_key,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_MAX_BYTES
+)
+from utils.vocabulary_store import get_vocabulary_store, LEVEL_FILES
+
+# Manifest is rewritten after this many finished clips so an interrupted run keeps its progress
+MANIFEST_FLUSH_EVERY = 25
+
+
+def collect_jobs(levels, speeds):
+    """
+    List the (text, is_phrase, speed) clips needed for the given levels
+
+    Args:
+        levels (list): Difficulty levels to walk
+        speeds (list): Speed settings to render
+
+    Returns:
+        list: Unique (text, is_phrase, speed) tuples in level order
+    """
+    store = get_vocabulary_store()
+    jobs = []
+    seen = set()
+    for level in levels:
+        for entry in store.words(level):
+            for text, is_phrase in ((entry.get('word', ''), False), (entry.get('phrase', ''), True)):
+                text = (text or '').strip()
+                if not text:
+                    continue
+                for speed in speeds:
+                    job = (text, is_phrase, speed)
+                    if job not in seen:
+                        seen.add(job)
+                        jobs.append(job)
+    return jobs
+
+
+def _init_worker(cache_dir, max_bytes):
+    """Point each worker process at the same cache directory"""
+    configure_audio_cache(cache_dir, max_bytes)
+
+
+def _render(job):
+    """Render one clip in a worker process; returns (job, path or None)"""
+    text, is_phrase, speed = job
+    kind = "phrase" if is_phrase else "word"
+    return job, create_audio_file(text, f"prerender_{kind}", is_phrase=is_phrase, speed=speed)
+
+
+def prerender(levels, speeds=SPEED_OPTIONS, workers=None, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Render every missing clip for the given levels with a bounded process pool
+
+    Clips already in the manifest or in the cache are skipped, so the command
+    can be interrupted and re-run to resume.
+
+    Args:
+        levels (list): Difficulty levels to walk
+        speeds (list): Speed settings to render
+        workers (int): Number of worker processes (defaults to CPU count, max 4)
+        cache_dir (str): Audio cache directory
+        max_bytes (int): Audio cache size cap, applied to unpinned clips after the run
+
+    Returns:
+        dict: Counts of "rendered", "skipped" and "failed" clips
+    """
+    cache = configure_audio_cache(cache_dir, max_bytes)
+    clips = dict(cache.load_manifest())
+    stats = {"rendered": 0, "skipped": 0, "failed": 0}
+
+    pending = []
+    for job in collect_jobs(levels, speeds):
+        text, is_phrase, speed = job
+        key = manifest_key(text, speed, is_phrase)
+        if cache.lookup(text, speed, is_phrase):
+            stats["skipped"] += 1
+        else:
+            clips.pop(key, None)
+            pending.append(job)
+
+    print(f"🎧 {len(pending)} clips to render, {stats['skipped']} already rendered")
+    if not pending:
+        cache.save_manifest(clips)
+        return stats
+
+    workers = workers or min(4, os.cpu_count() or 1)
+    started = time.time()
+    unsaved = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cache_dir, None)) as executor:
+            futures = [executor.submit(_render, job) for job in pending]
+            for future in as_completed(futures):
+                try:
+                    (text, is_phrase, speed), path = future.result()
+                except Exception as e:
+                    print(f"❌ Worker failed: {e}")
+                    stats["failed"] += 1
+                    continue
+
+                if not path:
+                    print(f"❌ Could not render '{text}' at speed {speed}")
+                    stats["failed"] += 1
+                    continue
+
+                clips[manifest_key(text, speed, is_phrase)] = os.path.relpath(path, cache_dir)
+                stats["rendered"] += 1
+                unsaved += 1
+                if unsaved >= MANIFEST_FLUSH_EVERY:
+                    cache.save_manifest(clips)
+                    unsaved = 0
+                    done = stats["rendered"] + stats["failed"]
+                    print(f"   {done}/{len(pending)} clips ({time.time() - started:.1f}s)")
+    finally:
+        # Keep whatever finished, even on Ctrl+C
+        cache.save_manifest(clips)
+        # Now that every rendered clip is pinned, trim unpinned clips to the cap
+        cache.evict()
+
+    print(f"✅ Rendered {stats['rendered']}, skipped {stats['skipped']}, "
+          f"failed {stats['failed']} in {time.time() - started:.1f}s")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pre-render pronunciation audio for vocabulary levels')
+    parser.add_argument('--levels', type=int, nargs='+', choices=sorted(LEVEL_FILES),
+                        default=sorted(LEVEL_FILES), help='Levels to render (default: all)')
+    parser.add_argument('--speeds', nargs='+', choices=SPEED_OPTIONS, default=SPEED_OPTIONS,
+                        help='Speed settings to render (default: all)')
+    parser.add_argument('--workers', type=int, help='Number of worker processes')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Audio cache directory')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES, help='Audio cache size cap in bytes')
+
+    args = parser.parse_args()
+    prerender(args.levels, args.speeds, args.workers, args.cache_dir, args.max_bytes)
@@ -3,9 +3,11 @@ Simple JSON to CSV/Excel Converter for Vocabulary Builder
 Uses built-in csv module (no external dependencies)
 """
 import json
-import csv
 import os
 
+from utils.conversion import convert_file, default_output
+from utils.word_journal import get_word_journal
+
 class SimpleVocabularyConverter:
     def json_to_csv(self, json_file, csv_file=None):
         """
@@ -21,42 +23,13 @@ class SimpleVocabularyConverter:
         try:
             # Generate CSV filename if not provided
             if csv_file is None:
-                base_name = os.path.splitext(json_file)[0]
-                csv_file = f"{base_name}.csv"
-            
-            # Load JSON data
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Prepare CSV data
-            rows = []
-            headers = ['Category', 'Word', 'Meaning', 'Phrase', 'Expressions', 'Media']
-            
-            for category, words in data.items():
-                for word_entry in words:
-                    # Handle expressions list - join with semicolon
-                    expressions = word_entry.get('expressions', [])
-                    expressions_str = '; '.join(expressions) if expressions else ''
-                    
-                    row = [
-                        category,
-                        word_entry.get('word', ''),
-                        word_entry.get('meaning', ''),
-                        word_entry.get('phrase', ''),
-                        expressions_str,
-                        word_entry.get('video', word_entry.get('media', ''))  # Handle both 'video' and 'media' fields
-                    ]
-                    rows.append(row)
+                csv_file = default_output(json_file, '.csv')
             
-            # Write to CSV
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-                writer.writerows(rows)
+            result = convert_file(json_file, csv_file)
             
             print(f"✅ Successfully converted {json_file} to {csv_file}")
-            print(f"📊 Total words converted: {len(rows)}")
-            print(f"📂 Categories: {list(data.keys())}")
+            print(f"📊 Total words converted: {result['words']}")
+            print(f"📂 Categories: {result['categories']}")
             
             return csv_file
             
@@ -78,44 +51,12 @@ class SimpleVocabularyConverter:
         try:
             # Generate JSON filename if not provided
             if json_file is None:
-                base_name = os.path.splitext(csv_file)[0]
-                json_file = f"{base_name}_converted.json"
-            
-            # Read CSV file
-            data = {}
-            
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                for row in reader:
-                    category = row.get('Category', 'general').lower()
-                    
-                    # Parse expressions back to list
-                    expressions_str = row.get('Expressions', '')
-                    expressions = []
-                    if expressions_str:
-                        expressions = [expr.strip() for expr in expressions_str.split(';') if expr.strip()]
-                    
-                    word_entry = {
-                        'word': row.get('Word', ''),
-                        'meaning': row.get('Meaning', ''),
-                        'phrase': row.get('Phrase', ''),
-                        'expressions': expressions,
-                        'video': row.get('Media', '')
-                    }
-                    
-                    # Initialize category if it doesn't exist
-                    if category not in data:
-                        data[category] = []
-                    
-                    data[category].append(word_entry)
+                json_file = default_output(csv_file, '_converted.json')
             
-            # Save to JSON
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            result = convert_file(csv_file, json_file)
             
             print(f"✅ Successfully converted {csv_file} to {json_file}")
-            print(f"📂 Categories: {list(data.keys())}")
+            print(f"📂 Categories: {result['categories']}")
             
             return json_file
             
@@ -132,6 +73,7 @@ class SimpleVocabularyConverter:
             num_items (int): Number of items to preview per category
         """
         try:
+            get_word_journal().flush(json_file)
             with open(json_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
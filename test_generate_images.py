@@ -0,0 +1,113 @@
+"""
+Test the image generation pipeline against a local stub of the images API
+"""
+import os
+import json
+import asyncio
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import generate_images
+
+
+class StubImagesAPI:
+    """Images API stand-in: the first generation request per prompt gets a 429,
+    the first download per image a 503, everything after that succeeds"""
+
+    def __init__(self):
+        self.calls = {"generate": 0, "download": 0}
+        self._seen = set()
+        self._images = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["prompt"]
+                with stub._lock:
+                    stub.calls["generate"] += 1
+                    first = ("generate", prompt) not in stub._seen
+                    stub._seen.add(("generate", prompt))
+                    stub._images += 1
+                    image_id = stub._images
+                if first:
+                    return self._send(429, b'{"error": "rate limited"}', {"Retry-After": "0"})
+                url = f"http://127.0.0.1:{stub.port}/images/{image_id}.jpg"
+                self._send(200, json.dumps({"data": [{"url": url}]}).encode())
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.calls["download"] += 1
+                    first = ("download", self.path) not in stub._seen
+                    stub._seen.add(("download", self.path))
+                if first:
+                    return self._send(503)
+                self._send(200, f"image {self.path}".encode())
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def _run(prompts, api, directory, force=False):
+    return asyncio.run(generate_images._generate_all(
+        prompts, "test-key", api.api_base, concurrency=3, rate=100, burst=10, force=force,
+        state_file=os.path.join(directory, "generated.json"),
+        placeholder_state_file=os.path.join(directory, "placeholders.json")
+    ))
+
+
+def test_retry_and_resume():
+    """429/5xx responses are retried and a second run skips finished images"""
+    backoff_base, generate_images.BACKOFF_BASE = generate_images.BACKOFF_BASE, 0.01
+    api = StubImagesAPI()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            prompts = [{"word": f"word{i}", "prompt": f"prompt {i}",
+                        "media_path": os.path.join(directory, "media", f"word{i}.jpg")} for i in range(5)]
+
+            assert _run(prompts, api, directory) == (5, 0, 0)
+            assert api.calls == {"generate": 10, "download": 10}
+            assert all(os.path.exists(p["media_path"]) for p in prompts)
+            print("✅ 429/503 retried; 5 images generated")
+
+            # Resume: nothing left to do, no requests made
+            assert _run(prompts, api, directory) == (0, 0, 5)
+            assert api.calls == {"generate": 10, "download": 10}
+            print("✅ Second run skipped every finished image")
+
+            # Existing images without a state entry are kept; recorded placeholders are replaced
+            os.remove(os.path.join(directory, "generated.json"))
+            with open(os.path.join(directory, "placeholders.json"), "w", encoding="utf-8") as f:
+                json.dump({prompts[0]["media_path"]: "placeholder"}, f)
+            assert _run(prompts, api, directory) == (1, 0, 4)
+            print("✅ Existing images kept, placeholder replaced")
+
+            assert _run(prompts, api, directory, force=True) == (5, 0, 0)
+            print("✅ --force regenerates everything")
+    finally:
+        api.stop()
+        generate_images.BACKOFF_BASE = backoff_base
+
+
+if __name__ == "__main__":
+    test_retry_and_resume()
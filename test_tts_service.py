@@ -0,0 +1,55 @@
+"""
+Test the shared text-to-speech service with a stand-in render function
+"""
+import threading
+
+from utils.tts_service import TTSService
+
+
+def test_immediate_renders_do_not_deadlock():
+    """Clips that finish before submit() returns (cache hits) must not hang"""
+    service = TTSService(lambda text, is_phrase, speed: f"{text}.mp3", max_workers=4)
+    errors = []
+
+    def run():
+        try:
+            for i in range(2000):
+                assert service.get_audio_file(f"word{i % 50}", timeout=5) == f"word{i % 50}.mp3"
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    service.shutdown()
+    assert not worker.is_alive(), "submit() deadlocked on an already finished render"
+    assert not errors
+    assert service.pending() == 0
+    print("✅ 2000 immediate renders finished without deadlock")
+
+
+def test_concurrent_requests_share_one_render():
+    """Requests for a clip that is still rendering join the same job"""
+    release = threading.Event()
+    calls = []
+
+    def render(text, is_phrase, speed):
+        calls.append(text)
+        release.wait(5)
+        return f"{text}.mp3"
+
+    service = TTSService(render, max_workers=2)
+    first = service.submit("hello")
+    second = service.submit("hello ")
+    assert first is second
+    release.set()
+    assert first.result(timeout=5) == "hello.mp3"
+    service.shutdown()
+    assert calls == ["hello"]
+    assert service.pending() == 0
+    print("✅ Concurrent requests coalesced into one render")
+
+
+if __name__ == "__main__":
+    test_immediate_renders_do_not_deadlock()
+    test_concurrent_requests_share_one_render()
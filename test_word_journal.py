@@ -0,0 +1,67 @@
+"""
+Test journal replay and the SQLite backend on category changes
+"""
+import os
+import json
+import tempfile
+
+from utils.word_journal import WordJournal, apply_operation
+from utils.sqlite_backend import SQLiteVocabularyBackend
+
+LEVEL = {
+    "general": [{"word": "Apple", "meaning": "a fruit"}, {"word": "Table", "meaning": "furniture"}],
+    "travel": [{"word": "Ticket", "meaning": "a pass"}]
+}
+
+
+def _move_record():
+    return {"op": "update", "file": "level1.json", "word": "apple", "category": "general",
+            "fields": {"category": "travel", "meaning": "a red fruit"}}
+
+
+def test_update_moves_entry_to_new_category():
+    """An update with a new category moves the entry instead of adding a field"""
+    data = apply_operation(json.loads(json.dumps(LEVEL)), _move_record())
+    assert [w["word"] for w in data["general"]] == ["Table"]
+    assert data["travel"][-1] == {"word": "Apple", "meaning": "a red fruit"}
+    print("✅ Replayed update moved the entry")
+
+
+def test_compacted_file_keeps_the_move():
+    """The move survives folding the journal into the level file"""
+    with tempfile.TemporaryDirectory() as directory:
+        level_file = os.path.join(directory, "level1.json")
+        with open(level_file, "w", encoding="utf-8") as f:
+            json.dump(LEVEL, f)
+        journal = WordJournal(os.path.join(directory, "journal.jsonl"))
+        journal.append("update", level_file, word="apple", category="general",
+                       fields={"category": "travel", "meaning": "a red fruit"})
+        assert journal.flush(level_file)
+        with open(level_file, encoding="utf-8") as f:
+            data = json.load(f)
+        assert [w["word"] for w in data["general"]] == ["Table"]
+        assert [w["word"] for w in data["travel"]] == ["Ticket", "Apple"]
+        assert "category" not in data["travel"][-1]
+        print("✅ Flushed level file has the entry under its new category")
+
+
+def test_sqlite_update_moves_word():
+    """The SQLite backend moves the word to the end of its new category too"""
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteVocabularyBackend(os.path.join(directory, "words.db"))
+        backend.replace_level(1, {"general": [dict(LEVEL["general"][0], expressions=["an apple a day"]),
+                                              LEVEL["general"][1]],
+                                  "travel": LEVEL["travel"]})
+        assert backend.update_word(1, "apple", {"category": "travel", "meaning": "a red fruit"})
+        pools = backend.load_word_pools(1)
+        assert [w["word"] for w in pools["general"]] == ["Table"]
+        assert [w["word"] for w in pools["travel"]] == ["Ticket", "Apple"]
+        assert pools["travel"][-1]["meaning"] == "a red fruit"
+        assert pools["travel"][-1]["expressions"] == ["an apple a day"]
+        print("✅ SQLite backend moved the word with its expressions")
+
+
+if __name__ == "__main__":
+    test_update_moves_entry_to_new_category()
+    test_compacted_file_keeps_the_move()
+    test_sqlite_update_moves_word()
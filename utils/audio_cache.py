@@ -0,0 +1,290 @@
+"""
+Persistent, content-addressed cache for synthesized speech
+Audio files are keyed by (text, language, engine, speed, is_phrase) so a
+repeated play is served from disk without running pyttsx3 or calling gTTS
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import threading
+
+from utils.word_journal import atomic_write_json
+
+DEFAULT_CACHE_DIR = os.environ.get("AUDIO_CACHE_DIR", os.path.join(".cache", "audio"))
+DEFAULT_MAX_BYTES = int(os.environ.get("AUDIO_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+# Written by prerender_audio.py; clips listed here are never evicted
+MANIFEST_FILE = "manifest.json"
+
+# File extension produced by each TTS engine
+ENGINE_EXTENSIONS = {
+    "pyttsx3": ".wav",
+    "gtts": ".mp3"
+}
+
+
+def cache_key(text, language, engine, speed, is_phrase):
+    """
+    Build the content address of one synthesized clip
+
+    Args:
+        text (str): Text that is spoken
+        language (str): Detected language code, e.g. "en"
+        engine (str): "pyttsx3" or "gtts"
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+        is_phrase (bool): Whether the text is a phrase
+
+    Returns:
+        str: Hex sha256 digest
+    """
+    raw = "\x1f".join([text.strip(), language, engine, str(speed), "phrase" if is_phrase else "word"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def manifest_key(text, speed, is_phrase):
+    """Build the manifest lookup key of a clip (no language detection needed)"""
+    return f"{'phrase' if is_phrase else 'word'}|{speed}|{text.strip()}"
+
+
+class AudioCache:
+    """
+    Size-capped audio cache with least-recently-used eviction
+
+    Each hit refreshes the file's mtime, so eviction removes the clips that
+    were played longest ago once the cache grows past max_bytes. Clips listed
+    in the pre-render manifest are pinned and never evicted.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._pinned = (None, 0)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key, engine):
+        """Return the cache path of a key (sharded by the first two hex digits)"""
+        return os.path.join(self.cache_dir, key[:2], key + ENGINE_EXTENSIONS[engine])
+
+    def get(self, text, language, engine, speed="normal", is_phrase=False):
+        """
+        Look up a cached clip and mark it as recently used
+
+        Returns:
+            str or None: Path to the cached audio file, or None on a miss
+        """
+        path = self.path_for(cache_key(text, language, engine, speed, is_phrase), engine)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def staging_path(self, engine):
+        """
+        Return a unique temporary path inside the cache directory
+
+        Engines write here first so commit() can atomically rename the
+        finished file into place without crossing filesystems.
+        """
+        return os.path.join(self.cache_dir, f".tmp_{uuid.uuid4().hex}{ENGINE_EXTENSIONS[engine]}")
+
+    def commit(self, staging_file, text, language, engine, speed="normal", is_phrase=False):
+        """
+        Move a freshly synthesized file into the cache
+
+        Args:
+            staging_file (str): File written by the TTS engine
+            text, language, engine, speed, is_phrase: Cache key components
+
+        Returns:
+            str or None: Path to the cached file, or None if the engine wrote nothing
+        """
+        if not os.path.exists(staging_file) or os.path.getsize(staging_file) == 0:
+            self.discard(staging_file)
+            return None
+
+        path = self.path_for(cache_key(text, language, engine, speed, is_phrase), engine)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = os.path.getsize(staging_file)
+        os.replace(staging_file, path)
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size
+        self.evict()
+        return path
+
+    def discard(self, staging_file):
+        """Remove a staging file left behind by a failed synthesis"""
+        try:
+            if staging_file and os.path.exists(staging_file):
+                os.remove(staging_file)
+        except OSError:
+            pass
+
+    def contains(self, file_path):
+        """Check whether a path points inside the cache directory"""
+        if not file_path:
+            return False
+        cache_dir = os.path.abspath(self.cache_dir)
+        return os.path.abspath(file_path).startswith(cache_dir + os.sep)
+
+    # ------------------------------------------------------------------
+    # Pre-render manifest
+    # ------------------------------------------------------------------
+    def manifest_path(self):
+        """Return the path of the pre-render manifest"""
+        return os.path.join(self.cache_dir, MANIFEST_FILE)
+
+    def load_manifest(self):
+        """
+        Load the pre-render manifest, re-reading it only when it changed
+
+        Returns:
+            dict: {manifest_key: path relative to the cache directory}
+        """
+        path = self.manifest_path()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._manifest_mtime:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f).get("clips", {})
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Warning: could not read audio manifest {path}: {e}")
+                self._manifest = {}
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def save_manifest(self, clips):
+        """
+        Atomically write the pre-render manifest
+
+        Args:
+            clips (dict): {manifest_key: path relative to the cache directory}
+        """
+        atomic_write_json(self.manifest_path(), {"version": 1, "clips": clips})
+
+    def lookup(self, text, speed="normal", is_phrase=False):
+        """
+        Find a pre-rendered clip through the manifest
+
+        Returns:
+            str or None: Path to the clip, or None if it was not pre-rendered
+        """
+        relative_path = self.load_manifest().get(manifest_key(text, speed, is_phrase))
+        if not relative_path:
+            return None
+        path = os.path.join(self.cache_dir, relative_path)
+        return path if os.path.exists(path) else None
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.startswith(".tmp_") or name == MANIFEST_FILE:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def size(self):
+        """Return the total size of cached audio in bytes"""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            return self._total_bytes
+
+    def _pinned_bytes(self, pinned):
+        """Total size of the pinned clips, re-measured only when the manifest changed"""
+        if self._pinned[0] != self._manifest_mtime:
+            total = 0
+            for path in pinned:
+                try:
+                    total += os.path.getsize(path)
+                except OSError:
+                    pass
+            self._pinned = (self._manifest_mtime, total)
+        return self._pinned[1]
+
+    def evict(self):
+        """
+        Delete least recently used clips until the cache fits in max_bytes
+
+        Nothing is walked when only pinned clips are left, since none of
+        them could be removed.
+
+        Returns:
+            int: Number of files removed
+        """
+        if not self.max_bytes or self.size() <= self.max_bytes:
+            return 0
+
+        removed = 0
+        pinned = {os.path.join(self.cache_dir, path) for path in self.load_manifest().values()}
+        if self.size() <= self._pinned_bytes(pinned):
+            return 0
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path in pinned:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total_bytes = total
+        return removed
+
+    def clear(self):
+        """Remove every cached clip"""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Return the process-wide AudioCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
+
+
+def configure_audio_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Replace the process-wide AudioCache (used by worker processes and CLIs)
+
+    Returns:
+        AudioCache: The new cache
+    """
+    global _cache
+    with _cache_lock:
+        _cache = AudioCache(cache_dir, max_bytes)
+        return _cache
@@ -0,0 +1,182 @@
+"""
+Parallel, incremental batch conversion of vocabulary files
+Conversions fan out over a process pool, and a state file remembers the
+size, mtime and SHA-256 of every input so outputs whose inputs did not
+change are skipped on the next run
+"""
+
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.conversion import convert_file
+from utils.word_journal import atomic_write_json, get_word_journal
+
+DEFAULT_STATE_FILE = os.path.join(".cache", "conversion_state.json")
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def input_signature(file_path):
+    """Return the (mtime_ns, size) pair used as the cheap change check"""
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+class ConversionState:
+    """
+    Record of which input produced each output
+
+    An output is current when it exists and its input still has the stored
+    mtime and size; if only the mtime moved (e.g. the file was touched or
+    re-saved unchanged) the stored hash decides.
+    """
+
+    def __init__(self, state_file=DEFAULT_STATE_FILE):
+        self.state_file = state_file
+        self._entries = {}
+        self.dirty = False
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(output_file):
+        return os.path.abspath(output_file)
+
+    def is_current(self, input_file, output_file):
+        """Return True if output_file was produced from the current input_file"""
+        entry = self._entries.get(self._key(output_file))
+        if not entry or entry.get("input") != os.path.abspath(input_file) or not os.path.exists(output_file):
+            return False
+        try:
+            mtime_ns, size = input_signature(input_file)
+        except OSError:
+            return False
+        if (mtime_ns, size) == (entry.get("mtime_ns"), entry.get("size")):
+            return True
+        if size != entry.get("size") or file_digest(input_file) != entry.get("sha256"):
+            return False
+        entry["mtime_ns"] = mtime_ns
+        self.dirty = True
+        return True
+
+    def record(self, output_file, input_file, mtime_ns, size, sha256):
+        """Remember the input state an output was converted from"""
+        self._entries[self._key(output_file)] = {
+            "input": os.path.abspath(input_file),
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "sha256": sha256
+        }
+        self.dirty = True
+
+    def save(self):
+        """Write the state file"""
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write_json(self.state_file, self._entries)
+        self.dirty = False
+
+
+def _convert_job(input_file, output_file):
+    """Worker: convert one file and report its timing and input state"""
+    started = time.perf_counter()
+    result = {"input": input_file, "output": output_file, "words": 0, "error": None}
+    try:
+        # Fingerprint before converting so an edit made mid-conversion is picked up next run
+        result["mtime_ns"], result["size"] = input_signature(input_file)
+        result["sha256"] = file_digest(input_file)
+        result["words"] = convert_file(input_file, output_file)["words"]
+        result["status"] = "converted"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def batch_convert(jobs, workers=None, force=False, state_file=DEFAULT_STATE_FILE):
+    """
+    Convert many files in parallel, skipping outputs that are up to date
+
+    Args:
+        jobs (list): (input_file, output_file) pairs
+        workers (int): Worker processes (defaults to the CPU count)
+        force (bool): Convert even when the output is current
+        state_file (str): Where input fingerprints are kept
+
+    Returns:
+        list: One dict per job with "input", "output", "status" ("converted",
+            "skipped" or "failed"), "words", "seconds" and "error", in job order
+    """
+    state = ConversionState(state_file)
+    results = {}
+    pending = []
+    # Journaled edits must reach the inputs first, or they would look unchanged
+    journal = get_word_journal()
+    for input_file in dict.fromkeys(input_file for input_file, _ in jobs):
+        if input_file.lower().endswith('.json'):
+            journal.flush(input_file)
+    for input_file, output_file in jobs:
+        if not force and state.is_current(input_file, output_file):
+            results[output_file] = {"input": input_file, "output": output_file, "status": "skipped",
+                                    "words": 0, "seconds": 0.0, "error": None}
+        else:
+            pending.append((input_file, output_file))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    if len(pending) == 1 or workers == 1:
+        # Not worth starting a pool
+        finished = [_convert_job(input_file, output_file) for input_file, output_file in pending]
+    else:
+        finished = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_convert_job, input_file, output_file) for input_file, output_file in pending]
+            for future in as_completed(futures):
+                finished.append(future.result())
+
+    for result in finished:
+        if result["status"] == "converted":
+            state.record(result["output"], result["input"], result.pop("mtime_ns"),
+                         result.pop("size"), result.pop("sha256"))
+        results[result["output"]] = {key: result.get(key) for key in
+                                     ("input", "output", "status", "words", "seconds", "error")}
+    if state.dirty:
+        state.save()
+
+    return [results[output_file] for _, output_file in jobs]
+
+
+def print_batch_report(results, elapsed=None):
+    """Print per-file timing and a summary of a batch_convert() run"""
+    icons = {"converted": "✅", "skipped": "⏭️", "failed": "❌"}
+    for result in results:
+        line = f"{icons[result['status']]} {result['input']} → {result['output']}"
+        if result["status"] == "converted":
+            line += f" ({result['words']} words, {result['seconds']:.2f}s)"
+        elif result["status"] == "skipped":
+            line += " (unchanged)"
+        else:
+            line += f": {result['error']}"
+        print(line)
+
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in icons}
+    summary = f"📁 {counts['converted']} converted, {counts['skipped']} unchanged, {counts['failed']} failed"
+    if elapsed is not None:
+        summary += f" in {elapsed:.2f}s"
+    print(summary)
@@ -0,0 +1,616 @@
+"""
+Pluggable conversion pipeline for vocabulary files
+Every format registers a reader that yields normalized word records and a
+writer that consumes them, so any conversion is one streaming pass:
+reader → records → writer. Formats: json, jsonl, csv, xlsx, txt
+("word | meaning | phrase | category") and sqlite.
+
+A normalized record is a dict with "category", "word", "meaning", "phrase",
+"expressions" (list) and "media" (str), plus any extra fields of the source
+entry (e.g. "difficulty").
+"""
+
+import io
+import os
+import csv
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# openpyxl is optional; without it the xlsx format is unavailable
+from utils.word_journal import get_word_journal
+
+try:
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+    EXCEL_SUPPORT = True
+except ImportError:
+    openpyxl = None
+    EXCEL_SUPPORT = False
+
+RECORD_FIELDS = ('category', 'word', 'meaning', 'phrase', 'expressions', 'media')
+
+# Spreadsheet columns, one per record field
+HEADERS = ['Category', 'Word', 'Meaning', 'Phrase', 'Expressions', 'Media']
+SHEET_NAME = 'Vocabulary'
+EXPRESSION_SEPARATOR = ';'
+TXT_SEPARATOR = ' | '
+
+# Other names a field goes by in older files
+FIELD_ALIASES = {
+    'video': 'media'
+}
+
+# xlsx column widths; write-only sheets need them before the first row
+COLUMN_WIDTHS = [15, 20, 50, 50, 50, 30]
+
+# Per-category JSON buffers stay in memory up to this size, then move to disk
+SPOOL_MAX_BYTES = 1024 * 1024
+
+# Characters read at a time by the streaming JSON reader
+JSON_READ_CHUNK = 64 * 1024
+
+EXTENSIONS = {
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.csv': 'csv',
+    '.xlsx': 'xlsx',
+    '.txt': 'txt',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite'
+}
+
+READERS = {}
+WRITERS = {}
+
+
+def register_reader(fmt):
+    """Decorator registering a reader: fn(source, **options) -> iterator of records"""
+    def decorator(fn):
+        READERS[fmt] = fn
+        return fn
+    return decorator
+
+
+def register_writer(fmt):
+    """Decorator registering a writer: fn(records, target, **options) -> word count"""
+    def decorator(fn):
+        WRITERS[fmt] = fn
+        return fn
+    return decorator
+
+
+def format_for(path, fmt=None):
+    """
+    Resolve the format of a file from an explicit name or its extension
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt is None:
+        if not isinstance(path, (str, os.PathLike)):
+            raise ValueError("Format must be given for in-memory sources")
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    fmt = (fmt or '').lstrip('.').lower()
+    if fmt not in READERS and fmt not in WRITERS:
+        raise ValueError(f"Unsupported format: {fmt or path}")
+    return fmt
+
+
+# ----------------------------------------------------------------------
+# Records
+# ----------------------------------------------------------------------
+def normalize_record(fields, category=None):
+    """
+    Build a normalized record from an entry or spreadsheet row
+
+    Keys are matched case-insensitively ("Word" and "word" both work) and
+    "video" is read as "media". Expressions may be a list or a
+    ';'-separated string.
+
+    Args:
+        fields (dict): Source entry or {header: value} row; empty cells may be None
+        category (str): Category to use when fields has none
+
+    Returns:
+        dict: Normalized record
+    """
+    record = {}
+    for key, value in fields.items():
+        if key is None:
+            continue
+        name = str(key).strip().lower()
+        name = FIELD_ALIASES.get(name, name)
+        if name and (name not in record or not record[name]):
+            record[name] = value
+
+    def text(name):
+        value = record.get(name)
+        return '' if value is None else str(value)
+
+    expressions = record.get('expressions')
+    if isinstance(expressions, (list, tuple)):
+        expressions = [str(expr).strip() for expr in expressions if str(expr).strip()]
+    else:
+        expressions = [expr.strip() for expr in text('expressions').split(EXPRESSION_SEPARATOR) if expr.strip()]
+
+    record.update({
+        'category': (text('category') or category or 'general').lower(),
+        'word': text('word'),
+        'meaning': text('meaning'),
+        'phrase': text('phrase'),
+        'expressions': expressions,
+        'media': text('media')
+    })
+    return record
+
+
+def record_to_entry(record):
+    """Split a record into (category, level-file entry); empty media is left out"""
+    entry = {key: value for key, value in record.items() if key != 'category'}
+    if not entry.get('media'):
+        entry.pop('media', None)
+    return record['category'], entry
+
+
+def record_to_row(record):
+    """Flatten a record into a spreadsheet row (in HEADERS order)"""
+    return [
+        record['category'],
+        record['word'],
+        record['meaning'],
+        record['phrase'],
+        '; '.join(record['expressions']),
+        record['media']
+    ]
+
+
+def records_to_word_pools(records):
+    """Group records into a {category: [entries]} mapping"""
+    word_pools = {}
+    for record in records:
+        category, entry = record_to_entry(record)
+        word_pools.setdefault(category, []).append(entry)
+    return word_pools
+
+
+def records_to_entries(records):
+    """Yield (category, entry) pairs, e.g. for json_manager.import_entries()"""
+    for record in records:
+        yield record_to_entry(record)
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Seekable binary stream over a bytes-like object, without copying it
+
+    Lets readers parse an upload's memoryview in place; tell() against size
+    gives the share of the buffer consumed so far.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    @property
+    def size(self):
+        return len(self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._position)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._position:self._position + n]
+        self._position += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def progress(self):
+        """Fraction of the buffer read so far (0.0 to 1.0)"""
+        return min(self._position / len(self._view), 1.0) if len(self._view) else 1.0
+
+
+@contextmanager
+def _open_text(source):
+    """Open a path, bytes or binary/text file object as text"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+            yield f
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    else:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = BufferReader(source)
+        if isinstance(source, io.RawIOBase):
+            source = io.BufferedReader(source)
+        wrapper = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+        try:
+            yield wrapper
+        finally:
+            # Leave the caller's buffer open
+            wrapper.detach()
+
+
+class _JSONStream:
+    """
+    Pull JSON values out of a text stream one at a time
+
+    Only the structure around the entries (the top-level object or list
+    and the category lists) is walked by hand; each entry is decoded with
+    json.JSONDecoder.raw_decode as soon as it has been read, so a large
+    file is never held as one parsed document.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(JSON_READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character ('' at the end of the stream)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        """Consume one of the given structural characters and return it"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value touching the end of the buffer (e.g. a number) may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def items(self):
+        """Yield the elements of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+
+# ----------------------------------------------------------------------
+# Readers
+# ----------------------------------------------------------------------
+@register_reader('json')
+def read_json(source):
+    """Read a {category: [entries]} level file, or a plain list of entries, one entry at a time"""
+    with _open_text(source) as f:
+        stream = _JSONStream(f)
+        if stream.peek() == '[':
+            for entry in stream.items():
+                yield normalize_record(entry)
+            return
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            category = stream.value()
+            stream.expect(':')
+            for entry in stream.items():
+                yield normalize_record(entry, category)
+            if stream.expect(',}') == '}':
+                return
+
+
+@register_reader('jsonl')
+def read_jsonl(source):
+    """Read one JSON entry (with its "category") per line"""
+    with _open_text(source) as f:
+        for line in f:
+            if line.strip():
+                yield normalize_record(json.loads(line))
+
+
+@register_reader('csv')
+def read_csv(source):
+    """Read a CSV file with a HEADERS-style header row"""
+    with _open_text(source) as f:
+        for row in csv.DictReader(f):
+            yield normalize_record(row)
+
+
+@register_reader('xlsx')
+def read_xlsx(source, sheet_name=SHEET_NAME):
+    """Read a worksheet row by row with openpyxl in read-only mode"""
+    if not EXCEL_SUPPORT:
+        raise RuntimeError("Excel support requires openpyxl")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BufferReader(source)
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name in workbook.sheetnames else workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+        headers = next(rows, None)
+        if headers is None:
+            return
+        for values in rows:
+            if values is None or all(value is None for value in values):
+                continue
+            yield normalize_record(dict(zip(headers, values)))
+    finally:
+        workbook.close()
+
+
+@register_reader('txt')
+def read_txt(source):
+    """Read "word | meaning | phrase | category" lines"""
+    with _open_text(source) as f:
+        for line in f:
+            parts = line.strip().split(TXT_SEPARATOR)
+            if len(parts) >= 4:
+                yield normalize_record({'word': parts[0], 'meaning': parts[1], 'phrase': parts[2],
+                                        'category': parts[3]})
+
+
+@register_reader('sqlite')
+def read_sqlite(source, level=1):
+    """Read one level of a vocabulary database (utils/sqlite_backend.py schema)"""
+    from utils.sqlite_backend import SQLiteVocabularyBackend
+    for category, entry in SQLiteVocabularyBackend(source).iter_level(level):
+        yield normalize_record(entry, category)
+
+
+# ----------------------------------------------------------------------
+# Writers
+# ----------------------------------------------------------------------
+class JSONCategoryWriter:
+    """
+    Build a {category: [entries]} JSON file one entry at a time
+
+    Entries are serialized as they arrive into one spool buffer per category
+    and stitched together on close; the output is identical to
+    json.dump(data, f, ensure_ascii=False, indent=2). The file is replaced
+    atomically through the word journal's checkpoint(), so journal records
+    pending for it (e.g. when it is a level file) are dropped rather than
+    replayed over the new contents.
+
+    Usage:
+        with JSONCategoryWriter("out.json") as writer:
+            writer.add("general", {"word": ...})
+    """
+
+    def __init__(self, json_file):
+        self.json_file = json_file
+        self.count = 0
+        self._spools = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+        return False
+
+    def add(self, category, word_entry):
+        """Append a word entry to a category"""
+        spool = self._spools.get(category)
+        if spool is None:
+            spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode='w+', encoding='utf-8')
+            self._spools[category] = spool
+        else:
+            spool.write(',\n')
+        text = json.dumps(word_entry, ensure_ascii=False, indent=2)
+        spool.write('    ' + text.replace('\n', '\n    '))
+        self.count += 1
+
+    def close(self):
+        """Write the JSON file and release the spools"""
+        def write(f):
+            if not self._spools:
+                f.write('{}')
+                return
+            f.write('{\n')
+            for i, (category, spool) in enumerate(self._spools.items()):
+                f.write(f'  {json.dumps(category, ensure_ascii=False)}: [\n')
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+                f.write('\n  ]' + (',\n' if i < len(self._spools) - 1 else '\n'))
+            f.write('}')
+        try:
+            get_word_journal().checkpoint(self.json_file, write=write)
+        finally:
+            self._discard()
+
+    def _discard(self):
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+
+
+@register_writer('json')
+def write_json(records, target):
+    """Write a {category: [entries]} level file"""
+    with JSONCategoryWriter(target) as writer:
+        for record in records:
+            writer.add(*record_to_entry(record))
+    return writer.count
+
+
+@register_writer('jsonl')
+def write_jsonl(records, target):
+    """Write one JSON record per line"""
+    count = 0
+    with open(target, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+@register_writer('csv')
+def write_csv(records, target):
+    """Write a CSV file with a HEADERS row"""
+    count = 0
+    with open(target, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for record in records:
+            writer.writerow(record_to_row(record))
+            count += 1
+    return count
+
+
+@register_writer('xlsx')
+def write_xlsx(records, target, sheet_name=SHEET_NAME):
+    """Write a worksheet with openpyxl in write-only mode"""
+    if not EXCEL_SUPPORT:
+        raise RuntimeError("Excel support requires openpyxl")
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    for i, width in enumerate(COLUMN_WIDTHS):
+        worksheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+    worksheet.append(HEADERS)
+    count = 0
+    for record in records:
+        worksheet.append(record_to_row(record))
+        count += 1
+    workbook.save(target)
+    return count
+
+
+@register_writer('txt')
+def write_txt(records, target):
+    """Write "word | meaning | phrase | category" lines"""
+    count = 0
+    with open(target, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(TXT_SEPARATOR.join((record['word'], record['meaning'], record['phrase'], record['category'])) + '\n')
+            count += 1
+    return count
+
+
+@register_writer('sqlite')
+def write_sqlite(records, target, level=1):
+    """Replace one level of a vocabulary database in a single transaction"""
+    from utils.sqlite_backend import SQLiteVocabularyBackend
+    return SQLiteVocabularyBackend(target).replace_level_entries(level, (record_to_entry(r) for r in records))
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------------
+def read_records(source, fmt=None, **options):
+    """
+    Stream normalized records from a file path, bytes or file object
+
+    Args:
+        source: Path, bytes/memoryview or file object
+        fmt (str): Format name; taken from the extension when source is a path
+        **options: Reader options (e.g. level for sqlite, sheet_name for xlsx)
+
+    Returns:
+        iterator: Normalized records
+    """
+    fmt = format_for(source, fmt)
+    if fmt not in READERS:
+        raise ValueError(f"Cannot read {fmt} files")
+    if fmt == 'json' and isinstance(source, (str, os.PathLike)):
+        # Level files may have journaled edits that are not on disk yet
+        get_word_journal().flush(source)
+    return READERS[fmt](source, **options)
+
+
+def write_records(records, target, fmt=None, **options):
+    """
+    Write normalized records to a file
+
+    Returns:
+        int: Number of words written
+    """
+    fmt = format_for(target, fmt)
+    if fmt not in WRITERS:
+        raise ValueError(f"Cannot write {fmt} files")
+    return WRITERS[fmt](records, target, **options)
+
+
+def convert_file(input_file, output_file, input_format=None, output_format=None,
+                 read_options=None, write_options=None):
+    """
+    Convert a vocabulary file in one streaming pass
+
+    Args:
+        input_file (str): Source file
+        output_file (str): Destination file
+        input_format (str): Source format (defaults to the extension)
+        output_format (str): Destination format (defaults to the extension)
+        read_options (dict): Options for the reader (optional)
+        write_options (dict): Options for the writer (optional)
+
+    Returns:
+        dict: "words" written and "categories" in first-seen order
+
+    Raises:
+        ValueError: If either format is not supported
+    """
+    categories = {}
+
+    def tracked(records):
+        for record in records:
+            categories.setdefault(record['category'], None)
+            yield record
+
+    records = read_records(input_file, input_format, **(read_options or {}))
+    words = write_records(tracked(records), output_file, output_format, **(write_options or {}))
+    return {"words": words, "categories": list(categories)}
+
+
+def default_output(input_file, suffix):
+    """Output path next to input_file with a new suffix (e.g. '.csv' or '_from_csv.json')"""
+    return f"{os.path.splitext(input_file)[0]}{suffix}"
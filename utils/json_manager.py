@@ -3,6 +3,12 @@
 import os
 import json
 
+from utils.vocabulary_store import get_vocabulary_store, normalize_level, STORAGE_BACKEND, LEVEL_FILES
+from utils.sqlite_backend import get_sqlite_backend
+from utils.word_journal import get_word_journal
+from utils.media_store import get_media_store, word_id
+from utils.validation import validate_word_entry, validate_batch, validate_frame, PANDAS_SUPPORT
+
 def load_json(file_path):
     if not os.path.exists(file_path):
         return {"error": "File not found"}
@@ -22,24 +28,206 @@ def add_words_to_json(word_entry, json_file="level1.json", category="general"):
         json_file (str): Path to the JSON file
         category (str): Category under which to add the word
     """
-    # Load existing data
-    if os.path.exists(json_file):
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    level = _sqlite_level(json_file)
+    if level:
+        get_sqlite_backend().add_word(level, category, word_entry)
+        return
+    
+    # One small fsync'd journal append instead of re-serializing the whole file;
+    # the journal creates the category on replay if it does not exist yet
+    get_word_journal().append("add", json_file, category=category, entry=word_entry)
+
+def update_word_fields(json_file, word, fields, category=None):
+    """
+    Update fields of an existing word entry
+    
+    Args:
+        json_file (str): Level file containing the word
+        word (str): Word to update (case-insensitive)
+        fields (dict): Fields to overwrite, e.g. {"expressions": [...]}
+        category (str): Category to look in first (optional)
+        
+    Returns:
+        bool: True if the word was found and updated
+    """
+    level = _sqlite_level(json_file)
+    if level:
+        existing = get_sqlite_backend().find_word(word, level)
+        if not get_sqlite_backend().update_word(level, word, fields):
+            return False
+        _move_media(word, existing[1], fields)
+        return True
+    
+    store = get_vocabulary_store()
+    store_level = store.level_for_file(json_file)
+    if store_level:
+        existing = store.find_word(word, store_level)
+        old_category = existing['category'] if existing else None
+    else:
+        data = get_word_journal().load(json_file)
+        old_category = next((cat for cat, words in data.items()
+                             if any(entry.get('word', '').lower() == word.lower() for entry in words)), None)
+    if old_category is None:
+        return False
+    
+    get_word_journal().append("update", json_file, word=word, category=category, fields=fields)
+    _move_media(word, old_category, fields)
+    return True
+
+def _move_media(word, category, fields):
+    """Carry a word's media mapping over when an update renames it or changes its category"""
+    new_word = fields.get('word') or word
+    new_category = fields.get('category') or category
+    if word_id(word, category) == word_id(new_word, new_category):
+        return
+    if get_media_store().copy(word_id(word, category), word_id(new_word, new_category)):
+        _release_media(word, [category])
+
+def _release_media(word, categories):
+    """
+    Drop the media mapping of a removed word unless a level still has it in that category
+
+    The blob itself is deleted by MediaStore.gc() once nothing references it.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        found = get_sqlite_backend().find_word(word)
+        remaining = {found[1].lower()} if found else set()
     else:
-        data = {}
+        store = get_vocabulary_store()
+        remaining = {(store.find_word(word, level) or {}).get('category', '').lower() for level in LEVEL_FILES}
+    for category in categories:
+        if category and category.lower() not in remaining:
+            get_media_store().unassign(word_id(word, category))
+
+def _sqlite_level(json_file):
+    """Return the level a file maps to when the SQLite backend is active, else None"""
+    if STORAGE_BACKEND != "sqlite":
+        return None
+    return get_vocabulary_store().level_for_file(json_file)
+        
+# Rows validated (and reported to the progress callback) at a time during import_entries()
+IMPORT_CHUNK_ROWS = 500
+
+def import_words(words_by_category, level=1, progress=None):
+    """
+    Merge a batch of word entries into a level file with a single atomic write
     
-    # Ensure category exists
-    if category not in data:
-        data[category] = []
+    Args:
+        words_by_category (dict or list): {category: [entries]} mapping, or a
+            plain list of entries which is imported into "general"
+        level (int): Target difficulty level (1, 2, or 3)
+        progress (callable): Called with the number of rows processed so far (optional)
+        
+    Returns:
+        dict: Counts of "added", "duplicates" and "rejected" rows plus an
+            "errors" list of (word, message) tuples for rejected rows
+    """
+    if isinstance(words_by_category, list):
+        words_by_category = {"general": words_by_category}
+    
+    entries = ((category, word_entry) for category, words in words_by_category.items() for word_entry in words)
+    return import_entries(entries, level=level, progress=progress)
+
+def import_entries(entries, level=1, progress=None, allowed_categories=None, dry_run=False):
+    """
+    Merge a stream of word entries into a level with a single atomic write
     
-    # Append new word entry
-    data[category].append(word_entry)
+    Entries are checked with validate_batch() (content, duplicates within the
+    import and against the level, optional category whitelist) in chunks of
+    IMPORT_CHUNK_ROWS as they stream in; only the valid rows are kept, and
+    nothing is written until the stream is exhausted.
     
-    # Save back to JSON file
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    Args:
+        entries (iterable): (category, entry) pairs, consumed once
+        level (int): Target difficulty level (1, 2, or 3)
+        progress (callable): Called with the number of rows validated so far
+            after each chunk (optional)
+        allowed_categories (iterable): Reject rows outside these categories (optional)
+        dry_run (bool): Validate only; nothing is written
+        
+    Returns:
+        dict: Counts of "added", "duplicates" and "rejected" rows, an "errors"
+            list of (word, message) tuples for rejected rows, and "validation",
+            the per-row report from validate_batch()
+    """
+    json_file = get_vocabulary_store().level_file(int(level))
+    journal = get_word_journal()
+    use_sqlite = STORAGE_BACKEND == "sqlite"
+    
+    validation = {"rows": 0, "valid": 0, "errors": {}, "duplicates": {}}
+    errors = []
+    accepted = []
+    first_rows = {}
+    
+    with journal.exclusive():
+        if use_sqlite:
+            data = get_sqlite_backend().load_word_pools(level)
+        else:
+            data = journal.load(json_file, default={})
+        existing = {entry.get('word', '').strip().lower() for level_words in data.values() for entry in level_words}
+        
+        def validate_chunk(rows):
+            offset = validation["rows"]
+            categories = [(category or "general").lower() for category, _ in rows]
+            words = [str(entry.get('word', '') or '').strip() for _, entry in rows]
+            columns = {
+                'word': words,
+                'meaning': [entry.get('meaning', '') for _, entry in rows],
+                'phrase': [entry.get('phrase', '') for _, entry in rows],
+                'category': categories
+            }
+            options = dict(existing_words=existing, allowed_categories=allowed_categories,
+                           first_rows=first_rows, offset=offset)
+            if PANDAS_SUPPORT:
+                # Column-wise checks on pandas Series
+                result = validate_frame(columns, **options)
+            else:
+                result = validate_batch(columns['word'], columns['meaning'], columns['phrase'], columns['category'], **options)
+            validation["rows"] += result["rows"]
+            validation["valid"] += result["valid"]
+            validation["errors"].update(result["errors"])
+            validation["duplicates"].update(result["duplicates"])
+            for i, (_, word_entry) in enumerate(rows):
+                if offset + i in result["errors"]:
+                    errors.append((words[i], result["errors"][offset + i][0]))
+                elif offset + i not in result["duplicates"]:
+                    new_entry = {k: v for k, v in word_entry.items() if k != 'category'}
+                    new_entry['word'] = words[i]
+                    accepted.append((categories[i], new_entry))
+            if progress:
+                progress(validation["rows"])
+        
+        chunk = []
+        for pair in entries:
+            chunk.append(pair)
+            if len(chunk) >= IMPORT_CHUNK_ROWS:
+                validate_chunk(chunk)
+                chunk = []
+        if chunk or not validation["rows"]:
+            validate_chunk(chunk)
         
+        report = {
+            "added": validation["valid"],
+            "duplicates": len(validation["duplicates"]),
+            "rejected": len(validation["errors"]),
+            "errors": errors,
+            "validation": validation
+        }
+        if dry_run or not accepted:
+            return report
+        
+        for category, new_entry in accepted:
+            data.setdefault(category, []).append(new_entry)
+        
+        if use_sqlite:
+            # One transaction replacing the level's rows
+            get_sqlite_backend().replace_level(level, data)
+        else:
+            # One atomic write; pending journal records for this file are already merged in
+            journal.checkpoint(json_file, data)
+    
+    return report
+
 def delete_word_from_file(word_to_delete, word_file):
     print(f"Deleting word: {word_to_delete} from file: {word_file}")
     """Delete a word from the vocabulary file (supports both JSON and text formats)"""
@@ -68,25 +256,33 @@ def delete_word_from_file(word_to_delete, word_file):
 
 def delete_word_from_json(word_to_delete, json_file):
     """Delete a word from a JSON vocabulary file"""
+    sqlite_level = _sqlite_level(json_file)
+    if sqlite_level:
+        existing = get_sqlite_backend().find_word(word_to_delete, sqlite_level)
+        if get_sqlite_backend().delete_word(sqlite_level, word_to_delete):
+            _release_media(word_to_delete, [existing[1]])
+            print(f"Successfully deleted '{word_to_delete}' from {json_file}")
+            return True
+        print(f"Word '{word_to_delete}' not found in {json_file}")
+        return False
+    
     try:
-        # Load the JSON data
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Level files are checked through the store's word index
+        store = get_vocabulary_store()
+        level = store.level_for_file(json_file)
+        if level:
+            existing = store.find_word(word_to_delete, level)
+            categories = [existing['category']] if existing else []
+        else:
+            data = get_word_journal().load(json_file)
+            categories = [category for category, words in data.items()
+                          if any(word.get('word', '').lower() == word_to_delete.lower() for word in words)]
         
-        # Search through all categories and remove the word
-        word_found = False
-        for category, words in data.items():
-            # Filter out the word to delete (case-insensitive)
-            original_count = len(words)
-            data[category] = [word for word in words if word.get('word', '').lower() != word_to_delete.lower()]
-            if len(data[category]) < original_count:
-                word_found = True
+        if categories:
+            get_word_journal().append("delete", json_file, word=word_to_delete)
+            _release_media(word_to_delete, categories)
+            for category in categories:
                 print(f"Word '{word_to_delete}' found and removed from category '{category}'")
-        
-        if word_found:
-            # Save the updated data back to the file
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
             print(f"Successfully deleted '{word_to_delete}' from {json_file}")
             return True
         else:
@@ -99,35 +295,35 @@ def delete_word_from_json(word_to_delete, json_file):
 
 def load_vocabulary_with_expressions(level):
     """Load vocabulary from JSON files with expressions included"""
-    import json
-    
     if level == "learned":
         return load_learned_words()
     
-    # Map level to filename
-    level_files = {
-        1: "level1.json",
-        2: "level2.json", 
-        3: "level3.json"
-    }
+    if STORAGE_BACKEND == "sqlite":
+        return get_sqlite_backend().load_vocabulary_with_expressions(level) if normalize_level(level) else []
     
-    filename = level_files.get(level)
-    if not filename or not os.path.exists(filename):
+    # The shared store parses each level once and flattens categories at load time
+    try:
+        return get_vocabulary_store().words(level)
+    except (json.JSONDecodeError, FileNotFoundError):
         return []
+
+def load_vocabulary_by_category(level, category):
+    """
+    Load the words of one category using the store's category index
     
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Flatten all categories into a single list
-        all_words = []
-        for category, words in data.items():
-            for word_entry in words:
-                # Add category to each word entry
-                word_entry['category'] = category
-                all_words.append(word_entry)
+    Args:
+        level (int or str): Difficulty level (1, 2, 3) or "learned"
+        category (str): Category to load, or None for every category
         
-        return all_words
+    Returns:
+        list: List of word dictionaries in the category
+    """
+    if level == "learned" or category is None or STORAGE_BACKEND == "sqlite":
+        words = load_vocabulary_with_expressions(level)
+        return words if category is None else filter_words_by_category(words, category)
+    
+    try:
+        return get_vocabulary_store().words_in_category(level, category)
     except (json.JSONDecodeError, FileNotFoundError):
         return []
 
@@ -191,12 +387,9 @@ def load_learned_words(learned_file="learned.json"):
     """Load learned words from learned.json and convert to vocabulary format"""
     import json
     
-    if not os.path.exists(learned_file):
-        return []
-    
     try:
-        with open(learned_file, 'r', encoding='utf-8') as f:
-            learned_words = json.load(f)
+        # Includes learn operations still pending in the journal
+        learned_words = get_word_journal().load(learned_file, default=[])
         
         # Convert to the same format as regular vocabulary
         formatted_words = []
@@ -218,8 +411,8 @@ def save_learned_words_to_file(learned_words, learned_file="learned.json"):
     """Save learned words back to JSON file"""
     import json
     
-    with open(learned_file, 'w', encoding='utf-8') as f:
-        json.dump(learned_words, f, ensure_ascii=False, indent=2)
+    # Full rewrite that also drops this file's pending journal records
+    get_word_journal().checkpoint(learned_file, learned_words)
     
     return True
 
@@ -228,13 +421,10 @@ def save_to_learned(word_entry, learned_file="learned.json"):
     import json
     
     # Load existing learned words
-    learned_words = []
-    if os.path.exists(learned_file):
-        try:
-            with open(learned_file, 'r', encoding='utf-8') as f:
-                learned_words = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            learned_words = []
+    try:
+        learned_words = get_word_journal().load(learned_file, default=[])
+    except (json.JSONDecodeError, FileNotFoundError):
+        learned_words = []
     
     # Add timestamp to the entry
     import datetime
@@ -244,11 +434,7 @@ def save_to_learned(word_entry, learned_file="learned.json"):
     # Check if word already exists in learned list
     existing_word = next((w for w in learned_words if w['word'].lower() == word_entry['word'].lower()), None)
     if not existing_word:
-        learned_words.append(word_entry_with_timestamp)
-        
-        # Save back to file
-        with open(learned_file, 'w', encoding='utf-8') as f:
-            json.dump(learned_words, f, ensure_ascii=False, indent=2)
+        get_word_journal().append("learn", learned_file, entry=word_entry_with_timestamp)
         return True
     return False
 
@@ -289,34 +475,3 @@ def get_category_statistics(word_list):
         category_stats[category] = category_stats.get(category, 0) + 1
     return category_stats
 
-
-def validate_word_entry(word, meaning, phrase="", category="general"):
-    """
-    Validate word entry data
-    
-    Args:
-        word (str): The vocabulary word
-        meaning (str): The word's meaning
-        phrase (str): Example phrase (optional)
-        category (str): Word category
-        
-    Returns:
-        tuple: (is_valid, error_message)
-    """
-    if not word or not word.strip():
-        return False, "Word cannot be empty"
-    
-    if not meaning or not meaning.strip():
-        return False, "Meaning cannot be empty"
-    
-    if len(word.strip()) > 100:
-        return False, "Word is too long (max 100 characters)"
-    
-    
-    if len(meaning.strip()) > 500:
-        return False, "Meaning is too long (max 500 characters)"
-    
-    if phrase and len(phrase.strip()) > 500:
-        return False, "Phrase is too long (max 500 characters)"
-    
-    return True, ""
@@ -3,7 +3,6 @@ Main utility functions for vocabulary builder applications
 Contains reusable functions that can be used across different apps
 """
 
-import pyttsx3
 from gtts import gTTS
 import io
 import tempfile
@@ -14,6 +13,13 @@ import random
 import asyncio
 random.seed(42)
 
+from utils.vocabulary_store import get_vocabulary_store, STORAGE_BACKEND
+from utils.sqlite_backend import get_sqlite_backend
+from utils.audio_cache import get_audio_cache
+from utils.tts_worker import get_tts_worker, DEFAULT_TIMEOUT as TTS_TIMEOUT
+from utils.tts_service import get_tts_service
+from utils.quiz_index import QuizIndex
+
 
 def load_word_pools(level=1):
     """
@@ -25,12 +31,17 @@ def load_word_pools(level=1):
     Returns:
         dict: Dictionary containing word pools for each category
     """
+    if STORAGE_BACKEND == "sqlite":
+        return get_sqlite_backend().load_word_pools(level)
+    
     json_file = f"level{level}.json"
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            word_pools = json.load(f)
-            #print(f"Loaded {len(word_pools)} categories from {json_file}")
-            return word_pools
+        # Served from the shared in-memory store; re-parsed only when the file changes
+        word_pools = get_vocabulary_store().word_pools(level)
+        if word_pools is None:
+            raise FileNotFoundError(json_file)
+        #print(f"Loaded {len(word_pools)} categories from {json_file}")
+        return word_pools
     except FileNotFoundError:
         # print(f"Error: {json_file} not found")
         # Fallback to word_pools.json if level file doesn't exist
@@ -58,109 +69,91 @@ def detect_language(text):
     else:
         return 'en'
 
-async def create_audio_file(text, filename, is_phrase=False, speed="normal"):
+def render_audio_file(text, is_phrase=False, speed="normal"):
     """
-    Create audio file for text-to-speech with American English voice (cloud-compatible)
+    Render speech for text with American English voice (cloud-compatible)
+    
+    Blocking; the apps call it through the shared TTS service
+    (utils/tts_service.py) rather than directly.
     
     Args:
         text (str): Text to convert to speech
-        filename (str): Name for the temporary audio file
         is_phrase (bool): Whether the text is a phrase (affects speech rate)
         speed (str): Speed setting - "normal", "0.9", or "0.8"
         
     Returns:
-        str or None: Path to the created audio file, or None if failed
+        str or None: Path to the audio file, or None if failed
     """
+    # Pre-rendered clips (prerender_audio.py) are found through the manifest
+    cache = get_audio_cache()
+    cached_file = cache.lookup(text, speed, is_phrase)
+    if cached_file:
+        return cached_file
+    
     # Detect language first
     detected_language = detect_language(text)
     
+    # Repeated plays are served from the persistent audio cache
+    for engine_name in (["pyttsx3", "gtts"] if detected_language == 'en' else ["gtts"]):
+        cached_file = cache.get(text, detected_language, engine_name, speed, is_phrase)
+        if cached_file:
+            return cached_file
+    
     # Only use pyttsx3 for English text, use gTTS for other languages
     if detected_language == 'en':
-        # Try pyttsx3 first (for local development with English)
+        # Try pyttsx3 first (for local development with English); the shared
+        # worker keeps one engine warm with the voice already selected.
+        # Render into the cache directory, then move into place under the cache key
+        temp_file = cache.staging_path("pyttsx3")
         try:
-            # Run pyttsx3 in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            def _create_with_pyttsx3():
-                engine = pyttsx3.init()
-                
-                # Get available voices
-                voices = engine.getProperty('voices')
-                
-                # Try to find an American English voice
-                american_voice = None
-                for voice in voices:
-                    # Look for American English voices (common identifiers)
-                    if voice.id and any(identifier in voice.id.lower() for identifier in ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']):
-                        american_voice = voice.id
-                        break
-                    # Fallback: look for any English voice
-                    elif voice.id and 'en' in voice.id.lower():
-                        american_voice = voice.id
-                
-                # Set the American English voice if found
-                if american_voice:
-                    engine.setProperty('voice', american_voice)
-                
-                # Base speech rates
-                base_word_rate = 160
-                base_phrase_rate = 140
-                
-                # Apply speed multiplier
-                speed_multipliers = {
-                    "normal": 1.0,
-                    "0.9": 0.9,
-                    "0.8": 0.8
-                }
-                
-                multiplier = speed_multipliers.get(speed, 1.0)
-                
-                # Adjust settings for phrases vs single words with speed options
-                if is_phrase:
-                    final_rate = int(base_phrase_rate * multiplier)
-                else:
-                    final_rate = int(base_word_rate * multiplier)
-                
-                engine.setProperty('rate', final_rate)
-                engine.setProperty('volume', 0.9)
-                
-                # Create temporary file path
-                temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.wav")
-                engine.save_to_file(text, temp_file)
-                engine.runAndWait()
-                return temp_file
-            
-            return await loop.run_in_executor(None, _create_with_pyttsx3)
+            get_tts_worker().submit(text, temp_file, is_phrase, speed).result(timeout=TTS_TIMEOUT)
+            cached_file = cache.commit(temp_file, text, detected_language, "pyttsx3", speed, is_phrase)
+            if cached_file:
+                return cached_file
+            print("pyttsx3 produced no audio, trying gTTS...")
             
         except Exception as e:
+            cache.discard(temp_file)
             print(f"pyttsx3 failed ({e}), trying gTTS for cloud compatibility...")
     
     # Use gTTS for non-English languages or if pyttsx3 failed
+    temp_file = cache.staging_path("gtts")
     try:
-        # Run gTTS in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
+        # Adjust speed for gTTS (it only has slow/normal)
+        use_slow_speech = speed in ["1.0", "0.9"] or is_phrase
         
-        def _create_with_gtts():
-            # Adjust speed for gTTS (it only has slow/normal)
-            use_slow_speech = speed in ["1.0", "0.9"] or is_phrase
-            
-            # Create TTS object
-            tts = gTTS(text=text, lang=detected_language, slow=use_slow_speech)
-            print(f"Detected language: {detected_language} for text: '{text}'")
-            # Create temporary file path (MP3 format for gTTS)
-            temp_file = os.path.join(tempfile.gettempdir(), f"{filename}.mp3")
-            tts.save(temp_file)
-            
-            print(f"Created audio file using gTTS: {temp_file}")
-            return temp_file
+        # Create TTS object
+        tts = gTTS(text=text, lang=detected_language, slow=use_slow_speech)
+        print(f"Detected language: {detected_language} for text: '{text}'")
+        tts.save(temp_file)
         
-        return await loop.run_in_executor(None, _create_with_gtts)
+        cached_file = cache.commit(temp_file, text, detected_language, "gtts", speed, is_phrase)
+        print(f"Created audio file using gTTS: {cached_file}")
+        return cached_file
         
     except Exception as e2:
+        cache.discard(temp_file)
         print(f"gTTS failed: {e2}")
         return None
 
 
+async def create_audio_file(text, filename, is_phrase=False, speed="normal"):
+    """
+    Create audio file for text-to-speech with American English voice (cloud-compatible)
+    
+    Args:
+        text (str): Text to convert to speech
+        filename (str): Kept for compatibility; clips are named by their cache key
+        is_phrase (bool): Whether the text is a phrase (affects speech rate)
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+        
+    Returns:
+        str or None: Path to the created audio file, or None if failed
+    """
+    # Rendered on the shared TTS service's pool; identical in-flight requests share one job
+    return await asyncio.wrap_future(get_tts_service().submit(text, is_phrase, speed))
+
+
 def cleanup_audio_file(file_path):
     """
     Clean up temporary audio file
@@ -169,23 +162,21 @@ def cleanup_audio_file(file_path):
         file_path (str): Path to the audio file to delete
     """
     try:
-        if file_path and os.path.exists(file_path):
+        # Cached clips are kept for the next play; eviction removes them
+        if file_path and os.path.exists(file_path) and not get_audio_cache().contains(file_path):
             os.remove(file_path)
     except Exception as e:
         print(f"Warning: Could not delete temporary file {file_path}: {e}")
 
-def generate_quiz_question(words, correct_word):
-    """Generate a multiple choice quiz question"""
-    options = [correct_word]
-    other_words = [w for w in words if w['word'] != correct_word['word']]
-    
-    # Add 3 random wrong options
-    wrong_options = random.sample(other_words, min(3, len(other_words)))
-    for word in wrong_options:
-        options.append(word)
+def generate_quiz_question(words, correct_word, quiz_index=None):
+    """
+    Generate a multiple choice quiz question
     
-    random.shuffle(options)
-    return options
+    Pass a cached index from utils.quiz_index.get_quiz_index() when asking
+    several questions about the same words; otherwise one is built here.
+    """
+    quiz_index = quiz_index or QuizIndex(words)
+    return quiz_index.question(correct_word)
 
 # Constants
 DEFAULT_CATEGORIES = ["General", "Science", "Business", "Literature", "Travel", "History", "Geography", "Health"]
@@ -0,0 +1,119 @@
+"""
+Resized variants of media images for the Streamlit views
+Study lists show small thumbnails and the full-size view a display-size
+copy instead of sending original (e.g. 1024x1024) files to the browser on
+every card render. Derivatives are cached on disk under a name made from
+the source's SHA-256 and the target size, so edits to a source produce new
+derivatives and identical sources share them. Pillow is optional: without
+it every request falls back to the original file.
+"""
+
+import os
+import threading
+
+from utils.batch_conversion import file_digest, input_signature
+
+try:
+    from PIL import Image
+    PIL_SUPPORT = True
+except ImportError:
+    PIL_SUPPORT = False
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "media")
+
+# Longest edge in pixels per named variant
+DERIVATIVE_SIZES = {
+    "thumb": 320,
+    "display": 768
+}
+
+# Animated or vector formats are served as-is
+RESIZABLE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+
+JPEG_QUALITY = 82
+
+
+class MediaDerivatives:
+    """
+    Disk cache of resized images keyed by (source hash, size)
+
+    Source hashes are memoized per (path, mtime, size) so a rerun only
+    stats the file; the image is decoded only when a derivative is missing.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def _source_digest(self, source_path):
+        signature = input_signature(source_path)
+        key = os.path.abspath(source_path)
+        with self._lock:
+            cached = self._digests.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = file_digest(source_path)
+        with self._lock:
+            self._digests[key] = (signature, digest)
+        return digest
+
+    def get(self, source_path, size="thumb", digest=None):
+        """
+        Return the path of a resized copy of an image, creating it if needed
+
+        Args:
+            source_path (str): Local image file
+            size (str or int): Name from DERIVATIVE_SIZES or longest edge in pixels
+            digest (str): Known SHA-256 of the source (e.g. from the media manifest)
+
+        Returns:
+            str: Path of the derivative, or source_path when the file cannot or
+                need not be resized (no Pillow, unsupported format, already small)
+        """
+        max_edge = DERIVATIVE_SIZES.get(size, size)
+        ext = os.path.splitext(str(source_path))[1].lower()
+        if not PIL_SUPPORT or ext not in RESIZABLE_EXTENSIONS:
+            return str(source_path)
+        try:
+            digest = digest or self._source_digest(source_path)
+            # JPEG unless the source may carry transparency
+            out_ext = '.png' if ext in ('.png', '.webp') else '.jpg'
+            target = os.path.join(self.cache_dir, digest[:2], f"{digest}_{max_edge}{out_ext}")
+            if os.path.exists(target):
+                return target
+
+            with Image.open(source_path) as img:
+                if max(img.size) <= max_edge:
+                    return str(source_path)
+                img.thumbnail((max_edge, max_edge))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                # Write to a per-thread temp name so concurrent sessions never see a partial file
+                temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.part"
+                if out_ext == '.jpg':
+                    img.convert('RGB').save(temp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+                else:
+                    img.save(temp_path, 'PNG', optimize=True)
+            os.replace(temp_path, target)
+            return target
+        except Exception as e:
+            print(f"Error creating {max_edge}px derivative of {source_path}: {e}")
+            return str(source_path)
+
+
+_media_derivatives = None
+_media_derivatives_lock = threading.Lock()
+
+
+def get_media_derivatives():
+    """Return the process-wide MediaDerivatives cache"""
+    global _media_derivatives
+    with _media_derivatives_lock:
+        if _media_derivatives is None:
+            _media_derivatives = MediaDerivatives()
+        return _media_derivatives
+
+
+def derivative_path(source_path, size="thumb", digest=None):
+    """Shortcut for get_media_derivatives().get(source_path, size, digest)"""
+    return get_media_derivatives().get(source_path, size, digest)
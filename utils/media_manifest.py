@@ -0,0 +1,310 @@
+"""
+Manifest of the files under media/
+One scan records each file's type, size, hash and dimensions/duration;
+later refreshes only re-list directories whose mtime changed and re-stat
+the files already indexed (re-probing those whose size or mtime moved), so card
+rendering can answer "does this media exist and what is it" with a dict
+lookup instead of stat calls and extension sniffing on every rerun.
+"""
+
+import os
+import json
+import time
+import wave
+import shutil
+import threading
+import subprocess
+from pathlib import Path
+
+from utils.batch_conversion import file_digest
+from utils.word_journal import atomic_write_json
+
+try:
+    from PIL import Image
+    PIL_SUPPORT = True
+except ImportError:
+    PIL_SUPPORT = False
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MEDIA_DIR = "media"
+DEFAULT_MANIFEST_FILE = os.path.join(".cache", "media_manifest.json")
+
+# Seconds between directory checks; lookups in between are pure dict reads
+REFRESH_INTERVAL = 5.0
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg'}
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm'}
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.ogg', '.m4a', '.flac', '.aac'}
+
+
+def media_type_for(file_path):
+    """Return "image", "video", "audio" or "unknown" from the file extension"""
+    ext = os.path.splitext(str(file_path))[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return "image"
+    if ext in VIDEO_EXTENSIONS:
+        return "video"
+    if ext in AUDIO_EXTENSIONS:
+        return "audio"
+    return "unknown"
+
+
+def _probe_duration(file_path):
+    """Duration in seconds for WAV files, or via ffprobe when it is installed"""
+    if file_path.lower().endswith('.wav'):
+        try:
+            with wave.open(file_path, 'rb') as w:
+                return round(w.getnframes() / float(w.getframerate()), 3)
+        except (wave.Error, EOFError, OSError, ZeroDivisionError):
+            return None
+    if not shutil.which("ffprobe"):
+        return None
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", file_path],
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+        return round(float(output), 3) if output else None
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def probe_media_file(file_path, stat_result=None):
+    """
+    Describe one media file
+
+    Args:
+        file_path (str): Absolute file path
+        stat_result (os.stat_result): Stat of the file if already known
+
+    Returns:
+        dict: type, size, mtime_ns, sha256, and width/height (images) or
+            duration (audio/video) when they can be determined
+    """
+    st = stat_result or os.stat(file_path)
+    media_type = media_type_for(file_path)
+    info = {
+        "type": media_type,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_digest(file_path)
+    }
+    if media_type == "image" and PIL_SUPPORT and not file_path.lower().endswith('.svg'):
+        try:
+            with Image.open(file_path) as img:
+                info["width"], info["height"] = img.size
+        except Exception:
+            pass
+    elif media_type in ("audio", "video"):
+        info["duration"] = _probe_duration(file_path)
+    return info
+
+
+class MediaManifest:
+    """
+    Incrementally refreshed index of a media directory
+
+    Files are keyed by their path relative to the project root with forward
+    slashes (the form stored in word entries, e.g. "media/general/x.jpg").
+    A directory is only re-listed when its mtime changed, which is the case
+    whenever a file in it is added, removed or renamed. Files overwritten in
+    place leave the directory mtime alone, so indexed files are re-stat'ed
+    on every refresh as well.
+    """
+
+    def __init__(self, base_dir=PROJECT_ROOT, media_dir=DEFAULT_MEDIA_DIR, manifest_file=DEFAULT_MANIFEST_FILE):
+        self.base_dir = Path(base_dir).resolve()
+        self.media_dir = media_dir
+        self.manifest_file = str(self.base_dir / manifest_file)
+        self._dirs = {}
+        self._files = {}
+        self._checked = 0.0
+        self._lock = threading.RLock()
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._dirs = data.get("dirs", {})
+            self._files = data.get("files", {})
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def key_for(self, media_path):
+        """Return the manifest key of a path, or None if it lies outside the media directory"""
+        path = Path(media_path)
+        if not path.is_absolute():
+            path = self.base_dir / path
+        try:
+            key = Path(os.path.normpath(path)).relative_to(self.base_dir).as_posix()
+        except ValueError:
+            return None
+        if key != self.media_dir and not key.startswith(self.media_dir + "/"):
+            return None
+        return key
+
+    def _scan_dir(self, rel_dir, changed):
+        """Walk one directory, re-listing it only if its mtime moved and re-stat'ing its files otherwise"""
+        abs_dir = self.base_dir / rel_dir
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            return
+        known = self._dirs.get(rel_dir)
+        prefix = rel_dir + "/"
+        if known and known["mtime_ns"] == mtime_ns:
+            subdirs = known["subdirs"]
+            for rel in [r for r in self._files if r.startswith(prefix) and "/" not in r[len(prefix):]]:
+                file_path = str(self.base_dir / rel)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    del self._files[rel]
+                    changed.append(rel_dir)
+                    continue
+                cached = self._files[rel]
+                if (cached["size"], cached["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+                    self._files[rel] = probe_media_file(file_path, st)
+                    changed.append(rel_dir)
+        else:
+            subdirs = []
+            present = set()
+            with os.scandir(abs_dir) as entries:
+                for entry in entries:
+                    rel = f"{rel_dir}/{entry.name}"
+                    if entry.is_dir():
+                        subdirs.append(rel)
+                    elif entry.is_file() and not entry.name.startswith('.'):
+                        present.add(rel)
+                        st = entry.stat()
+                        cached = self._files.get(rel)
+                        if not cached or (cached["size"], cached["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+                            self._files[rel] = probe_media_file(entry.path, st)
+            # Files that disappeared from this directory
+            for rel in [r for r in self._files if r.startswith(prefix) and "/" not in r[len(prefix):]]:
+                if rel not in present:
+                    del self._files[rel]
+            self._dirs[rel_dir] = {"mtime_ns": mtime_ns, "subdirs": subdirs}
+            changed.append(rel_dir)
+        for rel in subdirs:
+            self._scan_dir(rel, changed)
+
+    def refresh(self, force=False):
+        """
+        Bring the manifest up to date with the media directory
+
+        Args:
+            force (bool): Check directories even within REFRESH_INTERVAL
+
+        Returns:
+            bool: True if anything changed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked < REFRESH_INTERVAL:
+                return False
+            self._checked = now
+            changed = []
+            self._scan_dir(self.media_dir, changed)
+            # Drop directories (and their files) that no longer exist
+            live = set()
+            pending = [self.media_dir]
+            while pending:
+                rel = pending.pop()
+                if rel in self._dirs:
+                    live.add(rel)
+                    pending.extend(self._dirs[rel]["subdirs"])
+            for rel in [d for d in self._dirs if d not in live]:
+                del self._dirs[rel]
+                changed.append(rel)
+            for rel in [f for f in self._files if f.rsplit("/", 1)[0] not in live]:
+                del self._files[rel]
+            if changed:
+                directory = os.path.dirname(self.manifest_file)
+                os.makedirs(directory, exist_ok=True)
+                atomic_write_json(self.manifest_file, {"dirs": self._dirs, "files": self._files})
+            return bool(changed)
+
+    def lookup(self, media_path):
+        """
+        Describe a media path without touching the file system (for files under media/)
+
+        Paths outside the media directory are not indexed and are stat'ed directly.
+
+        Args:
+            media_path (str): Path as stored in a word entry, relative or absolute
+
+        Returns:
+            dict: The probe info plus "path" (absolute), or None if the file does not exist
+        """
+        if not media_path or str(media_path).startswith(("http://", "https://")):
+            return None
+        key = self.key_for(media_path)
+        if key is None:
+            path = Path(media_path)
+            if not path.is_absolute():
+                path = self.base_dir / path
+            if not path.is_file():
+                return None
+            return {"type": media_type_for(path), "size": path.stat().st_size, "path": str(path)}
+        self.refresh()
+        with self._lock:
+            info = self._files.get(key)
+        if info is None:
+            return None
+        return dict(info, path=str(self.base_dir / key))
+
+    def files(self):
+        """Return a copy of the {key: info} mapping after a refresh"""
+        self.refresh()
+        with self._lock:
+            return dict(self._files)
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_media_manifest():
+    """Return the process-wide MediaManifest"""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = MediaManifest()
+        return _manifest
+
+
+def lookup_media(media_path):
+    """Shortcut for get_media_manifest().lookup(media_path)"""
+    return get_media_manifest().lookup(media_path)
+
+
+def missing_media_report(levels=(1, 2, 3)):
+    """
+    List words whose local media path points at a file that does not exist
+
+    Args:
+        levels (iterable): Levels to check
+
+    Returns:
+        list: (level, category, word, media_path) tuples
+    """
+    from utils.vocabulary_store import get_vocabulary_store
+    store = get_vocabulary_store()
+    manifest = get_media_manifest()
+    manifest.refresh(force=True)
+    missing = []
+    for level in levels:
+        for entry in store.words(level):
+            media_path = entry.get('media') or entry.get('video')
+            if not media_path or str(media_path).startswith(("http://", "https://")):
+                continue
+            if manifest.lookup(media_path) is None:
+                missing.append((level, entry.get('category', ''), entry['word'], media_path))
+    return missing
+
+
+if __name__ == "__main__":
+    missing = missing_media_report()
+    for level, category, word, media_path in missing:
+        print(f"❌ level{level} / {category} / {word}: {media_path}")
+    print(f"📁 {len(missing)} words with missing media")
@@ -0,0 +1,311 @@
+"""
+Content-addressed storage for word media
+Files are stored once under media/blobs/<hash[:2]>/<sha256><ext>, however
+many words, pools or levels use them, and a mapping table records which
+blob belongs to each word id. Copying media to another word or level only
+adds a mapping entry, renames of words or phrases no longer orphan files,
+and gc() deletes blobs nothing refers to any more.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+from utils.batch_conversion import file_digest
+from utils.word_journal import atomic_write_json, get_word_journal
+
+DEFAULT_MEDIA_DIR = "media"
+BLOB_DIR = os.path.join(DEFAULT_MEDIA_DIR, "blobs")
+DEFAULT_MAP_FILE = os.path.join(DEFAULT_MEDIA_DIR, "media_map.json")
+
+# Files that may reference media besides the mapping table
+WORD_POOL_FILES = ["word_pools.json", "word_pools_with_media.json"]
+LEARNED_FILE = "learned.json"
+LEVELS = (1, 2, 3)
+
+# Blobs younger than this survive gc() even if unreferenced (e.g. an upload
+# whose word has not been saved yet)
+GC_GRACE_SECONDS = 3600
+
+
+def word_id(word, category):
+    """
+    Identify a word for the mapping table
+
+    Levels are deliberately not part of the id, so the same word in
+    another level (or moved between levels) shares its media.
+    """
+    return f"{str(category).strip().lower()}/{str(word).strip().lower()}"
+
+
+def _norm(path):
+    return str(path).replace("\\", "/")
+
+
+class MediaStore:
+    """
+    Hash-named media blobs plus a {word id: blob path} mapping table
+
+    Blob paths are relative, forward-slash paths (e.g.
+    "media/blobs/3f/3f9c...e1.jpg"), the same form stored in word entries.
+    """
+
+    def __init__(self, blob_dir=BLOB_DIR, map_file=DEFAULT_MAP_FILE):
+        self.blob_dir = blob_dir
+        self.map_file = map_file
+        self._lock = threading.Lock()
+        try:
+            with open(map_file, 'r', encoding='utf-8') as f:
+                self._map = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._map = {}
+
+    def _blob_path(self, digest, ext):
+        return _norm(os.path.join(self.blob_dir, digest[:2], f"{digest}{ext.lower()}"))
+
+    def is_blob(self, media_path):
+        """Return True if media_path points into the blob directory"""
+        return bool(media_path) and _norm(media_path).startswith(_norm(self.blob_dir) + "/")
+
+    def _store(self, blob_path, write):
+        if os.path.exists(blob_path):
+            # Reused blobs restart the gc() grace period like freshly written ones
+            try:
+                os.utime(blob_path)
+            except OSError:
+                pass
+            return blob_path
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.part"
+        write(temp_path)
+        os.replace(temp_path, blob_path)
+        return blob_path
+
+    def put_bytes(self, data, ext):
+        """
+        Store media content (e.g. an upload buffer)
+
+        Args:
+            data (bytes or memoryview): File content
+            ext (str): File extension including the dot, e.g. ".jpg"
+
+        Returns:
+            str: Blob path; storing identical content again writes nothing
+        """
+        blob_path = self._blob_path(hashlib.sha256(data).hexdigest(), ext)
+
+        def write(temp_path):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        return self._store(blob_path, write)
+
+    def put_file(self, file_path, move=False):
+        """
+        Store an existing media file
+
+        Args:
+            file_path (str): File to add
+            move (bool): Remove the original once it is stored
+
+        Returns:
+            str: Blob path
+        """
+        blob_path = self._blob_path(file_digest(file_path), os.path.splitext(file_path)[1])
+        self._store(blob_path, lambda temp_path: shutil.copyfile(file_path, temp_path))
+        if move and os.path.abspath(file_path) != os.path.abspath(blob_path):
+            os.remove(file_path)
+        return blob_path
+
+    def blob_for(self, word_key):
+        """Return the blob path mapped to a word id, or None"""
+        with self._lock:
+            return self._map.get(word_key)
+
+    def assign(self, word_key, blob_path, save=True):
+        """Map a word id to a blob"""
+        with self._lock:
+            if self._map.get(word_key) == _norm(blob_path):
+                return
+            self._map[word_key] = _norm(blob_path)
+        if save:
+            self.save()
+
+    def copy(self, source_key, target_key):
+        """Give target_key the same media as source_key (no file is copied)"""
+        blob_path = self.blob_for(source_key)
+        if blob_path:
+            self.assign(target_key, blob_path)
+        return blob_path
+
+    def unassign(self, word_key):
+        """Drop a word's mapping; its blob is removed by gc() once unreferenced"""
+        with self._lock:
+            removed = self._map.pop(word_key, None)
+        if removed:
+            self.save()
+        return removed
+
+    def save(self):
+        """Write the mapping table"""
+        with self._lock:
+            mapping = dict(self._map)
+        directory = os.path.dirname(self.map_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        atomic_write_json(self.map_file, mapping)
+
+    def referenced_blobs(self):
+        """Blob paths used by the mapping table, the word pool files, the level files and learned.json"""
+        from utils.vocabulary_store import get_vocabulary_store
+        with self._lock:
+            referenced = set(self._map.values())
+        for pool_file in WORD_POOL_FILES:
+            try:
+                with open(pool_file, 'r', encoding='utf-8') as f:
+                    pools = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            for words in pools.values():
+                referenced.update(_norm(entry.get('media') or '') for entry in words if isinstance(entry, dict))
+        store = get_vocabulary_store()
+        for level in LEVELS:
+            referenced.update(_norm(entry.get('media') or '') for entry in store.words(level))
+        # Learned words keep the media they had in their level; read through the journal
+        referenced.update(_norm(entry.get('media') or '') for entry in _load_learned() if isinstance(entry, dict))
+        return {path for path in referenced if self.is_blob(path)}
+
+    def gc(self, dry_run=False, grace_seconds=GC_GRACE_SECONDS):
+        """
+        Delete blobs that nothing references
+
+        Args:
+            dry_run (bool): Only report what would be deleted
+            grace_seconds (float): Keep unreferenced blobs younger than this
+
+        Returns:
+            dict: "removed" (list of blob paths) and "bytes" freed
+        """
+        referenced = self.referenced_blobs()
+        cutoff = time.time() - grace_seconds
+        removed = []
+        freed = 0
+        if not os.path.isdir(self.blob_dir):
+            return {"removed": removed, "bytes": freed}
+        for shard in os.scandir(self.blob_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                blob_path = _norm(os.path.join(self.blob_dir, shard.name, entry.name))
+                st = entry.stat()
+                if blob_path in referenced or entry.name.endswith(".part") or st.st_mtime > cutoff:
+                    continue
+                removed.append(blob_path)
+                freed += st.st_size
+                if not dry_run:
+                    os.remove(entry.path)
+            if not dry_run and not os.listdir(shard.path):
+                os.rmdir(shard.path)
+        return {"removed": removed, "bytes": freed}
+
+
+def _load_learned():
+    try:
+        return get_word_journal().load(LEARNED_FILE, default=[])
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+_media_store = None
+_media_store_lock = threading.Lock()
+
+
+def get_media_store():
+    """Return the process-wide MediaStore"""
+    global _media_store
+    with _media_store_lock:
+        if _media_store is None:
+            _media_store = MediaStore()
+        return _media_store
+
+
+def migrate_to_store(store=None, remove_originals=True):
+    """
+    Move media referenced by the word pool, level and learned files into the store
+
+    Every local, existing media file is stored once and the entries are
+    rewritten to point at its blob; identical files collapse to one blob.
+    Missing files and URLs are left untouched.
+
+    Args:
+        store (MediaStore): Store to migrate into (defaults to the shared one)
+        remove_originals (bool): Delete the original files once every entry is rewritten
+
+    Returns:
+        dict: "entries" rewritten, "files" stored and "blobs" they collapsed into
+    """
+    from utils.json_manager import update_word_fields
+    from utils.vocabulary_store import get_vocabulary_store
+    store = store or get_media_store()
+    blobs = {}
+    entries = 0
+
+    def to_blob(entry, category):
+        media_path = entry.get('media') or entry.get('video')
+        if not media_path or store.is_blob(media_path) or str(media_path).startswith(("http://", "https://")):
+            return None
+        key = os.path.abspath(media_path)
+        if key not in blobs:
+            if not os.path.isfile(media_path):
+                return None
+            blobs[key] = store.put_file(media_path)
+        store.assign(word_id(entry['word'], category), blobs[key], save=False)
+        return blobs[key]
+
+    for pool_file in WORD_POOL_FILES:
+        try:
+            with open(pool_file, 'r', encoding='utf-8') as f:
+                pools = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        changed = False
+        for category, words in pools.items():
+            for entry in words:
+                blob_path = to_blob(entry, category)
+                if blob_path:
+                    entry['media'] = blob_path
+                    entry.pop('video', None)
+                    entries += 1
+                    changed = True
+        if changed:
+            atomic_write_json(pool_file, pools)
+
+    vocabulary = get_vocabulary_store()
+    for level in LEVELS:
+        for entry in vocabulary.words(level):
+            blob_path = to_blob(entry, entry.get('category', ''))
+            if blob_path:
+                update_word_fields(f"level{level}.json", entry['word'], {'media': blob_path},
+                                   category=entry.get('category'))
+                entries += 1
+
+    learned = _load_learned()
+    changed = False
+    for entry in learned:
+        blob_path = to_blob(entry, entry.get('category', 'general')) if isinstance(entry, dict) else None
+        if blob_path:
+            entry['media'] = blob_path
+            entry.pop('video', None)
+            entries += 1
+            changed = True
+    if changed:
+        get_word_journal().checkpoint(LEARNED_FILE, learned)
+
+    store.save()
+    if remove_originals:
+        for original in blobs:
+            if os.path.exists(original):
+                os.remove(original)
+    return {"entries": entries, "files": len(blobs), "blobs": len(set(blobs.values()))}
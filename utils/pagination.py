@@ -0,0 +1,70 @@
+"""
+Paginated card lists for the Streamlit study views
+Only the current page of a deck is handed back for rendering, so the work
+done on each rerun is bounded by the page size rather than the deck size.
+"""
+
+import streamlit as st
+
+PAGE_SIZE_OPTIONS = [5, 10, 20, 50]
+DEFAULT_PAGE_SIZE = 10
+
+
+def page_bounds(total, page, page_size):
+    """
+    Clamp a page number and return the slice it covers
+
+    Args:
+        total (int): Number of items in the deck
+        page (int): Requested page, starting at 1
+        page_size (int): Items per page
+
+    Returns:
+        tuple: (page, page_count, start, end) with page clamped to 1..page_count
+    """
+    page_count = max(1, -(-total // page_size))
+    page = min(max(1, page), page_count)
+    start = (page - 1) * page_size
+    return page, page_count, start, min(start + page_size, total)
+
+
+def paginate(items, key, default_page_size=DEFAULT_PAGE_SIZE):
+    """
+    Render page size and prev/next controls and return the current page
+
+    The page size is chosen once in the sidebar; the page number is kept per
+    key (e.g. per level and category) in st.session_state.
+
+    Args:
+        items (list): Full, already filtered deck
+        key (str): Session-state key for this deck's page number
+        default_page_size (int): Initial page size
+
+    Returns:
+        tuple: (page_items, start) where start is the index of page_items[0] in items
+    """
+    page_size = st.sidebar.selectbox(
+        "Cards per page",
+        PAGE_SIZE_OPTIONS,
+        index=PAGE_SIZE_OPTIONS.index(default_page_size) if default_page_size in PAGE_SIZE_OPTIONS else 0,
+        key="study_page_size"
+    )
+    page_key = f"page_{key}"
+    page, page_count, _, _ = page_bounds(len(items), st.session_state.get(page_key, 1), page_size)
+
+    if page_count > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("◀ Prev", key=f"{page_key}_prev", disabled=page <= 1):
+                page -= 1
+        with col3:
+            if st.button("Next ▶", key=f"{page_key}_next", disabled=page >= page_count):
+                page += 1
+
+    page, page_count, start, end = page_bounds(len(items), page, page_size)
+    st.session_state[page_key] = page
+    if page_count > 1:
+        with col2:
+            st.caption(f"Page {page} of {page_count} · cards {start + 1}-{end} of {len(items)}")
+
+    return items[start:end], start
@@ -0,0 +1,261 @@
+"""
+Per-learner progress store shared by every session of the advanced app
+Favorites, streaks and study time live in SQLite next to the scheduler's
+review cards, whose last rating is the one record of a word's status;
+writes are buffered and flushed in batches, and dashboard numbers come
+from aggregate queries
+"""
+
+import json
+import time
+import atexit
+import threading
+from datetime import date
+
+from utils.sqlite_backend import get_connection_pool
+from utils.scheduler import DEFAULT_DB_FILE, DEFAULT_LEARNER, SCHEMA as SCHEDULER_SCHEMA
+
+# Buffered updates are written once this many are pending or FLUSH_INTERVAL seconds passed
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0
+
+# Status groups used by the dashboard
+NEEDS_REVIEW_STATUSES = ("again", "hard")
+MASTERED_STATUS = "easy"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS learners (
+    name TEXT PRIMARY KEY,
+    daily_streak INTEGER NOT NULL DEFAULT 0,
+    last_study_date TEXT,
+    study_seconds REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS learner_words (
+    learner TEXT NOT NULL,
+    word TEXT NOT NULL,
+    favorite INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    PRIMARY KEY (learner, word)
+);
+CREATE INDEX IF NOT EXISTS idx_learner_words_favorite ON learner_words(learner, favorite);
+"""
+
+UPSERT_FAVORITE_SQL = (
+    "INSERT INTO learner_words (learner, word, favorite, updated) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(learner, word) DO UPDATE SET favorite = excluded.favorite, updated = excluded.updated"
+)
+# Adds study time; the streak grows on the day after the last study day and restarts after a gap
+UPSERT_STUDY_SQL = (
+    "INSERT INTO learners (name, daily_streak, last_study_date, study_seconds) VALUES (?, 1, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET daily_streak = CASE "
+    "WHEN last_study_date = excluded.last_study_date THEN daily_streak "
+    "WHEN last_study_date = date(excluded.last_study_date, '-1 day') THEN daily_streak + 1 "
+    "ELSE 1 END, "
+    "last_study_date = MAX(COALESCE(last_study_date, ''), excluded.last_study_date), "
+    "study_seconds = study_seconds + excluded.study_seconds"
+)
+
+
+class ProgressStore:
+    """
+    Durable learner progress with write batching
+
+    set_favorite() and record_study() only queue the change; the queue is
+    written in one transaction when it is large, FLUSH_INTERVAL seconds
+    after the first queued change (by a background timer, since Streamlit
+    servers rarely exit cleanly), and always before a read so every query
+    sees the session's own writes. Ratings are
+    written by the scheduler (ReviewScheduler.review) and only read here.
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE):
+        self.db_file = db_file
+        self.pool = get_connection_pool(db_file)
+        self._lock = threading.RLock()
+        self._pending_favorite = {}
+        self._pending_study = {}
+        self._oldest_pending = None
+        self._flush_timer = None
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEDULER_SCHEMA)
+            conn.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Batched writes
+    # ------------------------------------------------------------------
+    def _queued(self):
+        if self._oldest_pending is None:
+            self._oldest_pending = time.time()
+            self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+        pending = len(self._pending_favorite) + len(self._pending_study)
+        if pending >= BATCH_SIZE or time.time() - self._oldest_pending >= FLUSH_INTERVAL:
+            self.flush()
+
+    def set_favorite(self, learner, word, favorite=True):
+        """Queue adding or removing a word from a learner's favorites"""
+        with self._lock:
+            self._pending_favorite[(learner, word.lower())] = (1 if favorite else 0, time.time())
+            self._queued()
+
+    def flush(self):
+        """Write all queued changes in a single transaction"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_favorite and not self._pending_study:
+                return
+            with self.pool.connection() as conn:
+                conn.executemany(UPSERT_FAVORITE_SQL, [
+                    (learner, word, favorite, updated)
+                    for (learner, word), (favorite, updated) in self._pending_favorite.items()
+                ])
+                # Oldest day first so streaks advance one day at a time
+                conn.executemany(UPSERT_STUDY_SQL, [
+                    (learner, day, seconds)
+                    for (day, learner), seconds in sorted(self._pending_study.items())
+                ])
+            self._pending_favorite.clear()
+            self._pending_study.clear()
+            self._oldest_pending = None
+
+    def _query(self, sql, params=()):
+        self.flush()
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def statuses(self, learner=DEFAULT_LEARNER):
+        """
+        Get the latest rating of every studied word
+
+        Returns:
+            dict: {word (lowercase): status}
+        """
+        return dict(self._query(
+            "SELECT word, last_rating FROM review_cards WHERE learner = ? AND last_rating IS NOT NULL", (learner,)
+        ))
+
+    def favorites(self, learner=DEFAULT_LEARNER):
+        """Return the learner's favorite words (lowercase)"""
+        return {row[0] for row in self._query(
+            "SELECT word FROM learner_words WHERE learner = ? AND favorite = 1", (learner,)
+        )}
+
+    def status_counts(self, learner=DEFAULT_LEARNER, words=None):
+        """
+        Count studied words per status with one aggregate query
+
+        Args:
+            learner (str): Learner name
+            words (list): Only count these words (optional)
+
+        Returns:
+            dict: {status: count}
+        """
+        sql = "SELECT last_rating, COUNT(*) FROM review_cards WHERE learner = ? AND last_rating IS NOT NULL"
+        params = [learner]
+        if words is not None:
+            sql += " AND word IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps([word.lower() for word in words]))
+        return dict(self._query(sql + " GROUP BY last_rating", params))
+
+    def dashboard(self, learner=DEFAULT_LEARNER, words=None):
+        """
+        Get the numbers shown on the analytics dashboard
+
+        Args:
+            learner (str): Learner name
+            words (list): Vocabulary the dashboard covers (optional)
+
+        Returns:
+            dict: "mastered", "needs_review", "good", "studied", "not_studied"
+                and "favorites" counts
+        """
+        counts = self.status_counts(learner, words)
+        studied = sum(counts.values())
+        favorites = self._query(
+            "SELECT COUNT(*) FROM learner_words WHERE learner = ? AND favorite = 1", (learner,)
+        )[0][0]
+        return {
+            "mastered": counts.get(MASTERED_STATUS, 0),
+            "needs_review": sum(counts.get(status, 0) for status in NEEDS_REVIEW_STATUSES),
+            "good": counts.get("good", 0),
+            "studied": studied,
+            "not_studied": max(0, len(words) - studied) if words is not None else 0,
+            "favorites": favorites
+        }
+
+    # ------------------------------------------------------------------
+    # Learner summary
+    # ------------------------------------------------------------------
+    def learner(self, learner=DEFAULT_LEARNER):
+        """
+        Get a learner's streak and study time
+
+        Returns:
+            dict: "daily_streak", "last_study_date" (date or None) and "study_seconds"
+        """
+        rows = self._query(
+            "SELECT daily_streak, last_study_date, study_seconds FROM learners WHERE name = ?", (learner,)
+        )
+        if not rows:
+            return {"daily_streak": 0, "last_study_date": None, "study_seconds": 0}
+        streak, last_study_date, study_seconds = rows[0]
+        return {
+            "daily_streak": streak,
+            "last_study_date": date.fromisoformat(last_study_date) if last_study_date else None,
+            "study_seconds": study_seconds
+        }
+
+    def record_study(self, learner=DEFAULT_LEARNER, seconds=0, today=None):
+        """
+        Queue study time and mark the day as studied for the daily streak
+
+        Args:
+            learner (str): Learner name
+            seconds (float): Study time to add
+            today (date): Study date (defaults to today)
+        """
+        key = ((today or date.today()).isoformat(), learner)
+        with self._lock:
+            self._pending_study[key] = self._pending_study.get(key, 0) + seconds
+            self._queued()
+
+    def export(self, learner=DEFAULT_LEARNER):
+        """Return all of a learner's progress as a JSON-serializable dict"""
+        summary = self.learner(learner)
+        return {
+            "learner": learner,
+            "daily_streak": summary["daily_streak"],
+            "last_study_date": summary["last_study_date"].isoformat() if summary["last_study_date"] else None,
+            "study_seconds": summary["study_seconds"],
+            "progress": self.statuses(learner),
+            "favorites": sorted(self.favorites(learner))
+        }
+
+    def reset(self, learner=DEFAULT_LEARNER):
+        """Delete a learner's favorites, streak and study time (ratings are reset by the scheduler)"""
+        with self._lock:
+            self.flush()
+            with self.pool.connection() as conn:
+                conn.execute("DELETE FROM learner_words WHERE learner = ?", (learner,))
+                conn.execute("DELETE FROM learners WHERE name = ?", (learner,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_progress_store():
+    """Return the process-wide ProgressStore (flushed at interpreter exit)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProgressStore()
+            atexit.register(_store.flush)
+        return _store
@@ -0,0 +1,162 @@
+"""
+Precomputed distractor index for multiple-choice quizzes
+Built once per (level, category) and reused until the level changes, so each
+question samples its wrong answers in O(k) instead of scanning every word
+"""
+
+import random
+import threading
+
+from utils.vocabulary_store import get_vocabulary_store, normalize_level
+from utils.json_manager import load_vocabulary_by_category
+
+# Number of wrong answers per question
+DEFAULT_DISTRACTORS = 3
+
+# Random draws per distractor before falling back to a filtered scan
+MAX_DRAWS_PER_DISTRACTOR = 8
+
+
+class QuizIndex:
+    """
+    Word list prepared for distractor sampling
+
+    Only the first word of each meaning is eligible as a distractor, so no
+    question shows two options with the same meaning. Candidates are also
+    grouped by category for "hard" questions, which draw their distractors
+    from the correct word's own category first.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.candidates = []
+        self.by_category = {}
+
+        seen_meanings = set()
+        for entry in self.words:
+            meaning = (entry.get('meaning') or '').strip().lower()
+            if not entry.get('word') or meaning in seen_meanings:
+                continue
+            seen_meanings.add(meaning)
+            self.candidates.append(entry)
+            category = (entry.get('category') or '').lower()
+            self.by_category.setdefault(category, []).append(entry)
+
+    def __len__(self):
+        return len(self.words)
+
+    def _sample(self, pool, count, excluded_words, excluded_meanings, rng):
+        """Draw up to count entries from pool that are not excluded"""
+        picked = []
+
+        def eligible(entry):
+            return (entry['word'].lower() not in excluded_words
+                    and (entry.get('meaning') or '').strip().lower() not in excluded_meanings)
+
+        draws = count * MAX_DRAWS_PER_DISTRACTOR
+        while len(picked) < count and draws > 0 and pool:
+            draws -= 1
+            entry = pool[rng.randrange(len(pool))]
+            if eligible(entry):
+                picked.append(entry)
+                excluded_words.add(entry['word'].lower())
+                excluded_meanings.add((entry.get('meaning') or '').strip().lower())
+
+        if len(picked) < count:
+            # Small or mostly excluded pools: finish with one filtered pass
+            remaining = [entry for entry in pool if eligible(entry)]
+            for entry in rng.sample(remaining, min(count - len(picked), len(remaining))):
+                picked.append(entry)
+                excluded_words.add(entry['word'].lower())
+                excluded_meanings.add((entry.get('meaning') or '').strip().lower())
+        return picked
+
+    def distractors(self, correct_word, count=DEFAULT_DISTRACTORS, hard=False, rng=random):
+        """
+        Pick wrong answers for a word
+
+        Args:
+            correct_word (dict): Word entry being asked about
+            count (int): Number of distractors
+            hard (bool): Prefer distractors from the same category
+            rng (random.Random): Random source (module random by default)
+
+        Returns:
+            list: Distractor word entries with distinct meanings
+        """
+        excluded_words = {correct_word.get('word', '').lower()}
+        excluded_meanings = {(correct_word.get('meaning') or '').strip().lower()}
+
+        picked = []
+        if hard:
+            same_category = self.by_category.get((correct_word.get('category') or '').lower(), [])
+            picked = self._sample(same_category, count, excluded_words, excluded_meanings, rng)
+        if len(picked) < count:
+            picked += self._sample(self.candidates, count - len(picked), excluded_words, excluded_meanings, rng)
+        return picked
+
+    def question(self, correct_word, count=DEFAULT_DISTRACTORS, hard=False, rng=random):
+        """
+        Build the shuffled options of one multiple-choice question
+
+        Returns:
+            list: Word entries (the correct word plus distractors) in random order
+        """
+        options = [correct_word] + self.distractors(correct_word, count, hard, rng)
+        rng.shuffle(options)
+        return options
+
+    def build_quiz(self, num_questions=50, words=None, count=DEFAULT_DISTRACTORS, hard=False, rng=random):
+        """
+        Generate a whole quiz in one call
+
+        Args:
+            num_questions (int): Number of questions when words is not given
+            words (list): Specific words to ask about (optional)
+            count (int): Distractors per question
+            hard (bool): Prefer same-category distractors
+            rng (random.Random): Random source
+
+        Returns:
+            list: [{"correct": entry, "options": [entries]}, ...]
+        """
+        if words is None:
+            words = rng.sample(self.words, min(num_questions, len(self.words)))
+        return [{"correct": word, "options": self.question(word, count, hard, rng)} for word in words]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_quiz_index(level, category=None, words=None):
+    """
+    Get the cached QuizIndex of a level and category
+
+    Vocabulary levels are cached until the store reports a new version;
+    anything else (e.g. "learned" or a word file) is indexed from words
+    without caching.
+
+    Args:
+        level (int or str): Difficulty level (1, 2, 3) or "learned"
+        category (str): Category name, or None for the whole level
+        words (list): Word list to index when level is not a vocabulary level
+
+    Returns:
+        QuizIndex: Index ready for distractor sampling
+    """
+    if normalize_level(level) is None:
+        return QuizIndex(words if words is not None else load_vocabulary_by_category(level, category))
+
+    level = normalize_level(level)
+    key = (level, category.lower() if category else None)
+    version = get_vocabulary_store().version(level)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+    index = QuizIndex(load_vocabulary_by_category(level, category))
+    with _indexes_lock:
+        _indexes[key] = (version, index)
+    return index
@@ -0,0 +1,277 @@
+"""
+Spaced-repetition scheduler with durable per-learner review state
+SM-2 style ease/interval scheduling stored in SQLite, plus an in-memory
+due-date heap per learner so the next due cards come out in O(log N)
+"""
+
+import os
+import time
+import heapq
+import threading
+from datetime import datetime
+
+from utils.sqlite_backend import get_connection_pool
+
+DEFAULT_DB_FILE = os.environ.get("VOCAB_LEARNING_DB", "learning.db")
+DEFAULT_LEARNER = "default"
+
+RATINGS = ("again", "hard", "good", "easy")
+
+# Days until the first review after a word is rated for the first time
+FIRST_INTERVALS = {
+    "again": 1,
+    "hard": 2,
+    "good": 4,
+    "easy": 7
+}
+
+# SM-2 parameters
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+EASE_ADJUSTMENTS = {
+    "again": -0.20,
+    "hard": -0.15,
+    "good": 0.0,
+    "easy": 0.15
+}
+HARD_MULTIPLIER = 1.2
+EASY_BONUS = 1.3
+
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_cards (
+    learner TEXT NOT NULL,
+    word TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    repetitions INTEGER NOT NULL DEFAULT 0,
+    lapses INTEGER NOT NULL DEFAULT 0,
+    last_rating TEXT,
+    last_review REAL,
+    due REAL NOT NULL,
+    PRIMARY KEY (learner, word)
+);
+CREATE INDEX IF NOT EXISTS idx_review_cards_due ON review_cards(learner, due);
+"""
+
+CARD_COLUMNS = ("word", "ease", "interval_days", "repetitions", "lapses", "last_rating", "last_review", "due")
+
+
+def schedule(card, rating, now):
+    """
+    Compute a card's next state after a review
+
+    Args:
+        card (dict or None): Current card state, or None for a new word
+        rating (str): One of "again", "hard", "good", "easy"
+        now (float): Review time as a Unix timestamp
+
+    Returns:
+        dict: New ease, interval_days, repetitions, lapses, last_rating, last_review and due
+    """
+    if rating not in RATINGS:
+        raise ValueError(f"Unknown rating: {rating}")
+
+    ease = card["ease"] if card else DEFAULT_EASE
+    repetitions = card["repetitions"] if card else 0
+    lapses = card["lapses"] if card else 0
+    interval = card["interval_days"] if card else 0
+
+    ease = max(MIN_EASE, ease + EASE_ADJUSTMENTS[rating])
+    if rating == "again":
+        repetitions = 0
+        lapses += 1 if card else 0
+        interval = FIRST_INTERVALS["again"]
+    elif repetitions == 0:
+        repetitions = 1
+        interval = FIRST_INTERVALS[rating]
+    else:
+        repetitions += 1
+        if rating == "hard":
+            interval = interval * HARD_MULTIPLIER
+        elif rating == "good":
+            interval = interval * ease
+        else:
+            interval = interval * ease * EASY_BONUS
+        interval = max(interval, FIRST_INTERVALS["again"])
+
+    return {
+        "ease": round(ease, 3),
+        "interval_days": round(interval, 3),
+        "repetitions": repetitions,
+        "lapses": lapses,
+        "last_rating": rating,
+        "last_review": now,
+        "due": now + interval * SECONDS_PER_DAY
+    }
+
+
+class ReviewScheduler:
+    """
+    Review state for every (learner, word) pair
+
+    Card state lives in the review_cards table. Each learner's due dates are
+    also kept in a heap with lazy invalidation: rescheduling pushes a new
+    entry and stale ones are dropped when they reach the top.
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE):
+        self.db_file = db_file
+        self.pool = get_connection_pool(db_file)
+        self._lock = threading.RLock()
+        self._heaps = {}
+        self._due = {}
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Due queue
+    # ------------------------------------------------------------------
+    def _load_queue(self, learner):
+        if learner not in self._heaps:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT word, due FROM review_cards WHERE learner = ? ORDER BY due", (learner,)
+                ).fetchall()
+            # Rows come back sorted by due, which already satisfies the heap invariant
+            self._heaps[learner] = [(due, word) for word, due in rows]
+            self._due[learner] = {word: due for word, due in rows}
+        return self._heaps[learner]
+
+    def _push(self, learner, word, due):
+        if learner not in self._heaps:
+            self._load_queue(learner)  # already holds the card just written
+            return
+        heap = self._heaps[learner]
+        self._due[learner][word] = due
+        heapq.heappush(heap, (due, word))
+
+    def next_due(self, learner=DEFAULT_LEARNER, n=10, now=None, words=None):
+        """
+        Get the words that are due for review, most overdue first
+
+        Args:
+            learner (str): Learner name
+            n (int): Maximum number of words
+            now (float): Unix timestamp to compare against (defaults to now)
+            words (set): Only return these (lowercase) words, e.g. the shown category
+
+        Returns:
+            list: (word, due datetime) tuples
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            heap = self._load_queue(learner)
+            current = self._due[learner]
+            taken, skipped = [], []
+            while heap and len(taken) < n:
+                due, word = heap[0]
+                if current.get(word) != due:
+                    heapq.heappop(heap)  # superseded by a later review
+                    continue
+                if due > now:
+                    break
+                entry = heapq.heappop(heap)
+                (taken if words is None or word in words else skipped).append(entry)
+            for entry in taken + skipped:
+                heapq.heappush(heap, entry)
+        return [(word, datetime.fromtimestamp(due)) for due, word in taken]
+
+    def reload(self, learner=DEFAULT_LEARNER):
+        """Drop the cached queue so it is re-read from the database"""
+        with self._lock:
+            self._heaps.pop(learner, None)
+            self._due.pop(learner, None)
+
+    # ------------------------------------------------------------------
+    # Cards
+    # ------------------------------------------------------------------
+    def card(self, learner, word):
+        """
+        Get the stored review state of a word
+
+        Returns:
+            dict or None: Card state, or None if the word was never reviewed
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(CARD_COLUMNS)} FROM review_cards WHERE learner = ? AND word = ?",
+                (learner, word.lower())
+            ).fetchone()
+        return dict(zip(CARD_COLUMNS, row)) if row else None
+
+    def review(self, learner, word, rating, now=None):
+        """
+        Record a review and schedule the word's next one
+
+        Args:
+            learner (str): Learner name
+            word (str): Word that was reviewed
+            rating (str): One of "again", "hard", "good", "easy"
+            now (float): Review time as a Unix timestamp (defaults to now)
+
+        Returns:
+            dict: The updated card, with "due" as a datetime
+        """
+        now = time.time() if now is None else now
+        word = word.lower()
+        with self._lock:
+            card = schedule(self.card(learner, word), rating, now)
+            with self.pool.connection() as conn:
+                conn.execute(
+                    "INSERT INTO review_cards (learner, word, ease, interval_days, repetitions, lapses, "
+                    "last_rating, last_review, due) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(learner, word) DO UPDATE SET ease = excluded.ease, "
+                    "interval_days = excluded.interval_days, repetitions = excluded.repetitions, "
+                    "lapses = excluded.lapses, last_rating = excluded.last_rating, "
+                    "last_review = excluded.last_review, due = excluded.due",
+                    (learner, word, card["ease"], card["interval_days"], card["repetitions"],
+                     card["lapses"], card["last_rating"], card["last_review"], card["due"])
+                )
+            self._push(learner, word, card["due"])
+
+        card["word"] = word
+        card["due"] = datetime.fromtimestamp(card["due"])
+        return card
+
+    def last_ratings(self, learner=DEFAULT_LEARNER):
+        """
+        Get the latest rating of every reviewed word
+
+        Returns:
+            dict: {word: "again" | "hard" | "good" | "easy"}
+        """
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT word, last_rating FROM review_cards WHERE learner = ?", (learner,)
+            ).fetchall()
+        return dict(rows)
+
+    def due_count(self, learner=DEFAULT_LEARNER, now=None):
+        """Count the learner's words that are due, using the (learner, due) index"""
+        now = time.time() if now is None else now
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM review_cards WHERE learner = ? AND due <= ?", (learner, now)
+            ).fetchone()[0]
+
+    def reset(self, learner=DEFAULT_LEARNER):
+        """Delete all review state of a learner"""
+        with self._lock:
+            with self.pool.connection() as conn:
+                conn.execute("DELETE FROM review_cards WHERE learner = ?", (learner,))
+            self.reload(learner)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide ReviewScheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ReviewScheduler()
+        return _scheduler
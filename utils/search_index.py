@@ -0,0 +1,284 @@
+"""
+Full-text search over every vocabulary level
+Trigram and sorted-word indexes over word, meaning, phrase and expressions
+give exact, prefix, substring and typo-tolerant lookups with ranked results.
+The index follows the word journal, so adds and deletes are applied
+incrementally instead of rebuilding it.
+"""
+
+import bisect
+import threading
+
+from utils.vocabulary_store import get_vocabulary_store, LEVEL_FILES
+from utils.word_journal import OPERATIONS
+from utils.json_manager import load_vocabulary_with_expressions
+
+# Result ranking; higher scores are listed first
+SCORE_EXACT = 100
+SCORE_PREFIX = 80
+SCORE_WORD_SUBSTRING = 60
+SCORE_MEANING = 40
+SCORE_PHRASE = 20
+SCORE_FUZZY = 10
+
+# Text fields searched besides the headword, with their score
+TEXT_FIELDS = (("meaning", SCORE_MEANING), ("phrase", SCORE_PHRASE), ("expressions", SCORE_PHRASE))
+
+# Minimum share of the query's trigrams a word needs to be a fuzzy candidate
+FUZZY_MIN_OVERLAP = 0.3
+
+
+def trigrams(text):
+    """Return the set of 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_trigrams(word):
+    """Trigrams of a headword padded at both ends, so short words and word edges match"""
+    return trigrams(f"  {word} ")
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, stopping early above limit
+
+    Returns:
+        int: The distance, or limit + 1 if it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """
+    In-memory search index over the vocabulary store
+
+    Documents are keyed by (level, lowercase word). Returned entries carry
+    'level' and 'category' and must be treated as read-only.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_vocabulary_store()
+        self._lock = threading.RLock()
+        self._docs = {}
+        self._doc_texts = {}
+        self._doc_grams = {}
+        self._sorted_words = []
+        self._text_grams = {}
+        self._word_grams = {}
+        self._versions = {}
+        self.store.journal.subscribe(self._on_journal_event)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _add_doc(self, level, entry):
+        word = (entry.get('word') or '').strip()
+        if not word:
+            return
+        doc_id = (level, word.lower())
+        self._remove_doc(doc_id)
+
+        doc = dict(entry)
+        doc['level'] = level
+        texts = {"word": word.lower()}
+        for field, _ in TEXT_FIELDS:
+            value = entry.get(field) or ''
+            if isinstance(value, list):
+                value = "\n".join(str(v) for v in value)
+            texts[field] = str(value).lower()
+
+        text_grams = set()
+        for text in texts.values():
+            text_grams |= trigrams(text)
+        word_grams = word_trigrams(texts["word"])
+
+        self._docs[doc_id] = doc
+        self._doc_texts[doc_id] = texts
+        self._doc_grams[doc_id] = (text_grams, word_grams)
+        for gram in text_grams:
+            self._text_grams.setdefault(gram, set()).add(doc_id)
+        for gram in word_grams:
+            self._word_grams.setdefault(gram, set()).add(doc_id)
+        bisect.insort(self._sorted_words, (texts["word"], level))
+
+    def _remove_doc(self, doc_id):
+        if doc_id not in self._docs:
+            return
+        text_grams, word_grams = self._doc_grams.pop(doc_id)
+        for gram in text_grams:
+            postings = self._text_grams.get(gram)
+            if postings:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._text_grams[gram]
+        for gram in word_grams:
+            postings = self._word_grams.get(gram)
+            if postings:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._word_grams[gram]
+        position = bisect.bisect_left(self._sorted_words, (doc_id[1], doc_id[0]))
+        if position < len(self._sorted_words) and self._sorted_words[position] == (doc_id[1], doc_id[0]):
+            del self._sorted_words[position]
+        del self._docs[doc_id]
+        del self._doc_texts[doc_id]
+
+    def _rebuild_level(self, level):
+        for doc_id in [doc_id for doc_id in self._docs if doc_id[0] == level]:
+            self._remove_doc(doc_id)
+        for entry in load_vocabulary_with_expressions(level):
+            self._add_doc(level, entry)
+        self._versions[level] = self.store.version(level)
+
+    def _refresh(self):
+        """Rebuild levels that are not indexed yet or changed outside this process"""
+        for level in LEVEL_FILES:
+            if level not in self._versions or self._versions[level] != self.store.version(level):
+                self._rebuild_level(level)
+
+    def _on_journal_event(self, record):
+        """Apply journaled mutations of level files without a full rebuild"""
+        op = record.get("op")
+        with self._lock:
+            if op in OPERATIONS:
+                level = self.store.level_for_file(record.get("file", ""))
+                if level is None or level not in self._versions:
+                    return
+                word = (record.get("word") or record.get("entry", {}).get("word") or "").strip()
+                self._remove_doc((level, word.lower()))
+                if op in ("add", "update"):
+                    # The store applied the record first, so it has the merged entry
+                    entry = self.store.find_word(word, level)
+                    if op == "update" and "word" in record.get("fields", {}):
+                        entry = self.store.find_word(record["fields"]["word"], level) or entry
+                    if entry:
+                        self._add_doc(level, entry)
+                self._versions[level] = self.store.version(level)
+            elif op == "checkpoint":
+                level = self.store.level_for_file(record.get("file", ""))
+                if level is not None and level in self._versions:
+                    self._rebuild_level(level)
+            elif op == "compact":
+                # Contents are unchanged; only the store's cache signature moved
+                for level in list(self._versions):
+                    self._versions[level] = self.store.version(level)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _prefix_ids(self, term):
+        position = bisect.bisect_left(self._sorted_words, (term,))
+        ids = []
+        while position < len(self._sorted_words) and self._sorted_words[position][0].startswith(term):
+            word, level = self._sorted_words[position]
+            ids.append((level, word))
+            position += 1
+        return ids
+
+    def _substring_candidates(self, term):
+        if len(term) < 3:
+            return self._docs.keys()
+        postings = [self._text_grams.get(gram, set()) for gram in trigrams(term)]
+        postings.sort(key=len)
+        return set.intersection(*postings) if postings else set()
+
+    def _fuzzy_ids(self, term, max_distance):
+        grams = word_trigrams(term)
+        overlap = {}
+        for gram in grams:
+            for doc_id in self._word_grams.get(gram, ()):
+                overlap[doc_id] = overlap.get(doc_id, 0) + 1
+        threshold = max(1, int(len(grams) * FUZZY_MIN_OVERLAP))
+        matches = []
+        for doc_id, shared in overlap.items():
+            if shared < threshold:
+                continue
+            distance = edit_distance(term, doc_id[1], max_distance)
+            if distance <= max_distance:
+                matches.append((doc_id, distance))
+        return matches
+
+    def search(self, query, limit=20, levels=None, fuzzy=True):
+        """
+        Search words, meanings, phrases and expressions
+
+        Args:
+            query (str): Search text (case-insensitive)
+            limit (int): Maximum number of results
+            levels (list): Restrict results to these levels (optional)
+            fuzzy (bool): Include typo-tolerant headword matches
+
+        Returns:
+            list: (entry, score, match_type) tuples, best first; match_type is
+                "exact", "prefix", "word", "meaning", "phrase" or "fuzzy"
+        """
+        term = (query or '').strip().lower()
+        if not term:
+            return []
+
+        with self._lock:
+            self._refresh()
+            scores = {}
+
+            def consider(doc_id, score, match_type):
+                if levels is not None and doc_id[0] not in levels:
+                    return
+                if doc_id not in scores or scores[doc_id][0] < score:
+                    scores[doc_id] = (score, match_type)
+
+            for doc_id in self._prefix_ids(term):
+                consider(doc_id, SCORE_EXACT if doc_id[1] == term else SCORE_PREFIX,
+                         "exact" if doc_id[1] == term else "prefix")
+
+            for doc_id in self._substring_candidates(term):
+                texts = self._doc_texts[doc_id]
+                if term in texts["word"]:
+                    consider(doc_id, SCORE_WORD_SUBSTRING, "word")
+                    continue
+                for field, score in TEXT_FIELDS:
+                    if term in texts[field]:
+                        consider(doc_id, score, "meaning" if field == "meaning" else "phrase")
+                        break
+
+            if fuzzy and len(term) >= 3:
+                max_distance = 1 if len(term) <= 5 else 2
+                for doc_id, distance in self._fuzzy_ids(term, max_distance):
+                    consider(doc_id, SCORE_FUZZY - distance, "fuzzy")
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1][0], len(item[0][1]), item[0][1], item[0][0]))
+            return [(self._docs[doc_id], score, match_type) for doc_id, (score, match_type) in ranked[:limit]]
+
+    def suggest(self, prefix, limit=10):
+        """Return headwords starting with prefix, in alphabetical order"""
+        with self._lock:
+            self._refresh()
+            words = []
+            for _, word in self._prefix_ids(prefix.strip().lower()):
+                if word not in words:
+                    words.append(word)
+                if len(words) >= limit:
+                    break
+            return words
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide SearchIndex"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
@@ -0,0 +1,416 @@
+"""
+Normalized SQLite storage backend for vocabulary levels
+One database file with levels, categories, words and expressions tables,
+served through a small pool of WAL-mode connections
+"""
+
+import os
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from utils.word_journal import get_word_journal
+
+DEFAULT_DB_FILE = "vocabulary.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS levels (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    level_id INTEGER NOT NULL REFERENCES levels(id),
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    word TEXT NOT NULL,
+    meaning TEXT NOT NULL DEFAULT '',
+    phrase TEXT NOT NULL DEFAULT '',
+    media TEXT NOT NULL DEFAULT '',
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS expressions (
+    word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (word_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_words_level_category ON words(level_id, category_id);
+CREATE INDEX IF NOT EXISTS idx_words_lower_word ON words(lower(word));
+"""
+
+# Columns stored directly on the words table; anything else goes to "extra"
+WORD_COLUMNS = ("word", "meaning", "phrase", "media")
+
+LOAD_LEVEL_SQL = """
+SELECT w.id, c.name, w.word, w.meaning, w.phrase, w.media, w.extra, e.text
+FROM words w
+JOIN categories c ON c.id = w.category_id
+LEFT JOIN expressions e ON e.word_id = w.id
+WHERE w.level_id = ?
+ORDER BY w.category_id, w.id, e.position
+"""
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared across Streamlit sessions
+
+    Connections are opened lazily in WAL mode so readers never block the
+    single writer.
+    """
+
+    def __init__(self, db_file, max_connections=4):
+        self.db_file = db_file
+        self.max_connections = max_connections
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection; commits on success and rolls back on error
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.max_connections
+                if can_open:
+                    self._created += 1
+            conn = self._open() if can_open else self._idle.get()
+
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_file):
+    """Return the process-wide ConnectionPool for a database file"""
+    key = os.path.abspath(db_file)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_file)
+        return _pools[key]
+
+
+class SQLiteVocabularyBackend:
+    """
+    Vocabulary storage engine exposing the same loaders as the JSON files
+
+    load_word_pools() and load_vocabulary_with_expressions() each fetch a
+    whole level with a single indexed query.
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE):
+        self.db_file = db_file
+        self.pool = get_connection_pool(db_file)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before levels.revision existed
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(levels)")]
+            if "revision" not in columns:
+                conn.execute("ALTER TABLE levels ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _ensure_level(self, conn, level):
+        conn.execute("INSERT OR IGNORE INTO levels (id, name) VALUES (?, ?)", (level, f"Level {level}"))
+
+    def _touch(self, conn, level):
+        conn.execute("UPDATE levels SET revision = revision + 1 WHERE id = ?", (level,))
+
+    def _category_id(self, conn, category):
+        conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category,))
+        return conn.execute("SELECT id FROM categories WHERE name = ?", (category,)).fetchone()[0]
+
+    def _insert_word(self, conn, level, category_id, entry):
+        extra = {k: v for k, v in entry.items() if k not in WORD_COLUMNS + ("expressions", "category")}
+        cursor = conn.execute(
+            "INSERT INTO words (level_id, category_id, word, meaning, phrase, media, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                level,
+                category_id,
+                entry.get("word", ""),
+                entry.get("meaning", "") or "",
+                entry.get("phrase", "") or "",
+                entry.get("media", entry.get("video", "")) or "",
+                json.dumps(extra, ensure_ascii=False) if extra else None,
+            ),
+        )
+        self._write_expressions(conn, cursor.lastrowid, entry.get("expressions", []))
+
+    def _write_expressions(self, conn, word_id, expressions):
+        conn.execute("DELETE FROM expressions WHERE word_id = ?", (word_id,))
+        conn.executemany(
+            "INSERT INTO expressions (word_id, position, text) VALUES (?, ?, ?)",
+            [(word_id, i, text) for i, text in enumerate(expressions or [])],
+        )
+
+    # ------------------------------------------------------------------
+    # Loaders (same shapes as the JSON loaders)
+    # ------------------------------------------------------------------
+    def iter_level(self, level):
+        """
+        Stream a level's words, building each entry only when it is reached
+
+        The rows are fetched before the first yield so the pooled connection
+        is returned even if the caller stops iterating early.
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+
+        Yields:
+            tuple: (category, entry) in category order
+        """
+        with self.pool.connection() as conn:
+            rows = conn.execute(LOAD_LEVEL_SQL, (int(level),)).fetchall()
+        entry = None
+        current_id = None
+        current_category = None
+        for word_id, category, word, meaning, phrase, media, extra, expression in rows:
+            if word_id != current_id:
+                if entry is not None:
+                    yield current_category, entry
+                current_id = word_id
+                current_category = category
+                entry = {"word": word, "meaning": meaning, "phrase": phrase, "expressions": []}
+                if media:
+                    entry["media"] = media
+                if extra:
+                    entry.update(json.loads(extra))
+            if expression is not None:
+                entry["expressions"].append(expression)
+        if entry is not None:
+            yield current_category, entry
+
+    def load_word_pools(self, level):
+        """
+        Load a level as a {category: [entries]} mapping in one query
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+
+        Returns:
+            dict: Dictionary containing word pools for each category
+        """
+        word_pools = {}
+        for category, entry in self.iter_level(level):
+            word_pools.setdefault(category, []).append(entry)
+        return word_pools
+
+    def load_vocabulary_with_expressions(self, level):
+        """
+        Load a level as a flat list of entries with their category attached
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+
+        Returns:
+            list: List of word dictionaries
+        """
+        all_words = []
+        for category, words in self.load_word_pools(level).items():
+            for word_entry in words:
+                word_entry["category"] = category
+                all_words.append(word_entry)
+        return all_words
+
+    def revision(self, level):
+        """
+        Get a counter that increases with every change to a level
+
+        Returns:
+            int: Revision number (0 if the level has no rows yet)
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT revision FROM levels WHERE id = ?", (int(level),)).fetchone()
+        return row[0] if row else 0
+
+    def find_word(self, word, level=None):
+        """Return (level, category) of a word, or None if it does not exist"""
+        sql = ("SELECT w.level_id, c.name FROM words w JOIN categories c ON c.id = w.category_id "
+               "WHERE lower(w.word) = lower(?)")
+        params = [word]
+        if level is not None:
+            sql += " AND w.level_id = ?"
+            params.append(int(level))
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    # ------------------------------------------------------------------
+    # Mutations
+    # ------------------------------------------------------------------
+    def add_word(self, level, category, word_entry):
+        """Add one word entry to a level/category"""
+        with self.pool.connection() as conn:
+            self._ensure_level(conn, int(level))
+            self._insert_word(conn, int(level), self._category_id(conn, category), word_entry)
+            self._touch(conn, int(level))
+
+    def update_word(self, level, word, fields):
+        """
+        Update fields of an existing word
+
+        A "category" field moves the word to the end of that category.
+
+        Returns:
+            bool: True if the word was found
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT id, extra FROM words WHERE level_id = ? AND lower(word) = lower(?)",
+                (int(level), word),
+            ).fetchone()
+            if not row:
+                return False
+            word_id, extra = row
+            extra = json.loads(extra) if extra else {}
+
+            if fields.get("category"):
+                # Re-inserted so the word comes last in its new category, like the JSON files
+                cursor = conn.execute(
+                    "INSERT INTO words (level_id, category_id, word, meaning, phrase, media, extra) "
+                    "SELECT level_id, ?, word, meaning, phrase, media, extra FROM words WHERE id = ?",
+                    (self._category_id(conn, fields["category"]), word_id),
+                )
+                conn.execute("UPDATE expressions SET word_id = ? WHERE word_id = ?", (cursor.lastrowid, word_id))
+                conn.execute("DELETE FROM words WHERE id = ?", (word_id,))
+                word_id = cursor.lastrowid
+
+            columns = {}
+            for key, value in fields.items():
+                if key == "expressions":
+                    self._write_expressions(conn, word_id, value)
+                elif key in WORD_COLUMNS or key == "video":
+                    columns["media" if key == "video" else key] = value or ""
+                elif key != "category":
+                    extra[key] = value
+
+            columns["extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            conn.execute(f"UPDATE words SET {assignments} WHERE id = ?", (*columns.values(), word_id))
+            self._touch(conn, int(level))
+            return True
+
+    def delete_word(self, level, word):
+        """
+        Delete a word from a level (case-insensitive)
+
+        Returns:
+            bool: True if a word was deleted
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM words WHERE level_id = ? AND lower(word) = lower(?)",
+                (int(level), word),
+            )
+            if cursor.rowcount > 0:
+                self._touch(conn, int(level))
+            return cursor.rowcount > 0
+
+    def replace_level(self, level, word_pools):
+        """
+        Replace all words of a level in a single transaction
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+            word_pools (dict): {category: [entries]} mapping
+        """
+        self.replace_level_entries(level, (
+            (category, entry) for category, words in word_pools.items() for entry in words
+        ))
+
+    def replace_level_entries(self, level, entries):
+        """
+        Replace all words of a level from a stream of entries in one transaction
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+            entries (iterable): (category, entry) pairs, consumed once
+
+        Returns:
+            int: Number of words written
+        """
+        level = int(level)
+        count = 0
+        category_ids = {}
+        with self.pool.connection() as conn:
+            self._ensure_level(conn, level)
+            conn.execute("DELETE FROM words WHERE level_id = ?", (level,))
+            for category, entry in entries:
+                if category not in category_ids:
+                    category_ids[category] = self._category_id(conn, category)
+                self._insert_word(conn, level, category_ids[category], entry)
+                count += 1
+            self._touch(conn, level)
+        return count
+
+    def import_json_levels(self, level_files):
+        """
+        Import level JSON files into the database
+
+        Args:
+            level_files (dict): {level: json_file} mapping
+
+        Returns:
+            dict: Number of words imported per level
+        """
+        counts = {}
+        for level, json_file in level_files.items():
+            if not os.path.exists(json_file):
+                print(f"Warning: {json_file} not found, skipping level {level}")
+                continue
+            # Include journaled adds/edits/deletes that are not in the file yet
+            word_pools = get_word_journal().load(json_file)
+            self.replace_level(level, word_pools)
+            counts[level] = sum(len(words) for words in word_pools.values())
+        return counts
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_sqlite_backend(db_file=None):
+    """Return the process-wide SQLiteVocabularyBackend"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SQLiteVocabularyBackend(db_file or os.environ.get("VOCAB_DB_FILE", DEFAULT_DB_FILE))
+        return _backend
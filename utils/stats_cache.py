@@ -0,0 +1,279 @@
+"""
+Incrementally maintained vocabulary statistics for the dashboards
+Per-level counts by category and difficulty plus media and expression
+coverage, kept up to date from word journal events so a dashboard reads
+them without looping over every word
+"""
+
+import os
+import threading
+from collections import Counter
+
+from utils.vocabulary_store import get_vocabulary_store, normalize_level
+from utils.word_journal import OPERATIONS, normalize_path
+from utils.json_manager import load_vocabulary_with_expressions, load_learned_words, load_vocabulary_from_file
+
+LEARNED_FILE = "learned.json"
+
+# Difficulty of words that have no "difficulty" field, by level
+LEVEL_DIFFICULTY = {
+    1: "⭐",
+    2: "⭐⭐",
+    3: "⭐⭐⭐",
+    "learned": "⭐⭐"
+}
+
+
+def word_contribution(entry, level):
+    """
+    Describe what one word adds to its level's statistics
+
+    Returns:
+        tuple: (category, difficulty, has_media, has_expressions)
+    """
+    return (
+        (entry.get('category') or 'general').lower(),
+        entry.get('difficulty') or LEVEL_DIFFICULTY.get(level, "⭐⭐"),
+        bool(entry.get('media') or entry.get('video')),
+        bool(entry.get('expressions'))
+    )
+
+
+class LevelStats:
+    """Aggregate statistics of one level, updated one word at a time"""
+
+    def __init__(self, level, words=(), version=None):
+        self.level = level
+        self.version = version
+        self.by_category = Counter()
+        self.by_difficulty = Counter()
+        self.with_media = 0
+        self.with_expressions = 0
+        self._words = {}
+        for entry in words:
+            self.add(entry)
+
+    @property
+    def total(self):
+        return len(self._words)
+
+    def words(self):
+        """Return the counted (distinct, lowercase) words"""
+        return list(self._words)
+
+    def add(self, entry):
+        """Count a word (replacing an earlier entry with the same word)"""
+        word = (entry.get('word') or '').strip().lower()
+        if not word:
+            return
+        self.remove(word)
+        contribution = word_contribution(entry, self.level)
+        category, difficulty, has_media, has_expressions = contribution
+        self._words[word] = contribution
+        self.by_category[category] += 1
+        self.by_difficulty[difficulty] += 1
+        self.with_media += has_media
+        self.with_expressions += has_expressions
+
+    def remove(self, word):
+        """Stop counting a word; returns False if it was not counted"""
+        contribution = self._words.pop(word.strip().lower(), None)
+        if contribution is None:
+            return False
+        category, difficulty, has_media, has_expressions = contribution
+        self.by_category[category] -= 1
+        if not self.by_category[category]:
+            del self.by_category[category]
+        self.by_difficulty[difficulty] -= 1
+        if not self.by_difficulty[difficulty]:
+            del self.by_difficulty[difficulty]
+        self.with_media -= has_media
+        self.with_expressions -= has_expressions
+        return True
+
+    def difficulty_counts(self, overrides=None, default=None):
+        """
+        Count words per difficulty, optionally with an app's own difficulty map
+
+        Only the override entries are looked at, so the cost does not grow
+        with the size of the level.
+
+        Args:
+            overrides (dict): {word (any case): difficulty} from the app (optional)
+            default (str): Difficulty of words not in overrides, instead of the
+                level's stored difficulties (optional)
+
+        Returns:
+            dict: {difficulty: count}
+        """
+        counts = Counter({default: self.total}) if default else Counter(self.by_difficulty)
+        for word, difficulty in (overrides or {}).items():
+            contribution = self._words.get(word.lower())
+            if contribution is None:
+                continue
+            counts[default or contribution[1]] -= 1
+            counts[difficulty] += 1
+        return {difficulty: count for difficulty, count in counts.items() if count > 0}
+
+    def coverage(self, count):
+        """Share of the level's words counted by count, as a percentage"""
+        return (count / self.total) * 100 if self.total else 0.0
+
+    def snapshot(self):
+        """Return the statistics as a plain dictionary"""
+        return {
+            "level": self.level,
+            "total": self.total,
+            "by_category": dict(self.by_category),
+            "by_difficulty": dict(self.by_difficulty),
+            "with_media": self.with_media,
+            "with_expressions": self.with_expressions,
+            "media_coverage": self.coverage(self.with_media),
+            "expression_coverage": self.coverage(self.with_expressions)
+        }
+
+
+class StatsCache:
+    """
+    LevelStats for every level and for learned words
+
+    Journal events from this process update the aggregates in place; a
+    level changed by another process is rebuilt when its store version
+    (or, for learned words, the file and journal stats) no longer match.
+    """
+
+    def __init__(self, store=None, learned_file=LEARNED_FILE):
+        self.store = store or get_vocabulary_store()
+        self.learned_file = learned_file
+        self._stats = {}
+        self._file_stats = {}
+        self._lock = threading.RLock()
+        self.store.journal.subscribe(self._on_journal_event)
+
+    def _learned_version(self):
+        try:
+            st = os.stat(self.learned_file)
+            file_signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            file_signature = None
+        return (file_signature, self.store.journal.stat())
+
+    def _version(self, level):
+        return self._learned_version() if level == "learned" else self.store.version(level)
+
+    def get(self, level):
+        """
+        Get the statistics of a level
+
+        Args:
+            level (int or str): Difficulty level (1, 2, 3) or "learned"
+
+        Returns:
+            LevelStats: Current statistics (empty for unknown levels)
+        """
+        level = "learned" if level == "learned" else normalize_level(level)
+        if level is None:
+            return LevelStats(None)
+
+        with self._lock:
+            version = self._version(level)
+            stats = self._stats.get(level)
+            if stats is None or stats.version != version:
+                words = load_learned_words(self.learned_file) if level == "learned" else load_vocabulary_with_expressions(level)
+                stats = LevelStats(level, words, version)
+                self._stats[level] = stats
+            return stats
+
+    def for_file(self, file_path, loader=load_vocabulary_from_file):
+        """
+        Get the statistics of a plain vocabulary file (e.g. vocabulary.txt)
+
+        The file is not journaled, so its statistics are rebuilt whenever its
+        mtime or size changes and served from memory otherwise.
+
+        Args:
+            file_path (str): Plain-text vocabulary file
+            loader (callable): Function parsing the file into word dictionaries;
+                pass the one the app itself uses so the counts match its word list
+
+        Returns:
+            LevelStats: Statistics of the file's words (empty if it does not exist)
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return LevelStats(None)
+        version = (st.st_mtime_ns, st.st_size)
+        key = normalize_path(file_path)
+        with self._lock:
+            stats = self._file_stats.get(key)
+            if stats is None or stats.version != version:
+                stats = LevelStats(None, loader(file_path), version)
+                self._file_stats[key] = stats
+            return stats
+
+    def _on_journal_event(self, record):
+        """Apply add/update/delete/learn records to the cached aggregates"""
+        op = record.get("op")
+        target = record.get("file")
+        with self._lock:
+            if op == "compact":
+                for level, stats in self._stats.items():
+                    stats.version = self._version(level)
+                return
+
+            if target == normalize_path(self.learned_file):
+                level = "learned"
+            else:
+                level = self.store.level_for_file(target or "")
+            stats = self._stats.get(level)
+            if stats is None:
+                return
+
+            if op == "checkpoint" or op not in OPERATIONS:
+                del self._stats[level]
+                return
+
+            if op == "learn":
+                # Only the fields load_learned_words() keeps, so a rebuild gives the same counts
+                learned = record["entry"]
+                entry = {'word': learned.get('word', ''), 'category': learned.get('category', 'general')}
+                if entry['word'].strip().lower() not in stats._words:
+                    stats.add(entry)
+            elif op == "delete":
+                stats.remove(record["word"])
+            elif op == "add":
+                entry = dict(record["entry"])
+                entry['category'] = record.get("category", "general")
+                stats.add(entry)
+            elif op == "update":
+                # The store applied the record before this listener, so it has the merged entry
+                new_word = record.get("fields", {}).get("word", record["word"])
+                entry = self.store.find_word(new_word, level)
+                if entry:
+                    stats.remove(record["word"])
+                    stats.add(entry)
+            stats.version = self._version(level)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_stats_cache():
+    """Return the process-wide StatsCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = StatsCache()
+        return _cache
+
+
+def get_level_stats(level):
+    """Shortcut for get_stats_cache().get(level)"""
+    return get_stats_cache().get(level)
+
+
+def get_file_stats(file_path, loader=load_vocabulary_from_file):
+    """Shortcut for get_stats_cache().for_file(file_path, loader)"""
+    return get_stats_cache().for_file(file_path, loader)
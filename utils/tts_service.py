@@ -0,0 +1,115 @@
+"""
+Shared text-to-speech service for the Streamlit apps
+A module-level, bounded thread pool renders audio for every session.
+Concurrent requests for the same clip share one job, and get_audio_file()
+gives Streamlit callbacks a plain synchronous call with no event loop per click.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("TTS_MAX_WORKERS", 4))
+
+# Seconds a Streamlit callback waits for a clip before reporting failure
+DEFAULT_TIMEOUT = 60
+
+
+class TTSService:
+    """
+    Bounded executor with request coalescing around a render function
+
+    The render function takes (text, is_phrase, speed) and returns the audio
+    file path or None. While a clip is being rendered, further requests for
+    the same (text, is_phrase, speed) get the same Future.
+    """
+
+    def __init__(self, render, max_workers=DEFAULT_MAX_WORKERS):
+        self.render = render
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, text, is_phrase=False, speed="normal"):
+        """
+        Queue a clip, or join the job already rendering it
+
+        Args:
+            text (str): Text to convert to speech
+            is_phrase (bool): Whether the text is a phrase (affects speech rate)
+            speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+        Returns:
+            Future: Resolves to the audio file path, or None if rendering failed
+        """
+        key = (text.strip(), bool(is_phrase), speed)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self.render, text, is_phrase, speed)
+            self._inflight[key] = future
+        # Registered outside the lock: a future that is already done runs the
+        # callback right here, and _finished() takes the lock itself
+        future.add_done_callback(lambda done, key=key: self._finished(key, done))
+        return future
+
+    def _finished(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def get_audio_file(self, text, is_phrase=False, speed="normal", timeout=DEFAULT_TIMEOUT):
+        """
+        Synchronous facade for Streamlit callbacks
+
+        Returns:
+            str or None: Path to the audio file, or None if it failed or timed out
+        """
+        try:
+            return self.submit(text, is_phrase, speed).result(timeout=timeout)
+        except FutureTimeoutError:
+            print(f"Audio generation timed out after {timeout}s: '{text}'")
+        except Exception as e:
+            print(f"Audio generation failed: {e}")
+        return None
+
+    def pending(self):
+        """Return the number of clips currently queued or rendering"""
+        with self._lock:
+            return len(self._inflight)
+
+    def shutdown(self, wait=True):
+        """Stop accepting requests and release the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_tts_service():
+    """Return the process-wide TTSService"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            # Imported here because utils.main itself submits through this service
+            from utils.main import render_audio_file
+            _service = TTSService(render_audio_file)
+        return _service
+
+
+def get_audio_file(text, is_phrase=False, speed="normal", timeout=DEFAULT_TIMEOUT):
+    """
+    Render (or fetch from cache) one clip through the shared service
+
+    Args:
+        text (str): Text to convert to speech
+        is_phrase (bool): Whether the text is a phrase (affects speech rate)
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+        timeout (int): Seconds to wait before giving up
+
+    Returns:
+        str or None: Path to the audio file, or None if it failed
+    """
+    return get_tts_service().get_audio_file(text, is_phrase, speed, timeout)
@@ -0,0 +1,176 @@
+"""
+Long-lived pyttsx3 worker shared by all vocabulary builder apps
+One background thread owns the engine: the voice is chosen once at startup
+and requests are rendered one at a time from a queue, so runAndWait()
+never runs concurrently and no request pays for pyttsx3.init()
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+
+# Seconds a caller waits for one clip before falling back to gTTS
+DEFAULT_TIMEOUT = 30
+
+# Base speech rates (words per minute)
+BASE_WORD_RATE = 160
+BASE_PHRASE_RATE = 140
+
+SPEED_MULTIPLIERS = {
+    "normal": 1.0,
+    "0.9": 0.9,
+    "0.8": 0.8
+}
+
+# Identifiers of American English voices on common platforms
+AMERICAN_VOICE_IDENTIFIERS = ['david', 'mark', 'zira', 'hazel', 'us', 'american', 'en-us']
+
+
+def speech_rate(is_phrase=False, speed="normal"):
+    """
+    Get the pyttsx3 speech rate for a word or phrase at a speed setting
+
+    Args:
+        is_phrase (bool): Whether the text is a phrase (spoken slower)
+        speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+    Returns:
+        int: Words per minute
+    """
+    base_rate = BASE_PHRASE_RATE if is_phrase else BASE_WORD_RATE
+    return int(base_rate * SPEED_MULTIPLIERS.get(speed, 1.0))
+
+
+def select_voice(voices):
+    """
+    Pick an American English voice, falling back to any English voice
+
+    Args:
+        voices (list): Voices reported by engine.getProperty('voices')
+
+    Returns:
+        str or None: Voice id, or None to keep the engine default
+    """
+    english_voice = None
+    for voice in voices:
+        if not voice.id:
+            continue
+        voice_id = voice.id.lower()
+        if any(identifier in voice_id for identifier in AMERICAN_VOICE_IDENTIFIERS):
+            return voice.id
+        if 'en' in voice_id:
+            english_voice = voice.id
+    return english_voice
+
+
+class TTSWorker:
+    """
+    Background thread that owns a single warm pyttsx3 engine
+
+    submit() queues a request and returns a concurrent.futures.Future that
+    resolves to the output path; synthesize() is the awaitable variant.
+    If the engine cannot be initialized every request fails fast so callers
+    can fall back to gTTS.
+    """
+
+    def __init__(self):
+        self._requests = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._init_error = None
+
+    def start(self):
+        """Start the worker thread if it is not running yet"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            import pyttsx3
+
+            engine = pyttsx3.init()
+            voice_id = select_voice(engine.getProperty('voices'))
+            if voice_id:
+                engine.setProperty('voice', voice_id)
+            engine.setProperty('volume', 0.9)
+        except Exception as e:
+            self._init_error = e
+            engine = None
+
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            text, output_path, rate, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            if engine is None:
+                future.set_exception(RuntimeError(f"pyttsx3 unavailable: {self._init_error}"))
+                continue
+            try:
+                engine.setProperty('rate', rate)
+                engine.save_to_file(text, output_path)
+                engine.runAndWait()
+                future.set_result(output_path)
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, text, output_path, is_phrase=False, speed="normal"):
+        """
+        Queue one clip for rendering
+
+        Args:
+            text (str): Text to convert to speech
+            output_path (str): File the engine writes (.wav)
+            is_phrase (bool): Whether the text is a phrase (affects speech rate)
+            speed (str): Speed setting - "normal", "0.9", or "0.8"
+
+        Returns:
+            Future: Resolves to output_path, or raises if rendering failed
+        """
+        if self._init_error is not None:
+            future = Future()
+            future.set_exception(RuntimeError(f"pyttsx3 unavailable: {self._init_error}"))
+            return future
+
+        self.start()
+        future = Future()
+        self._requests.put((text, output_path, speech_rate(is_phrase, speed), future))
+        return future
+
+    async def synthesize(self, text, output_path, is_phrase=False, speed="normal", timeout=DEFAULT_TIMEOUT):
+        """
+        Awaitable version of submit() for the async apps
+
+        Returns:
+            str: output_path once the clip is written
+
+        Raises:
+            asyncio.TimeoutError: If the clip is not ready within timeout seconds
+        """
+        future = self.submit(text, output_path, is_phrase, speed)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def stop(self):
+        """Ask the worker thread to exit after the queued requests"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._requests.put(None)
+                self._thread.join(timeout=DEFAULT_TIMEOUT)
+            self._thread = None
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_tts_worker():
+    """Return the process-wide TTSWorker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker()
+        return _worker
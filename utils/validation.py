@@ -1,3 +1,17 @@
+# pandas is optional; without it only the list-based validate_batch() is available
+try:
+    import pandas as pd
+    PANDAS_SUPPORT = True
+except ImportError:
+    pd = None
+    PANDAS_SUPPORT = False
+
+# Field length limits
+MAX_WORD_LENGTH = 100
+MAX_MEANING_LENGTH = 500
+MAX_PHRASE_LENGTH = 500
+
+
 def validate_word_entry(word, meaning, phrase="", category="general"):
     """
     Validate word entry data
@@ -17,13 +31,169 @@ def validate_word_entry(word, meaning, phrase="", category="general"):
     if not meaning or not meaning.strip():
         return False, "Meaning cannot be empty"
     
-    if len(word.strip()) > 100:
-        return False, "Word is too long (max 100 characters)"
+    if len(word.strip()) > MAX_WORD_LENGTH:
+        return False, f"Word is too long (max {MAX_WORD_LENGTH} characters)"
     
-    if len(meaning.strip()) > 500:
-        return False, "Meaning is too long (max 500 characters)"
+    if len(meaning.strip()) > MAX_MEANING_LENGTH:
+        return False, f"Meaning is too long (max {MAX_MEANING_LENGTH} characters)"
     
-    if phrase and len(phrase.strip()) > 500:
-        return False, "Phrase is too long (max 500 characters)"
+    if phrase and len(phrase.strip()) > MAX_PHRASE_LENGTH:
+        return False, f"Phrase is too long (max {MAX_PHRASE_LENGTH} characters)"
     
-    return True, ""
\ No newline at end of file
+    return True, ""
+
+
+def _column(values, n):
+    """Stripped string column of length n (missing or None cells become '')"""
+    if values is None:
+        return [''] * n
+    return [str(value).strip() if value is not None else '' for value in values]
+
+
+def validate_batch(words, meanings, phrases=None, categories=None, existing_words=(), allowed_categories=None,
+                   first_rows=None, offset=0):
+    """
+    Validate a whole import column by column
+    
+    Each check is one pass over a column in plain Python (list
+    comprehensions, not vectorized); validate_frame() runs the same checks
+    as pandas column operations when pandas is installed. The content checks
+    match validate_word_entry(); on top of that words repeated within the
+    batch or already in the level are reported as duplicates, and categories
+    can be restricted to a known set.
+    
+    Args:
+        words (list): Word column
+        meanings (list): Meaning column (same length)
+        phrases (list): Phrase column (optional)
+        categories (list): Category column (optional)
+        existing_words (set): Lowercase words already in the target level
+        allowed_categories (iterable): Accepted categories, case-insensitive;
+            None accepts any category
+        first_rows (dict): {lowercase word: row index} of the first valid rows of
+            earlier chunks of the same import; updated with this chunk's (optional)
+        offset (int): Row index of this chunk's first row within the import
+        
+    Returns:
+        dict: "rows" (count), "valid" (rows that can be imported), "errors"
+            {row index: [messages]} for invalid rows and "duplicates"
+            {row index: message} for valid rows whose word already exists;
+            row indexes count from offset
+    """
+    n = len(words)
+    words = _column(words, n)
+    meanings = _column(meanings, n)
+    phrases = _column(phrases, n)
+    categories = _column(categories, n)
+    
+    checks = [
+        ("Word cannot be empty", [i for i, w in enumerate(words) if not w]),
+        ("Meaning cannot be empty", [i for i, m in enumerate(meanings) if not m]),
+        (f"Word is too long (max {MAX_WORD_LENGTH} characters)",
+         [i for i, w in enumerate(words) if len(w) > MAX_WORD_LENGTH]),
+        (f"Meaning is too long (max {MAX_MEANING_LENGTH} characters)",
+         [i for i, m in enumerate(meanings) if len(m) > MAX_MEANING_LENGTH]),
+        (f"Phrase is too long (max {MAX_PHRASE_LENGTH} characters)",
+         [i for i, p in enumerate(phrases) if len(p) > MAX_PHRASE_LENGTH]),
+    ]
+    if allowed_categories is not None:
+        allowed = {category.lower() for category in allowed_categories}
+        checks.append(("Unknown category", [i for i, c in enumerate(categories) if (c.lower() or "general") not in allowed]))
+    
+    errors = {}
+    for message, rows in checks:
+        for i in rows:
+            errors.setdefault(offset + i, []).append(message)
+    
+    # Duplicates: against the level, then repeats within the import (first occurrence wins)
+    first_row = {} if first_rows is None else first_rows
+    duplicates = {}
+    for i, key in enumerate(w.lower() for w in words):
+        row = offset + i
+        if row in errors or not key:
+            continue
+        if key in existing_words:
+            duplicates[row] = "Already exists in this level"
+        elif key in first_row:
+            duplicates[row] = f"Duplicate of row {first_row[key] + 1}"
+        else:
+            first_row[key] = row
+    
+    return {
+        "rows": n,
+        "valid": n - len(errors) - len(duplicates),
+        "errors": errors,
+        "duplicates": duplicates
+    }
+
+
+def _series(frame, name):
+    """Stripped string column of a DataFrame (missing columns or cells become '')"""
+    if name not in frame:
+        return pd.Series('', index=frame.index, dtype=object)
+    return frame[name].fillna('').astype(str).str.strip()
+
+
+def validate_frame(frame, existing_words=(), allowed_categories=None, first_rows=None, offset=0):
+    """
+    Vectorized validate_batch() for a pandas DataFrame
+    
+    Every check is a boolean mask over a whole column, and duplicates are
+    found with isin()/duplicated(); Python only loops over the rows that
+    are reported. The result is the same as validate_batch() on the
+    frame's columns.
+    
+    Args:
+        frame (DataFrame or dict): "word", "meaning", "phrase" and "category"
+            columns (phrase and category optional)
+        existing_words, allowed_categories, first_rows, offset: As for validate_batch()
+        
+    Returns:
+        dict: Same report as validate_batch()
+    """
+    frame = pd.DataFrame(frame).reset_index(drop=True)
+    words = _series(frame, 'word')
+    meanings = _series(frame, 'meaning')
+    phrases = _series(frame, 'phrase')
+    
+    checks = {
+        "Word cannot be empty": words == '',
+        "Meaning cannot be empty": meanings == '',
+        f"Word is too long (max {MAX_WORD_LENGTH} characters)": words.str.len() > MAX_WORD_LENGTH,
+        f"Meaning is too long (max {MAX_MEANING_LENGTH} characters)": meanings.str.len() > MAX_MEANING_LENGTH,
+        f"Phrase is too long (max {MAX_PHRASE_LENGTH} characters)": phrases.str.len() > MAX_PHRASE_LENGTH,
+    }
+    if allowed_categories is not None:
+        allowed = [category.lower() for category in allowed_categories]
+        categories = _series(frame, 'category').str.lower().replace('', 'general')
+        checks["Unknown category"] = ~categories.isin(allowed)
+    
+    masks = pd.DataFrame(checks)
+    invalid = masks.any(axis=1)
+    errors = {
+        offset + i: [message for message, failed in row.items() if failed]
+        for i, row in masks[invalid].iterrows()
+    }
+    
+    # Duplicates: against the level, then repeats within the import (first occurrence wins)
+    first_row = {} if first_rows is None else first_rows
+    keys = words.str.lower()
+    candidates = ~invalid & (keys != '')
+    in_level = candidates & keys.isin(list(existing_words))
+    earlier = candidates & ~in_level & keys.isin(list(first_row))
+    remaining = keys[candidates & ~in_level & ~earlier]
+    repeats = remaining.duplicated()
+    firsts = {key: offset + i for i, key in remaining[~repeats].items()}
+    
+    duplicates = {offset + i: "Already exists in this level" for i in keys.index[in_level]}
+    duplicates.update({offset + i: f"Duplicate of row {first_row[key] + 1}" for i, key in keys[earlier].items()})
+    duplicates.update({offset + i: f"Duplicate of row {firsts[key] + 1}" for i, key in remaining[repeats].items()})
+    first_row.update(firsts)
+    
+    n = len(frame)
+    return {
+        "rows": n,
+        "valid": n - len(errors) - len(duplicates),
+        "errors": errors,
+        "duplicates": duplicates
+    }
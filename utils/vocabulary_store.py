@@ -0,0 +1,256 @@
+"""
+Process-wide vocabulary store shared by all vocabulary builder apps
+Loads each level file once and keeps word, category and level indexes
+"""
+
+import os
+import copy
+import itertools
+import threading
+
+from utils.word_journal import get_word_journal, apply_operation, normalize_path, OPERATIONS
+from utils.sqlite_backend import get_sqlite_backend
+
+LEVEL_FILES = {
+    1: "level1.json",
+    2: "level2.json",
+    3: "level3.json"
+}
+
+# "json" (level files + journal) or "sqlite" (utils/sqlite_backend.py)
+STORAGE_BACKEND = os.environ.get("VOCAB_STORAGE_BACKEND", "json").lower()
+
+
+def normalize_level(level):
+    """
+    Normalize a level identifier coming from widgets or session state
+
+    Args:
+        level (int or str): Level number, e.g. 1 or "1"
+
+    Returns:
+        int or None: Level number, or None if it is not a vocabulary level
+    """
+    try:
+        level = int(level)
+    except (TypeError, ValueError):
+        return None
+    return level if level in LEVEL_FILES else None
+
+
+_generations = itertools.count(1)
+
+
+class LevelIndex:
+    """Parsed contents of one level file plus its lookup indexes"""
+
+    def __init__(self, level, word_pools, signature):
+        self.level = level
+        self.generation = next(_generations)
+        self.word_pools = word_pools
+        self.signature = signature
+        self.words = []
+        self.by_word = {}
+        self.by_category = {}
+
+        # Flatten once per load instead of once per rerun
+        for category, entries in word_pools.items():
+            category_words = self.by_category.setdefault(category.lower(), [])
+            for entry in entries:
+                word_entry = dict(entry)
+                word_entry['category'] = category
+                self.words.append(word_entry)
+                category_words.append(word_entry)
+                self.by_word.setdefault(word_entry.get('word', '').lower(), word_entry)
+
+
+class VocabularyStore:
+    """
+    In-memory cache of the level JSON files
+
+    Each level is parsed the first time it is requested and re-parsed only
+    when the file's modification time or size changes, so a Streamlit rerun
+    costs a stat() and a dict lookup instead of a full JSON parse.
+    Pending journal records are included, and mutations journaled by this
+    process are applied to the cached level without re-reading the file.
+    Returned lists and dictionaries are shared and must be treated as read-only.
+    """
+
+    def __init__(self, base_dir=".", journal=None):
+        self.base_dir = base_dir
+        self.journal = journal or get_word_journal()
+        self._levels = {}
+        self._lock = threading.RLock()
+        self.journal.subscribe(self._on_journal_event)
+
+    def level_file(self, level):
+        """Return the path of the JSON file backing a level"""
+        return os.path.join(self.base_dir, LEVEL_FILES[level])
+
+    def _get_index(self, level):
+        level = normalize_level(level)
+        if level is None:
+            return None
+
+        path = self.level_file(level)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._levels.pop(level, None)
+            return None
+        signature = ((stat.st_mtime_ns, stat.st_size), self.journal.stat())
+
+        with self._lock:
+            index = self._levels.get(level)
+            if index is None or index.signature != signature:
+                word_pools = self.journal.load(path)
+                index = LevelIndex(level, word_pools, signature)
+                self._levels[level] = index
+            return index
+
+    def level_for_file(self, file_path):
+        """Return the level backed by a JSON file path, or None"""
+        target = normalize_path(file_path)
+        for level in LEVEL_FILES:
+            if normalize_path(self.level_file(level)) == target:
+                return level
+        return None
+
+    def _on_journal_event(self, record):
+        """Keep cached levels in step with mutations journaled by this process"""
+        op = record.get("op")
+        journal_stat = self.journal.stat()
+        with self._lock:
+            for level, index in list(self._levels.items()):
+                target = normalize_path(self.level_file(level))
+                file_signature = index.signature[0]
+
+                if op == "checkpoint" and record.get("file") == target:
+                    del self._levels[level]
+                    continue
+
+                if op == "compact" and target in record.get("files", []):
+                    # Contents are unchanged; only the file's mtime moved
+                    try:
+                        stat = os.stat(self.level_file(level))
+                        file_signature = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        del self._levels[level]
+                        continue
+
+                signature = (file_signature, journal_stat)
+                if op in OPERATIONS and record.get("file") == target:
+                    # Copy-on-write so lists already handed to callers stay stable
+                    word_pools = apply_operation(copy.deepcopy(index.word_pools), record)
+                    self._levels[level] = LevelIndex(level, word_pools, signature)
+                else:
+                    index.signature = signature
+
+    def word_pools(self, level):
+        """
+        Get the raw {category: [entries]} mapping of a level
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+
+        Returns:
+            dict or None: Word pools, or None if the level file does not exist
+
+        Raises:
+            json.JSONDecodeError: If the level file is not valid JSON
+        """
+        index = self._get_index(level)
+        return index.word_pools if index else None
+
+    def words(self, level):
+        """
+        Get all words of a level with their category attached
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+
+        Returns:
+            list: Word dictionaries (empty if the level file does not exist)
+        """
+        index = self._get_index(level)
+        return list(index.words) if index else []
+
+    def words_in_category(self, level, category):
+        """
+        Get the words of a single category using the category index
+
+        Args:
+            level (int): Difficulty level (1, 2, or 3)
+            category (str): Category name (case-insensitive)
+
+        Returns:
+            list: Word dictionaries in that category
+        """
+        index = self._get_index(level)
+        if not index:
+            return []
+        return list(index.by_category.get(category.lower(), []))
+
+    def categories(self, level):
+        """Return the category names of a level in file order"""
+        index = self._get_index(level)
+        return list(index.word_pools.keys()) if index else []
+
+    def find_word(self, word, level=None):
+        """
+        Look up a word by exact (case-insensitive) match
+
+        Args:
+            word (str): Word to find
+            level (int): Level to search, or None to search every level
+
+        Returns:
+            dict or None: The word entry with its category, or None if not found
+        """
+        levels = [level] if level is not None else list(LEVEL_FILES)
+        for lvl in levels:
+            index = self._get_index(lvl)
+            if index:
+                entry = index.by_word.get(word.lower())
+                if entry:
+                    return entry
+        return None
+
+    def levels_of(self, word):
+        """Return the levels that contain the given word"""
+        return [level for level in LEVEL_FILES if self.find_word(word, level)]
+
+    def version(self, level):
+        """
+        Get a token that changes whenever the level's contents change
+
+        Derived caches (quiz indexes, statistics, search) use it to know
+        when they must be rebuilt. With the SQLite backend it is the level's
+        revision counter in the database.
+        """
+        if STORAGE_BACKEND == "sqlite":
+            return ("sqlite", get_sqlite_backend().revision(level)) if normalize_level(level) else None
+        index = self._get_index(level)
+        return index.generation if index else None
+
+    def invalidate(self, level=None):
+        """Drop cached data for one level, or for all levels"""
+        with self._lock:
+            if level is None:
+                self._levels.clear()
+            else:
+                self._levels.pop(normalize_level(level), None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_vocabulary_store():
+    """Return the process-wide VocabularyStore shared by every app and page"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VocabularyStore()
+        return _store
@@ -0,0 +1,394 @@
+"""
+Append-only journal for vocabulary mutations
+Each add/update/delete/learn is one fsync'd JSON line instead of a full-file
+rewrite; pending operations are periodically compacted into the JSON files
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only; used to serialize writers across processes
+except ImportError:
+    fcntl = None
+
+DEFAULT_JOURNAL_FILE = "word_journal.jsonl"
+COMPACT_THRESHOLD = 200
+OPERATIONS = ("add", "update", "delete", "learn")
+
+
+def normalize_path(file_path):
+    """Normalize a target file path so journal records compare equal"""
+    return os.path.normpath(file_path)
+
+
+def atomic_write(file_path, write):
+    """
+    Write a file through a temporary file and atomically replace the target
+
+    Args:
+        file_path (str): Destination file
+        write (callable): Called with the open temporary text file
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def atomic_write_json(file_path, data):
+    """
+    Write JSON to a temporary file and atomically replace the target
+
+    Args:
+        file_path (str): Destination JSON file
+        data (dict or list): Data to serialize
+    """
+    atomic_write(file_path, lambda f: json.dump(data, f, ensure_ascii=False, indent=2))
+
+
+def apply_operation(data, record):
+    """
+    Apply one journal record to loaded file data
+
+    Level files are {category: [entries]} dictionaries, learned.json is a list.
+
+    Args:
+        data (dict or list): Loaded file contents (modified in place)
+        record (dict): Journal record
+
+    Returns:
+        dict or list: The updated data
+    """
+    op = record.get("op")
+
+    if op == "learn":
+        entry = record["entry"]
+        word = entry.get("word", "").lower()
+        if not any(w.get("word", "").lower() == word for w in data):
+            data.append(entry)
+        return data
+
+    if op == "add":
+        data.setdefault(record.get("category", "general"), []).append(record["entry"])
+
+    elif op == "update":
+        word = record["word"].lower()
+        category = record.get("category")
+        if category and category in data:
+            categories = [category]
+        else:
+            categories = list(data.keys())
+        fields = record["fields"]
+        for cat in categories:
+            for index, entry in enumerate(data[cat]):
+                if entry.get("word", "").lower() == word:
+                    entry.update({key: value for key, value in fields.items() if key != "category"})
+                    # A new category moves the entry to the end of that category's list
+                    new_category = fields.get("category")
+                    if new_category and new_category != cat:
+                        del data[cat][index]
+                        data.setdefault(new_category, []).append(entry)
+                    return data
+
+    elif op == "delete":
+        word = record["word"].lower()
+        if isinstance(data, list):
+            data[:] = [w for w in data if w.get("word", "").lower() != word]
+            return data
+        for cat, entries in data.items():
+            data[cat] = [w for w in entries if w.get("word", "").lower() != word]
+
+    return data
+
+
+class WordJournal:
+    """
+    JSONL write-ahead journal for word mutations
+
+    Records look like {"op": "add", "file": "level1.json", "ts": ..., ...}.
+    Readers call load() to get a file's contents with pending records applied;
+    compact() folds the records into the files and truncates the journal.
+    """
+
+    def __init__(self, journal_file=DEFAULT_JOURNAL_FILE, compact_threshold=COMPACT_THRESHOLD):
+        self.journal_file = journal_file
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._pending_count = None
+
+    # ------------------------------------------------------------------
+    # Listeners
+    # ------------------------------------------------------------------
+    def subscribe(self, callback):
+        """
+        Register a callback invoked with every record after it is written
+
+        Besides the mutation operations, callbacks receive {"op": "compact"}
+        after compaction and {"op": "checkpoint", "file": ...} after a full
+        rewrite of one file.
+        """
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def _notify(self, record):
+        for callback in list(self._listeners):
+            try:
+                callback(record)
+            except Exception as e:
+                print(f"Warning: journal listener failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _lock_file(self, f):
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _read_records(self):
+        if not os.path.exists(self.journal_file):
+            return []
+        records = []
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append is ignored
+                    print(f"Warning: skipping corrupt journal line in {self.journal_file}")
+        return records
+
+    def pending(self, file_path=None):
+        """
+        Get journal records that have not been compacted yet
+
+        Args:
+            file_path (str): Only return records for this file (optional)
+
+        Returns:
+            list: Journal records in write order
+        """
+        records = self._read_records()
+        if file_path is None:
+            return records
+        target = normalize_path(file_path)
+        return [r for r in records if r.get("file") == target]
+
+    def load(self, file_path, default=None):
+        """
+        Load a JSON file with its pending journal records applied
+
+        Args:
+            file_path (str): Level file or learned.json
+            default: Value to start from when the file does not exist
+
+        Returns:
+            dict or list: File contents including uncompacted changes
+
+        Raises:
+            json.JSONDecodeError: If the file is not valid JSON
+        """
+        records = self.pending(file_path)
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        elif default is not None or records:
+            data = default if default is not None else ([] if records[0]["op"] == "learn" else {})
+        else:
+            raise FileNotFoundError(file_path)
+
+        for record in records:
+            apply_operation(data, record)
+        return data
+
+    def stat(self):
+        """Return (mtime_ns, size) of the journal file, or None if it does not exist"""
+        try:
+            st = os.stat(self.journal_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @contextmanager
+    def exclusive(self):
+        """Hold the journal lock across a read-modify-checkpoint sequence"""
+        with self._lock:
+            yield self
+
+    def append(self, op, file_path, **fields):
+        """
+        Append one mutation to the journal with a single fsync'd write
+
+        Args:
+            op (str): One of "add", "update", "delete", "learn"
+            file_path (str): JSON file the mutation applies to
+            **fields: Operation payload (entry, category, word, fields)
+
+        Returns:
+            dict: The record that was written
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+        record = {"op": op, "file": normalize_path(file_path), "ts": time.time()}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                self._lock_file(f)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            if self._pending_count is None:
+                self._pending_count = len(self._read_records())
+            else:
+                self._pending_count += 1
+
+            self._notify(record)
+
+            if self.compact_threshold and self._pending_count >= self.compact_threshold:
+                self.compact()
+        return record
+
+    def compact(self):
+        """
+        Fold all pending records into their files and truncate the journal
+
+        Returns:
+            list: Files that were rewritten
+        """
+        with self._lock:
+            if not os.path.exists(self.journal_file):
+                self._pending_count = 0
+                return []
+
+            with open(self.journal_file, 'r+', encoding='utf-8') as journal:
+                self._lock_file(journal)
+                records = self._read_records()
+
+                files = []
+                for record in records:
+                    if record.get("file") and record["file"] not in files:
+                        files.append(record["file"])
+
+                for file_path in files:
+                    atomic_write_json(file_path, self.load(file_path))
+
+                journal.seek(0)
+                journal.truncate()
+                journal.flush()
+                os.fsync(journal.fileno())
+
+            self._pending_count = 0
+            self._notify({"op": "compact", "files": files})
+            return files
+
+    def _rewrite_journal(self, journal, records):
+        """Replace the (locked, open) journal's contents with records"""
+        journal.seek(0)
+        journal.truncate()
+        for record in records:
+            journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+        self._pending_count = len(records)
+
+    def flush(self, file_path):
+        """
+        Fold one file's pending records into it, leaving other files' records queued
+
+        Code that reads a journaled file straight from disk (converters,
+        exports, the SQLite import) calls this first so it sees every change.
+
+        Args:
+            file_path (str): Level file or learned.json
+
+        Returns:
+            bool: True if the file was rewritten
+        """
+        target = normalize_path(file_path)
+        with self._lock:
+            if not os.path.exists(self.journal_file):
+                return False
+
+            with open(self.journal_file, 'r+', encoding='utf-8') as journal:
+                self._lock_file(journal)
+                records = self._read_records()
+                if not any(r.get("file") == target for r in records):
+                    return False
+                atomic_write_json(file_path, self.load(file_path))
+                self._rewrite_journal(journal, [r for r in records if r.get("file") != target])
+
+            # Same notification as compaction: contents are unchanged, only the file moved
+            self._notify({"op": "compact", "files": [target]})
+            return True
+
+    def checkpoint(self, file_path, data=None, write=None):
+        """
+        Replace a file's contents and drop its pending records
+
+        Used by callers that already computed the full new contents
+        (e.g. removing words from learned.json), or that stream them
+        (the JSON converter passes write).
+
+        Args:
+            file_path (str): JSON file to rewrite
+            data (dict or list): Complete new contents
+            write (callable): Writes the new contents to an open text file,
+                instead of data
+        """
+        target = normalize_path(file_path)
+        with self._lock:
+            if write is not None:
+                atomic_write(file_path, write)
+            else:
+                atomic_write_json(file_path, data)
+
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'r+', encoding='utf-8') as journal:
+                    self._lock_file(journal)
+                    records = self._read_records()
+                    if any(r.get("file") == target for r in records):
+                        self._rewrite_journal(journal, [r for r in records if r.get("file") != target])
+
+            self._notify({"op": "checkpoint", "file": target})
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_word_journal():
+    """Return the process-wide WordJournal"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = WordJournal()
+        return _journal
+
+
+if __name__ == "__main__":
+    compacted = get_word_journal().compact()
+    print(f"Compacted journal into {len(compacted)} file(s): {', '.join(compacted) or 'none'}")
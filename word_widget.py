@@ -1,10 +1,12 @@
 # from turtle import width # Dont use TKinter environment
 import streamlit as st 
-import random
 import os
 import json
 from pathlib import Path
 from video_play import play_video, display_photo,  _drive_embed_link, _drive_direct_link, _detect_media_type
+from utils.json_manager import update_word_fields
+from utils.media_derivatives import derivative_path
+from utils.media_manifest import lookup_media
 
 def get_difficulty(difficulty_level):
     """Get difficulty level for a word (robust to unexpected DIFFICULTY_LEVELS types)."""
@@ -19,22 +21,74 @@ def get_difficulty(difficulty_level):
         return "⭐⭐"
 
 
-def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=True, current_level=None):
+def widget_key(kind, entry, current_level=None, repeat=0):
+    """Build a stable Streamlit key for one of a card's widgets.
+    Keys come from (level, category, word) so they survive reruns and
+    Streamlit can keep the widget's state between them. Level files list
+    some words twice in one category; repeat (see number_repeats) tells
+    those cards apart."""
+    category = str(entry.get('category', '')).lower()
+    key = f"{kind}_{current_level}_{category}_{entry['word'].lower()}"
+    return f"{key}_{repeat}" if repeat else key
+
+
+def number_repeats(entries):
+    """Pair each entry with the number of earlier entries sharing its category and word.
+    Search and category filters keep every copy of a word, so the number equals
+    the entry's repeat count in the unfiltered category list."""
+    seen = {}
+    numbered = []
+    for entry in entries:
+        key = (str(entry.get('category', '')).lower(), entry['word'].lower())
+        numbered.append((entry, seen.get(key, 0)))
+        seen[key] = seen.get(key, 0) + 1
+    return numbered
+
+
+def _card_header_markdown(word, difficulty, meaning, phrase):
+    """Static title, meaning and phrase block of a card"""
+    return (f"### 📚 {word} {difficulty}\n\n"
+            f"<div class='balanced-meaning'><strong>Meaning:</strong> {meaning}</div>\n\n"
+            f"<div class='balanced-phrase'><strong>Phrase:</strong> {phrase}</div>")
+
+
+def _expressions_html(expressions):
+    """Read-only expressions list of a card"""
+    lines = ["<div class='balanced-expressions'><strong>Expressions:</strong></div>"]
+    lines.extend(f"<div class='balanced-expressions'>• {expr}</div>" for expr in expressions)
+    return "\n".join(lines)
+
+
+def _expressions_css(height):
+    """Text area styling for the editable expressions box"""
+    return f"""
+        <style>
+        div[data-testid="stTextArea"] textarea {{
+            font-size: 1.4em !important;
+            line-height: 1.4 !important;
+            padding: 8px 12px !important;
+            min-height: 60px !important;
+            height: {height}px !important;
+            resize: vertical !important;
+        }}
+        </style>
+        """
+
+
+def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=True, current_level=None, lazy_media=False, repeat=0):
     """Render the word card (meaning, expressions, phrase) and show video if provided.
     Handles local files, direct URLs, and attempts to convert Google Drive links.
-    Also supplies an 'Open in external player' button that calls play_video()."""
+    Also supplies an 'Open in external player' button that calls play_video().
+    With lazy_media, media is only loaded once its "Show media" toggle is on.
+    repeat is the card's number_repeats() count, used in its widget keys."""
     st.markdown("---")
     
     difficulty_level = entry.get('difficulty', 2)
     difficulty = get_difficulty(difficulty_level)
     # print(f"Difficulty for '{entry['word']}': {difficulty}")
-    st.markdown(f"### 📚 {entry['word']} {difficulty}")
-    
-    # Larger font for Meaning with balanced styling
-    st.markdown(f"<div class='balanced-meaning'><strong>Meaning:</strong> {entry.get('meaning','')}</div>", unsafe_allow_html=True)
-    
-    # Larger font for Phrase with balanced styling
-    st.markdown(f"<div class='balanced-phrase'><strong>Phrase:</strong> {entry.get('phrase','')}</div>", unsafe_allow_html=True)
+    # Title, meaning and phrase (larger fonts, balanced styling) as one block
+    st.markdown(_card_header_markdown(entry['word'], difficulty, entry.get('meaning', ''), entry.get('phrase', '')),
+                unsafe_allow_html=True)
     
     # Handle expressions display - either editable or read-only
     if editable_expressions and current_level != "learned":
@@ -55,33 +109,21 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
         calculated_height = max(140, min(140, 40 + (num_expressions * 20)))
         
         # Custom CSS for auto-adjusting text area
-        st.markdown(f"""
-        <style>
-        div[data-testid="stTextArea"] textarea {{
-            font-size: 1.4em !important;
-            line-height: 1.4 !important;
-            padding: 8px 12px !important;
-            min-height: 60px !important;
-            height: {calculated_height}px !important;
-            resize: vertical !important;
-        }}
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown(_expressions_css(calculated_height), unsafe_allow_html=True)
         
         # Text area for expressions input with auto-calculated height
-        random_num = random.randint(1, 100)
         expressions_input = st.text_area(
             "Enter expressions separated by commas (max 5):", 
             value=default_text,
-            key=f"expr_widget_{entry['word']}_{random_num}",
+            key=widget_key("expr_widget", entry, current_level, repeat),
             height=calculated_height,
             label_visibility="collapsed",
             help="Enter up to 5 expressions, separated by commas. Use line breaks for better readability."
         )
         
         # Auto-save functionality with session state
-        if f"prev_expr_{entry['word']}" not in st.session_state:
-            st.session_state[f"prev_expr_{entry['word']}"] = default_text
+        if widget_key("prev_expr", entry, current_level, repeat) not in st.session_state:
+            st.session_state[widget_key("prev_expr", entry, current_level, repeat)] = default_text
         
         # Parse expressions for processing (but don't auto-save yet)
         if expressions_input.strip():
@@ -112,8 +154,7 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
         # Button styling based on whether there are changes
         button_type = "primary" if expressions_changed else "secondary"
         button_text = f"💾 Save Expressions ({len(new_expressions)}/5)" + (" *" if expressions_changed else "")
-        random_num = random.randint(1, 100)
-        if st.button(button_text, key=f"save_expr_{entry['word']}_{random_num}", type=button_type):
+        if st.button(button_text, key=widget_key("save_expr", entry, current_level, repeat), type=button_type):
                 # Update the entry
                 entry['expressions'] = new_expressions
                 
@@ -129,20 +170,13 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                     filename = level_files[current_level]
                     if os.path.exists(filename):
                         try:
-                            with open(filename, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                            
-                            # Find and update the word in the appropriate category
-                            category = entry.get('category', '').lower()
-                            if category in data:
-                                for i, word_entry in enumerate(data[category]):
-                                    if word_entry['word'] == entry['word']:
-                                        data[category][i]['expressions'] = new_expressions
-                                        break
-                            
-                            # Save back to file
-                            with open(filename, 'w', encoding='utf-8') as f:
-                                json.dump(data, f, ensure_ascii=False, indent=2)
+                            # Journaled (or written to SQLite) instead of rewriting the whole level file
+                            update_word_fields(
+                                filename,
+                                entry['word'],
+                                {'expressions': new_expressions},
+                                category=entry.get('category', '').lower()
+                            )
                             
                             # Show success message
                             st.success(f"✅ {len(new_expressions)} expressions saved successfully!", icon="💾")
@@ -153,22 +187,25 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
         # Read-only expressions display with balanced styling (max 5)
         expressions = entry.get('expressions', [])[:5]  # Limit to 5 expressions for display
         if expressions:
-            st.markdown("<div class='balanced-expressions'><strong>Expressions:</strong></div>", unsafe_allow_html=True)
-            for expr in expressions:
-                st.markdown(f"<div class='balanced-expressions'>• {expr}</div>", unsafe_allow_html=True)
+            st.markdown(_expressions_html(expressions), unsafe_allow_html=True)
     
     # Add small spacing between expressions and phrase
     st.markdown("<div style='margin: 4px 0;'></div>", unsafe_allow_html=True)
        
     # Media handling (image or video)    
     media_path = entry.get('media') or entry.get('video')
+    if media_path and lazy_media and not st.toggle("🖼️ Show media", key=widget_key("show_media", entry, current_level, repeat)):
+        media_path = None
     if media_path:
+        is_url = str(media_path).startswith(("http://", "https://"))
+        # Local files come from the media manifest (a dict lookup, no stat per rerun)
+        media_info = None if is_url else lookup_media(media_path)
         # Detect media type automatically
-        media_type = _detect_media_type(media_path)
+        media_type = media_info['type'] if media_info else _detect_media_type(media_path)
         
         st.markdown("**Media:**")
         proj_root = Path(__file__).parent
-        is_url = str(media_path).startswith(("http://", "https://"))
+        local_path = Path(media_info['path']) if media_info else proj_root / str(media_path)
         if is_url:
             st.markdown(f"🔗 URL: {media_path}")
             
@@ -178,11 +215,13 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                 # Image handling
                 if not is_url:
                     # Local image
-                    img_path = Path(media_path)
-                    if not img_path.is_absolute():
-                        img_path = (proj_root / img_path).resolve()
-                    if img_path.exists():
-                        st.image(str(img_path), use_container_width=True)
+                    img_path = local_path
+                    if media_info:
+                        # Small preview in the card; the display-size copy only once expanded
+                        if st.toggle("🔍 Full size", key=widget_key("full_image", entry, current_level, repeat)):
+                            st.image(derivative_path(img_path, "display", media_info.get('sha256')), use_container_width=True)
+                        else:
+                            st.image(derivative_path(img_path, "thumb", media_info.get('sha256')))
                     else:
                         st.warning(f"Image file not found: {img_path}")
                 else:
@@ -197,10 +236,8 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                 # Video handling
                 if not is_url:
                     # Local video file
-                    vp = Path(media_path)
-                    if not vp.is_absolute():
-                        vp = (proj_root / vp).resolve()
-                    if vp.exists():
+                    vp = local_path
+                    if media_info:
                         try:
                             st.video(str(vp))
                         except Exception:
@@ -210,8 +247,7 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                             except Exception as e:
                                 st.error(f"Cannot play local video: {e}")
                         # Provide external open button
-                        random_num = random.randint(1, 100)
-                        if st.button("Open in external player", key=f"open_ext_{entry['word']}_{random_num}"):
+                        if st.button("Open in external player", key=widget_key("open_ext_local", entry, current_level, repeat)):
                             play_video(str(vp))
                     else:
                         st.warning(f"Video file not found: {vp}")
@@ -234,8 +270,7 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                                 st.warning(f"⚠️ Cannot embed video: {str(e)[:50]}")
                             
                             st.markdown(f"[📺 Open in browser]({media_path})")
-                            random_num = random.randint(1, 100)
-                            if st.button("🎬 Open in external player", key=f"open_ext_{entry['word']}_{random_num}"):
+                            if st.button("🎬 Open in external player", key=widget_key("open_ext_drive", entry, current_level, repeat)):
                                 if direct:
                                     play_video(direct)
                                 else:
@@ -243,38 +278,33 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                             else:
                                 # Not a single-file share (maybe folder) — provide link + external open
                                 st.markdown(f"[Open Google Drive link]({media_path})")
-                                random_num = random.randint(1, 100)
-                                if st.button("Open in external player", key=f"open_ext_{entry['word']}_{random_num}"):
+                                if st.button("Open in external player", key=widget_key("open_ext_drive_link", entry, current_level, repeat)):
                                     play_video(media_path)
                         else:
                             # Generic URL video: try to let Streamlit play it
-                            random_num = random.randint(1, 100)
                             try:
                                 st.video(media_path)
                             except Exception as e:
                                 st.warning(f"⚠️ Cannot embed video from URL")
                                 st.markdown(f"[📺 Open video link]({media_path})")
-                                if st.button("🎬 Open in external player", key=f"open_ext_{entry['word']}_{random_num}"):
+                                if st.button("🎬 Open in external player", key=widget_key("open_ext_url", entry, current_level, repeat)):
                                     play_video(media_path)
                 else:
                     # Generic URL video
-                    random_num = random.randint(1, 100)
                     try:
                         st.video(media_path)
                     except Exception as e:
                         st.warning(f"⚠️ Cannot embed video from URL")
                         st.markdown(f"[📺 Open video link]({media_path})")
-                        if st.button("🎬 Open in external player", key=f"open_ext_{entry['word']}_{random_num}"):
+                        if st.button("🎬 Open in external player", key=widget_key("open_ext_url", entry, current_level, repeat)):
                             play_video(media_path)
                         
             elif media_type == 'audio':
                 # Audio handling
                 if not is_url:
                     # Local audio file
-                    audio_path = Path(media_path)
-                    if not audio_path.is_absolute():
-                        audio_path = (proj_root / audio_path).resolve()
-                    if audio_path.exists():
+                    audio_path = local_path
+                    if media_info:
                         st.audio(str(audio_path))
                     else:
                         st.warning(f"Audio file not found: {audio_path}")
@@ -291,21 +321,19 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                 st.info(f"📎 Media file detected (type: {media_type})")
                 if not is_url:
                     # Local file with unknown type
-                    unknown_path = Path(media_path)
-                    if not unknown_path.is_absolute():
-                        unknown_path = (proj_root / unknown_path).resolve()
-                    if unknown_path.exists():
+                    unknown_path = local_path
+                    if media_info:
                         st.markdown(f"**File:** `{unknown_path.name}`")
                         # Try as image first, then video
                         col1, col2 = st.columns(2)
                         with col1:
-                            if st.button("📷 Try as Image", key=f"img_{entry['word']}"):
+                            if st.button("📷 Try as Image", key=widget_key("img", entry, current_level, repeat)):
                                 try:
                                     st.image(str(unknown_path), use_container_width=True)
                                 except Exception as e:
                                     st.error(f"Cannot display as image: {e}")
                         with col2:
-                            if st.button("🎬 Try as Video", key=f"vid_{entry['word']}"):
+                            if st.button("🎬 Try as Video", key=widget_key("vid", entry, current_level, repeat)):
                                 try:
                                     st.video(str(unknown_path), use_container_width=True)
                                 except Exception as e:
@@ -317,13 +345,13 @@ def create_word_widget(entry: dict, editable_expressions=True, editable_phrase=T
                     st.markdown(f"[🔗 Open media link]({media_path})")
                     col1, col2 = st.columns(2)
                     with col1:
-                        if st.button("📷 Try as Image", key=f"img_{entry['word']}"):
+                        if st.button("📷 Try as Image", key=widget_key("img", entry, current_level, repeat)):
                             try:
                                 st.image(media_path, use_container_width=True)
                             except Exception as e:
                                 st.error(f"Cannot display as image: {e}")
                     with col2:
-                        if st.button("🎬 Try as Video", key=f"vid_{entry['word']}"):
+                        if st.button("🎬 Try as Video", key=widget_key("vid", entry, current_level, repeat)):
                             try:
                                 st.video(media_path, use_container_width=True)
                             except Exception as e: